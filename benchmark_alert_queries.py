@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Measure the dashboard queries on a large synthetic alerts table
+
+A table of --rows alerts spread over the last --days days is generated
+with the pre-migration schema. Every dashboard query is timed in its
+original form (date() on the timestamp text, no index), then after the
+ts/day migration on the indexed columns, then on the rollup tables. All
+forms must return the same rows.
+
+    python benchmark_alert_queries.py --rows 10000000 --days 180
+"""
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.services.alert_rollups import create_rollups
+from src.services.alert_schema import migrate, today_number, utc_days_ago, utc_midnight_ago, SECONDS_PER_DAY
+
+OBJECTS = ('person', 'knife', 'scissors', 'gun', 'baseball bat', 'bottle')
+
+
+def queries():
+    """
+    Dashboard queries as (name, original SQL, original params, indexed SQL, indexed params,
+    rollup SQL, rollup params)
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+    return [
+        ("today count (GUI)",
+         "SELECT COUNT(*) FROM alerts WHERE date(timestamp) = ?", (today,),
+         "SELECT COUNT(*) FROM alerts WHERE day = ?", (today_number(),),
+         "SELECT COALESCE(SUM(count), 0) FROM rollup_daily_object WHERE day = ?", (today_number(),)),
+        ("daily statistics",
+         "SELECT COUNT(*), COUNT(DISTINCT object), AVG(confidence) FROM alerts WHERE date(timestamp) = ?",
+         (today,),
+         "SELECT COUNT(*), COUNT(DISTINCT object), AVG(confidence) FROM alerts WHERE day = ?",
+         (today_number(),),
+         "SELECT COALESCE(SUM(count), 0), COUNT(*), SUM(confidence_sum) / SUM(count) "
+         "FROM rollup_daily_object WHERE day = ?", (today_number(),)),
+        ("week by object",
+         "SELECT object, COUNT(*) FROM alerts WHERE timestamp >= date('now', '-7 days') GROUP BY object", (),
+         "SELECT object, COUNT(*) FROM alerts WHERE ts >= ? GROUP BY object", (utc_midnight_ago(7),),
+         "SELECT object, SUM(count) FROM rollup_daily_object WHERE day >= ? GROUP BY object",
+         (utc_days_ago(7),)),
+        ("30-day daily report",
+         "SELECT object, strftime('%Y-%m-%d', timestamp) as date, COUNT(*) FROM alerts "
+         "WHERE timestamp >= date('now', '-30 days') GROUP BY object, date", (),
+         f"SELECT object, date(ts / {SECONDS_PER_DAY} * {SECONDS_PER_DAY}, 'unixepoch') as date, COUNT(*) "
+         f"FROM alerts WHERE ts >= ? GROUP BY object, ts / {SECONDS_PER_DAY}", (utc_midnight_ago(30),),
+         f"SELECT object, date(day * {SECONDS_PER_DAY}, 'unixepoch'), count FROM rollup_daily_object "
+         "WHERE day >= ?", (utc_days_ago(30),)),
+        ("7-day heatmap",
+         "SELECT strftime('%w', timestamp) as d, strftime('%H', timestamp) as h, COUNT(*) FROM alerts "
+         "WHERE timestamp >= date('now', '-7 days') GROUP BY d, h", (),
+         f"SELECT CAST((ts / {SECONDS_PER_DAY} + 4) % 7 AS TEXT) as d, "
+         f"printf('%02d', ts % {SECONDS_PER_DAY} / 3600) as h, "
+         "COUNT(*) FROM alerts WHERE ts >= ? GROUP BY d, h", (utc_midnight_ago(7),),
+         "SELECT CAST((day + 4) % 7 AS TEXT) as d, printf('%02d', hour) as h, SUM(count) "
+         "FROM rollup_hourly WHERE day >= ? GROUP BY d, h", (utc_days_ago(7),)),
+    ]
+
+
+def create_table(conn, rows, days):
+    """
+    Fill an alerts table with the pre-migration schema, ending now (UTC)
+
+    Args:
+        conn (sqlite3.Connection): Target database
+        rows (int): Number of alerts
+        days (int): Period covered by the alerts
+    """
+    conn.execute('''
+        CREATE TABLE alerts (
+            id INTEGER PRIMARY KEY,
+            object TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            image_path TEXT,
+            location TEXT
+        )
+    ''')
+    end = int(datetime.now(timezone.utc).timestamp())
+    start = end - days * SECONDS_PER_DAY
+    objects = ", ".join(f"'{o}'" for o in OBJECTS)
+    conn.execute(f'''
+        WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < ? - 1)
+        INSERT INTO alerts (object, confidence, timestamp)
+        SELECT json_extract(json_array({objects}), '$[' || ((n * 2654435761) % {len(OBJECTS)}) || ']'),
+               0.5 + ((n * 40503) % 500) / 1000.0,
+               datetime(? + n * (? - ?) / ?, 'unixepoch')
+        FROM seq
+    ''', (rows, start, end, start, rows))
+    conn.commit()
+
+
+def timed(conn, sql, params, repeat):
+    """
+    Run a query several times
+
+    Returns:
+        tuple: (best time in ms, sorted result rows, averages rounded)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - started)
+    rows = [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in result]
+    return best * 1000.0, sorted(rows, key=repr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard queries before and after the ts/day migration")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Number of synthetic alerts")
+    parser.add_argument('--days', type=int, default=180, help="Retention period covered by the alerts")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per query, the best is kept")
+    parser.add_argument('--dir', default=None, help="Directory for the test database (temporary by default)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        conn = sqlite3.connect(str(Path(tmp) / 'alerts.db'))
+        started = time.perf_counter()
+        create_table(conn, args.rows, args.days)
+        print(f"Generated {args.rows} alerts over {args.days} days in {time.perf_counter() - started:.1f} s")
+
+        before = [timed(conn, query[1], query[2], args.repeat) for query in queries()]
+
+        started = time.perf_counter()
+        migrate(conn)
+        print(f"Migration (backfill + indexes) in {time.perf_counter() - started:.1f} s")
+        started = time.perf_counter()
+        create_rollups(conn)
+        print(f"Rollups built in {time.perf_counter() - started:.1f} s")
+        conn.execute('ANALYZE')
+
+        print(f"\n{'query':<22}{'original ms':>13}{'indexed ms':>12}{'rollup ms':>11}")
+        for (name, _, _, sql, params, rollup_sql, rollup_params), (old_ms, old_rows) in zip(queries(), before):
+            new_ms, new_rows = timed(conn, sql, params, args.repeat)
+            rollup_ms, rollup_rows = timed(conn, rollup_sql, rollup_params, args.repeat)
+            check = "" if new_rows == old_rows == rollup_rows else "  RESULTS DIFFER"
+            print(f"{name:<22}{old_ms:>13.1f}{new_ms:>12.1f}{rollup_ms:>11.2f}{check}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Measure alert insertion throughput into SQLite
+
+Compares the historical write path (one connection and one committed
+transaction per alert, rollback journal) with the write-behind AlertStore
+(one WAL connection, alerts committed in batches).
+
+    python benchmark_alert_store.py --alerts 5000 --batch-size 100
+"""
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.services.alert_store import AlertStore
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        object TEXT NOT NULL,
+        confidence REAL NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        image_path TEXT,
+        location TEXT
+    )
+'''
+
+
+def create_database(path):
+    """
+    Create an empty alerts table
+
+    Args:
+        path (Path): Database file
+    """
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute(SCHEMA)
+
+
+def run_per_alert(path, count):
+    """
+    Insert alerts the way the application used to: connect, insert, commit
+
+    Returns:
+        float: Elapsed seconds
+    """
+    started = time.perf_counter()
+    for i in range(count):
+        with sqlite3.connect(str(path)) as conn:
+            conn.execute('INSERT INTO alerts (object, confidence, location) VALUES (?, ?, ?)',
+                         ('person', 0.5 + (i % 50) / 100.0, f"({i % 640}, {i % 480})"))
+        conn.close()
+    return time.perf_counter() - started
+
+
+def run_write_behind(path, count, batch_size, flush_interval):
+    """
+    Insert alerts through AlertStore, waiting for the last commit
+
+    Returns:
+        tuple: (elapsed seconds, store statistics)
+    """
+    store = AlertStore(path, batch_size=batch_size, flush_interval=flush_interval)
+    started = time.perf_counter()
+    futures = [store.add('person', 0.5 + (i % 50) / 100.0, location=f"({i % 640}, {i % 480})")
+               for i in range(count)]
+    futures[-1].result()
+    elapsed = time.perf_counter() - started
+    stats = store.get_stats()
+    store.close()
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark alert persistence")
+    parser.add_argument('--alerts', type=int, default=2000, help="Number of alerts to insert")
+    parser.add_argument('--batch-size', type=int, default=100, help="AlertStore batch size")
+    parser.add_argument('--flush-ms', type=float, default=200, help="AlertStore flush interval (ms)")
+    parser.add_argument('--dir', default=None, help="Directory for the test databases (temporary by default)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        baseline_db = Path(tmp) / 'per_alert.db'
+        store_db = Path(tmp) / 'write_behind.db'
+        create_database(baseline_db)
+        create_database(store_db)
+
+        baseline = run_per_alert(baseline_db, args.alerts)
+        batched, stats = run_write_behind(store_db, args.alerts, args.batch_size, args.flush_ms / 1000.0)
+
+    print(f"{'path':<16}{'seconds':>10}{'alerts/s':>12}")
+    print(f"{'per-alert':<16}{baseline:>10.3f}{args.alerts / baseline:>12.0f}")
+    print(f"{'write-behind':<16}{batched:>10.3f}{args.alerts / batched:>12.0f}")
+    print(f"speed-up: x{baseline / batched:.1f} "
+          f"(mean batch {stats['mean_batch_size']:.1f} alerts, "
+          f"mean commit {stats['mean_commit_ms']:.2f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Compare inference precisions (FP32 / FP16 / INT8) on a local image set
+
+For every precision the detection engine is loaded, warmed up and run on
+each image. Latency is the forward-pass time reported by the engine;
+accuracy is measured against the FP32 detections: a detection matches
+when a reference detection of the same class overlaps it with an IoU of
+at least --iou.
+
+    python precision_report.py --images data/samples --precisions fp32 fp16 int8
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.core.model_registry import ModelRegistry, PRECISIONS
+from src.core.detection_engine import DetectionEngine
+from src.core.tracker import iou_matrix
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+def compare_detections(reference, candidate, iou_threshold=0.5):
+    """
+    Match the detections of one image against reference detections
+
+    Args:
+        reference (Detections): FP32 detections
+        candidate (Detections): Detections of the precision under test
+        iou_threshold (float): Minimum IoU between matched boxes
+
+    Returns:
+        tuple: (matches, reference count, candidate count, confidence deltas)
+    """
+    if not len(reference) or not len(candidate):
+        return 0, len(reference), len(candidate), []
+
+    ious = iou_matrix(reference.boxes, candidate.boxes)
+    same_class = reference.class_ids[:, None] == candidate.class_ids[None, :]
+    ious = np.where(same_class, ious, 0.0)
+
+    matches, deltas, used = 0, [], set()
+    for r in np.argsort(-reference.confidences):
+        for c in np.argsort(-ious[r]):
+            if ious[r, c] < iou_threshold:
+                break
+            if c not in used:
+                used.add(c)
+                matches += 1
+                deltas.append(abs(float(candidate.confidences[c]) - float(reference.confidences[r])))
+                break
+    return matches, len(reference), len(candidate), deltas
+
+
+def run_precision(registry, spec, input_size, precision, images, confidence_threshold, runs):
+    """Run one precision over the image set, return its model, detections and latencies"""
+    engine = DetectionEngine(registry.load(spec, input_size, precision), registry,
+                             confidence_threshold)
+    engine.warm_up(2)
+    detections, latencies = [], []
+    for image in images:
+        for _ in range(runs):
+            result = engine.detect([image])[0]
+            latencies.append(engine.last_timings["inference"] * 1000.0)
+        detections.append(result)
+    return engine.model, detections, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FP32/FP16/INT8 detection accuracy and latency")
+    parser.add_argument("--images", required=True, help="Directory of test images")
+    parser.add_argument("--config", default="config.json", help="Configuration file")
+    parser.add_argument("--model-dir", default="models", help="Directory of the model files")
+    parser.add_argument("--model", default=None, help="Model name (default: configured default model)")
+    parser.add_argument("--input-size", type=int, default=None, help="Network input size")
+    parser.add_argument("--precisions", nargs="+", default=list(PRECISIONS), choices=PRECISIONS)
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per image")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU needed to match a reference detection")
+    parser.add_argument("--output", default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    registry = ModelRegistry.from_config(config, args.model_dir)
+    spec = registry.get(args.model)
+    confidence_threshold = config.get('detection', {}).get('confidence_threshold', 0.5)
+
+    paths = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    images = [image for image in (cv2.imread(str(p)) for p in paths) if image is not None]
+    if not images:
+        print(f"No images found in {args.images}")
+        return 1
+    print(f"Comparing {', '.join(args.precisions)} on {len(images)} image(s) with {spec.name}\n")
+
+    precisions = ['fp32'] + [p for p in args.precisions if p != 'fp32']
+    reference = None
+    report = []
+    for precision in precisions:
+        model, detections, latencies = run_precision(registry, spec, args.input_size, precision,
+                                                     images, confidence_threshold, args.runs)
+        row = {
+            "precision": precision,
+            "effective_precision": model.precision,
+            "model": model.spec.name,
+            "mean_ms": float(latencies.mean()),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "detections": int(sum(len(d) for d in detections))
+        }
+        if reference is None:
+            reference = detections
+        else:
+            totals = [compare_detections(r, c, args.iou) for r, c in zip(reference, detections)]
+            matches = sum(t[0] for t in totals)
+            reference_count = sum(t[1] for t in totals)
+            candidate_count = sum(t[2] for t in totals)
+            deltas = [d for t in totals for d in t[3]]
+            row["recall_vs_fp32"] = matches / reference_count if reference_count else 1.0
+            row["precision_vs_fp32"] = matches / candidate_count if candidate_count else 1.0
+            row["mean_confidence_delta"] = float(np.mean(deltas)) if deltas else 0.0
+        if precision in args.precisions:
+            report.append(row)
+
+    print(f"{'precision':<10}{'model':<16}{'mean ms':>9}{'p95 ms':>9}{'dets':>7}{'recall':>9}{'prec':>8}{'dconf':>8}")
+    for row in report:
+        label = row['precision'] if row['precision'] == row['effective_precision'] \
+            else f"{row['precision']}>{row['effective_precision']}"
+        print(f"{label:<10}{row['model']:<16}{row['mean_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+              f"{row['detections']:>7}{row.get('recall_vs_fp32', 1.0):>9.3f}"
+              f"{row.get('precision_vs_fp32', 1.0):>8.3f}{row.get('mean_confidence_delta', 0.0):>8.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"model": spec.name, "images": len(images), "results": report}, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
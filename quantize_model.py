@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Create the offline INT8 variant of an ONNX detection model
+
+Static quantization calibrated on local images, with onnxruntime's
+quantization tools (pip install onnx onnxruntime). The output is a QDQ
+model that OpenCV DNN runs with its INT8 CPU kernels; it is registered
+as "<model>-int8" and selected with advanced.optimization.precision = "int8".
+
+    python quantize_model.py --images data/samples --input models/yolov3.onnx
+"""
+import sys
+import argparse
+from pathlib import Path
+
+import cv2
+
+ROOT_DIR = Path(__file__).parent
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize an ONNX detection model to INT8")
+    parser.add_argument("--input", default=str(ROOT_DIR / "models" / "yolov3.onnx"), help="FP32 ONNX model")
+    parser.add_argument("--output", default=None, help="Output path (default: <input>-int8.onnx)")
+    parser.add_argument("--images", required=True, help="Directory of calibration images")
+    parser.add_argument("--input-size", type=int, default=416, help="Network input size")
+    parser.add_argument("--max-images", type=int, default=200, help="Maximum calibration images")
+    args = parser.parse_args()
+
+    try:
+        import onnx
+        from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                              QuantType, quantize_static)
+    except ImportError:
+        print("onnx and onnxruntime are required: pip install onnx onnxruntime")
+        return 1
+
+    input_name = onnx.load(args.input).graph.input[0].name
+    paths = sorted(p for p in Path(args.images).iterdir()
+                   if p.suffix.lower() in IMAGE_EXTENSIONS)[:args.max_images]
+    if not paths:
+        print(f"No calibration images found in {args.images}")
+        return 1
+
+    class ImageReader(CalibrationDataReader):
+        """Feed calibration images preprocessed like DetectionEngine does"""
+        def __init__(self):
+            self.paths = iter(paths)
+
+        def get_next(self):
+            for path in self.paths:
+                image = cv2.imread(str(path))
+                if image is not None:
+                    size = (args.input_size, args.input_size)
+                    return {input_name: cv2.dnn.blobFromImage(image, 1 / 255.0, size, (0, 0, 0),
+                                                              swapRB=True, crop=False)}
+            return None
+
+    output = args.output or str(Path(args.input).with_name(Path(args.input).stem + "-int8.onnx"))
+    print(f"Calibrating on {len(paths)} image(s)...")
+    quantize_static(args.input, output, ImageReader(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QInt8, weight_type=QuantType.QInt8,
+                    per_channel=True)
+    print(f"INT8 model written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from .model_registry import SUPPORTED_INPUT_SIZES
+
+
+class AdaptiveController:
+    """
+    Feedback controller keeping detection within a CPU budget and latency target
+
+    The controller measures the process CPU usage and the per-frame
+    inference latency over an evaluation window. When either is above its
+    target it first lowers the detection rate, then the network input size;
+    when both have enough headroom it restores the input size first, then
+    the detection rate. Every decision is logged.
+    """
+    def __init__(self, max_cpu_usage=80, target_latency_ms=250, input_size=416,
+                 min_input_size=320, base_interval_ms=0, max_interval_ms=2000,
+                 evaluation_interval=5.0, headroom=0.7):
+        """
+        Initialize the controller
+
+        Args:
+            max_cpu_usage (float): CPU budget in percent of all cores
+            target_latency_ms (float): Target p95 inference latency per frame
+            input_size (int): Configured (maximum) network input size
+            min_input_size (int): Smallest input size the controller may use
+            base_interval_ms (float): Configured minimum interval between inferences
+            max_interval_ms (float): Largest interval the controller may use
+            evaluation_interval (float): Seconds between two decisions
+            headroom (float): Fraction of the targets below which quality is restored
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_cpu_usage = float(max_cpu_usage)
+        self.target_latency = target_latency_ms / 1000.0
+        self.max_input_size = int(input_size)
+        # A configured size below min_input_size is simply never lowered
+        min_input_size = min(int(min_input_size), self.max_input_size)
+        self.input_sizes = sorted(s for s in set(SUPPORTED_INPUT_SIZES) | {self.max_input_size}
+                                  if min_input_size <= s <= self.max_input_size)
+        self.input_size = self.max_input_size
+        self.base_interval_ms = float(base_interval_ms)
+        self.max_interval_ms = float(max_interval_ms)
+        self.interval_ms = self.base_interval_ms
+        self.evaluation_interval = evaluation_interval
+        self.headroom = headroom
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=200)
+        self._cpu_count = os.cpu_count() or 1
+        self._last_eval_wall = time.monotonic()
+        self._last_eval_cpu = time.process_time()
+        self.last_cpu_usage = 0.0
+
+    @classmethod
+    def from_config(cls, config, input_size):
+        """
+        Build a controller from system.max_cpu_usage and advanced.adaptive
+
+        Args:
+            config (dict): Main configuration
+            input_size (int): Configured network input size
+
+        Returns:
+            AdaptiveController: Configured controller, or None if disabled
+        """
+        adaptive = config.get('advanced', {}).get('adaptive', {})
+        if not adaptive.get('enabled', False):
+            return None
+        return cls(
+            max_cpu_usage=config.get('system', {}).get('max_cpu_usage', 80),
+            target_latency_ms=adaptive.get('target_latency_ms', 250),
+            input_size=input_size,
+            min_input_size=adaptive.get('min_input_size', 320),
+            base_interval_ms=config.get('advanced', {}).get('detection_interval', 0),
+            max_interval_ms=adaptive.get('max_detection_interval', 2000),
+            evaluation_interval=adaptive.get('evaluation_interval', 5.0)
+        )
+
+    def record_inference(self, duration, frames=1):
+        """
+        Record the duration of a forward pass
+
+        Args:
+            duration (float): Seconds spent in inference
+            frames (int): Number of frames processed by that pass
+        """
+        with self._lock:
+            self._latencies.append(duration / max(1, frames))
+
+    def measure_cpu(self, now=None):
+        """
+        Process CPU usage since the last measurement, in percent of all cores
+
+        Returns:
+            float: CPU usage between 0 and 100
+        """
+        now = time.monotonic() if now is None else now
+        cpu = time.process_time()
+        wall = now - self._last_eval_wall
+        usage = 0.0
+        if wall > 0:
+            usage = 100.0 * (cpu - self._last_eval_cpu) / (wall * self._cpu_count)
+        self._last_eval_wall = now
+        self._last_eval_cpu = cpu
+        return usage
+
+    def update(self, now=None, cpu_usage=None):
+        """
+        Re-evaluate the settings if the evaluation interval has elapsed
+
+        Args:
+            now (float, optional): Monotonic timestamp
+            cpu_usage (float, optional): CPU usage to use instead of measuring it
+
+        Returns:
+            dict: The new settings if they changed, None otherwise
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._last_eval_wall < self.evaluation_interval:
+                return None
+            measured = self.measure_cpu(now)
+            cpu = measured if cpu_usage is None else cpu_usage
+            latency = float(np.percentile(self._latencies, 95)) if self._latencies else 0.0
+            self._latencies.clear()
+            self.last_cpu_usage = cpu
+
+            previous = (self.input_size, self.interval_ms)
+            reason = None
+            if cpu > self.max_cpu_usage or latency > self.target_latency:
+                reason = "over budget"
+                self._step_down()
+            elif (cpu < self.max_cpu_usage * self.headroom
+                    and latency < self.target_latency * self.headroom):
+                reason = "headroom"
+                self._step_up()
+
+            if (self.input_size, self.interval_ms) == previous:
+                return None
+
+            self.logger.info(
+                f"Adaptive controller ({reason}): cpu {cpu:.0f}% / {self.max_cpu_usage:.0f}%, "
+                f"p95 latency {latency * 1000:.0f} ms / {self.target_latency * 1000:.0f} ms -> "
+                f"input size {previous[0]} -> {self.input_size}, "
+                f"interval {previous[1]:.0f} -> {self.interval_ms:.0f} ms"
+            )
+            return self.get_settings()
+
+    def _step_down(self):
+        # Lower the detection rate first, then the resolution
+        if self.interval_ms < self.max_interval_ms:
+            self.interval_ms = min(self.max_interval_ms, max(self.interval_ms * 1.5, 100.0))
+            return
+        index = self.input_sizes.index(self.input_size)
+        if index > 0:
+            self.input_size = self.input_sizes[index - 1]
+
+    def _step_up(self):
+        # Restore the resolution first, then the detection rate
+        index = self.input_sizes.index(self.input_size)
+        if index < len(self.input_sizes) - 1:
+            self.input_size = self.input_sizes[index + 1]
+            return
+        if self.interval_ms > self.base_interval_ms:
+            interval = self.interval_ms / 1.5
+            self.interval_ms = self.base_interval_ms if interval < 100.0 else max(self.base_interval_ms, interval)
+
+    def get_settings(self):
+        """
+        Current controller output
+
+        Returns:
+            dict: Input size, detection interval and last measured CPU usage
+        """
+        return {
+            "input_size": self.input_size,
+            "detection_interval_ms": self.interval_ms,
+            "cpu_usage": self.last_cpu_usage
+        }
@@ -0,0 +1,194 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+
+class AlertEvent:
+    """A dangerous object to persist and notify, with a copy of its frame"""
+    def __init__(self, label, confidence, box, frame=None, source=None, timestamp=None):
+        """
+        Initialize the event
+
+        Args:
+            label (str): Detected class name
+            confidence (float): Detection confidence
+            box (tuple): (x, y, w, h) in frame coordinates
+            frame (numpy.ndarray, optional): Annotated frame, owned by the event
+            source: Camera source identifier
+            timestamp (datetime, optional): Detection time, now by default
+        """
+        self.label = label
+        self.confidence = float(confidence)
+        self.box = tuple(int(v) for v in box)
+        self.frame = frame
+        self.source = source
+        self.timestamp = timestamp or datetime.now()
+
+    @property
+    def location(self):
+        x, y, w, h = self.box
+        return f"x:{x},y:{y},w:{w},h:{h}"
+
+
+class AlertDispatcher:
+    """
+    Run the side effects of alerts (storage, image saving, notifications)
+    on background workers
+
+    dispatch() only queues the event, so the video path never waits on
+    disk or network. Handlers run in registration order for every event;
+    a failing handler is logged and does not prevent the next ones.
+    """
+    def __init__(self, handlers=(), workers=1, queue_size=100, name='alerts'):
+        """
+        Initialize the dispatcher
+
+        Args:
+            handlers (iterable): (name, callable) pairs, each called with the AlertEvent
+            workers (int): Number of worker threads
+            queue_size (int): Maximum number of pending events
+            name (str): Name used for worker threads and logs
+        """
+        self.logger = logging.getLogger(__name__)
+        self.handlers = list(handlers)
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.name = name
+        self.is_running = False
+        self._threads = []
+        self._lock = threading.Lock()
+        self.dispatched = 0
+        self.dropped = 0
+        self.errors = 0
+        self.handler_times = {}
+
+    @classmethod
+    def from_config(cls, config, handlers=(), name='alerts'):
+        """
+        Create a dispatcher from the advanced.alerts section of the configuration
+
+        Args:
+            config (dict): Application configuration
+            handlers (iterable): (name, callable) pairs
+            name (str): Name used for worker threads and logs
+
+        Returns:
+            AlertDispatcher: The dispatcher, not started
+        """
+        settings = config.get('advanced', {}).get('alerts', {})
+        return cls(handlers, workers=settings.get('workers', 1),
+                   queue_size=settings.get('queue_size', 100), name=name)
+
+    def add_handler(self, name, handler):
+        """Register a handler, called after the ones already registered"""
+        self.handlers.append((name, handler))
+
+    def start(self):
+        """Start the worker threads"""
+        if self.is_running:
+            return
+        self.is_running = True
+        for worker_id in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-dispatcher-{worker_id}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        """
+        Handle the pending events, then stop the workers
+
+        Args:
+            timeout (float): Seconds to wait for pending events
+        """
+        self.flush(timeout)
+        self.is_running = False
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every queued event has been handled
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if nothing is pending anymore
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and self.is_running:
+            if time.monotonic() >= deadline:
+                self.logger.warning(f"{self.queue.unfinished_tasks} alert(s) still pending")
+                return False
+            time.sleep(0.01)
+        return not self.queue.unfinished_tasks
+
+    def dispatch(self, event):
+        """
+        Queue an alert event without blocking
+
+        Args:
+            event (AlertEvent): Event to handle
+
+        Returns:
+            bool: False if the queue was full and the event was dropped
+        """
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            self.logger.warning(f"Alert queue full, dropped alert for {event.label}")
+            return False
+        with self._lock:
+            self.dispatched += 1
+        return True
+
+    def _worker(self):
+        while self.is_running:
+            try:
+                event = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                for name, handler in self.handlers:
+                    started = time.monotonic()
+                    try:
+                        handler(event)
+                    except Exception as e:
+                        with self._lock:
+                            self.errors += 1
+                        self.logger.error(f"Alert handler {name} failed for {event.label}: {str(e)}")
+                    with self._lock:
+                        self.handler_times.setdefault(name, deque(maxlen=200)).append(
+                            time.monotonic() - started)
+            finally:
+                self.queue.task_done()
+
+    def get_stats(self):
+        """
+        Get the dispatcher metrics
+
+        Returns:
+            dict: Pending, dispatched, dropped and failed events, mean/max time per handler
+        """
+        with self._lock:
+            handlers = {}
+            for name, times in self.handler_times.items():
+                durations = np.array(times) * 1000.0
+                handlers[name] = {"mean_ms": float(durations.mean()),
+                                  "max_ms": float(durations.max())}
+            return {
+                "pending": self.queue.unfinished_tasks,
+                "dispatched": self.dispatched,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "handlers": handlers
+            }
@@ -1,27 +1,34 @@
 import cv2
 import logging
-import time
-import os
+import threading
 from pathlib import Path
 
+from .image_writer import get_image_writer
+
 logger = logging.getLogger(__name__)
 
 class CameraManager:
     """
     Class to manage camera devices
+
+    The device is used under a lock: frames may be read from a capture
+    thread while the GUI thread changes the camera or its settings.
     """
-    def __init__(self, camera_index=0):
+    def __init__(self, camera_index=0, image_writer=None):
         """
         Initialize the camera manager
         
         Args:
             camera_index (int): Index of the camera to use
+            image_writer (ImageWriter, optional): Writer for screenshots, the shared one by default
         """
         self.logger = logging.getLogger(__name__)
         self.camera_index = camera_index
+        self.image_writer = image_writer or get_image_writer()
         self.camera = None
         self.is_running = False
         self.last_frame = None
+        self.lock = threading.RLock()
         self.open_camera()
     
     def open_camera(self, camera_index=None):
@@ -35,6 +42,10 @@ class CameraManager:
         Returns:
             bool: True if camera opened successfully, False otherwise
         """
+        with self.lock:
+            return self._open_camera(camera_index)
+
+    def _open_camera(self, camera_index):
         if camera_index is not None:
             self.camera_index = camera_index
             
@@ -70,21 +81,22 @@ class CameraManager:
         Returns:
             numpy.ndarray: Frame image or None if camera is not available
         """
-        if self.camera is None or not self.camera.isOpened():
-            if not self.open_camera():
-                return None
-                
-        try:
-            ret, frame = self.camera.read()
-            if ret:
-                self.last_frame = frame
-                return frame
-            else:
-                self.logger.warning("Failed to read frame from camera")
-                return self.last_frame  # Return last good frame or None
-        except Exception as e:
-            self.logger.error(f"Error getting frame: {str(e)}")
-            return self.last_frame
+        with self.lock:
+            if self.camera is None or not self.camera.isOpened():
+                if not self._open_camera(None):
+                    return None
+                    
+            try:
+                ret, frame = self.camera.read()
+                if ret:
+                    self.last_frame = frame
+                    return frame
+                else:
+                    self.logger.warning("Failed to read frame from camera")
+                    return self.last_frame  # Return last good frame or None
+            except Exception as e:
+                self.logger.error(f"Error getting frame: {str(e)}")
+                return self.last_frame
     
     def set_camera_property(self, prop_id, value):
         """
@@ -97,10 +109,11 @@ class CameraManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        if self.camera is None or not self.camera.isOpened():
-            return False
-            
-        return self.camera.set(prop_id, value)
+        with self.lock:
+            if self.camera is None or not self.camera.isOpened():
+                return False
+                
+            return self.camera.set(prop_id, value)
     
     def get_camera_property(self, prop_id):
         """
@@ -142,55 +155,51 @@ class CameraManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        if self.camera is None or not self.camera.isOpened():
-            return False
+        with self.lock:
+            if self.camera is None or not self.camera.isOpened():
+                return False
+                
+            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
             
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        
-        # Verify if resolution was actually set
-        actual_width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH))
-        actual_height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        
-        return (actual_width == width and actual_height == height)
+            # Verify if resolution was actually set
+            actual_width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH))
+            actual_height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            
+            return (actual_width == width and actual_height == height)
     
     def save_screenshot(self, output_dir="screenshots"):
         """
         Save a screenshot from the camera
         
+        The file is written in the background by the image writer.
+        
         Args:
             output_dir (str): Directory to save the screenshot
             
         Returns:
-            str: Path to the saved file or None if failed
+            str: Path of the file being written or None if failed
         """
         frame = self.get_frame()
         if frame is None:
             return None
             
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Generate filename with timestamp
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"screenshot_{timestamp}.jpg"
-        filepath = os.path.join(output_dir, filename)
-        
-        # Save the image
         try:
-            cv2.imwrite(filepath, frame)
-            self.logger.info(f"Screenshot saved: {filepath}")
-            return filepath
+            filepath = self.image_writer.save(frame.copy(), output_dir, "screenshot")
         except Exception as e:
             self.logger.error(f"Error saving screenshot: {str(e)}")
             return None
+        if filepath is not None:
+            self.logger.info(f"Screenshot queued: {filepath}")
+        return filepath
     
     def stop(self):
         """
         Stop and release the camera
         """
-        self.is_running = False
-        if self.camera is not None:
-            self.camera.release()
-            self.camera = None
-            self.logger.info("Camera released")
+        with self.lock:
+            self.is_running = False
+            if self.camera is not None:
+                self.camera.release()
+                self.camera = None
+                self.logger.info("Camera released")
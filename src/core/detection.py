@@ -5,40 +5,89 @@ from pathlib import Path
 import sys
 import logging
 from datetime import datetime
-import threading
-import queue
 import os
+import threading
+import time
+from collections import deque
 
 # Fix imports by using relative imports instead of absolute
 from .notification_manager import NotificationManager
 from .analytics_manager import AnalyticsManager
+from .detection_scheduler import DetectionScheduler, load_optimization_config
+from .motion_detector import MotionDetector
+from .tracker import ObjectTracker
+from .model_registry import ModelRegistry
+from .detection_engine import DetectionEngine, resolve_dangerous_objects
+from .adaptive_controller import AdaptiveController
+from .pipeline import Pipeline, Source, Stage, format_stats
+from .alert_dispatcher import AlertDispatcher, AlertEvent
+from .image_writer import get_image_writer
 
 class ObjectDetector:
     def __init__(self, config_path='config.json', camera_source=0,
                  yolo_weights="yolov3.weights", 
                  yolo_cfg="yolov3.cfg", 
-                 coco_names="coco.names"):
+                 coco_names="coco.names",
+                 model_name=None, image_writer=None):
         self.camera_source = camera_source
         self.yolo_weights = yolo_weights
         self.yolo_cfg = yolo_cfg
         self.coco_names = coco_names
+        self.model_name = model_name
         self.load_config(config_path)
         self.setup_logging()
         self.init_yolo()
-        self.notification_manager = NotificationManager()
+        self.adaptive_controller = AdaptiveController.from_config(self.config, self.input_size)
+        # Shared by every image saved in the process, created from this configuration
+        self.image_writer = image_writer or get_image_writer(self.config)
+        self.notification_manager = NotificationManager(self.image_writer)
         self.analytics_manager = AnalyticsManager()
-        self.frame_queue = queue.Queue(maxsize=30)
-        self.detection_thread = None
+        # Storage and notifications never run on the detection path
+        self.alert_dispatcher = AlertDispatcher.from_config(self.config, [
+            ('analytics', self._store_alert),
+            ('notification', self._notify_alert)
+        ], name='detection-alerts')  # Démarré et arrêté avec la détection
+        self.worker_engines = [self.engine]  # Une réplique du moteur par worker
         self.is_running = False
         self.last_detections = {}  # Pour éviter les alertes répétées
         self.camera = None
+        self.frame_latencies = deque(maxlen=200)  # Latence par frame (secondes)
+        self.schedulers = {}  # Un planificateur par source de caméra
+        self.motion_detectors = {}  # Un détecteur de mouvement par source de caméra
+        self.trackers = {}  # Un tracker d'objets par source de caméra
+        self.tracker_lock = threading.Lock()  # Trackers mis à jour par le pipeline, lus par l'affichage
+        self.latest_frame = None  # Dernière image lue par la capture, pour l'affichage
+        self.pipeline = self._build_pipeline()
         
     def load_config(self, config_path):
         with open(config_path, 'r') as f:
             self.config = json.load(f)
-            self.dangerous_objects = set(self.config['detection']['dangerous_objects'])
+            self.dangerous_objects = resolve_dangerous_objects(self.config)
+            # Only dangerous classes raise alerts: drop the others before NMS
+            self.dangerous_only = self.config['detection'].get('dangerous_only', True)
             self.confidence_threshold = self.config['detection']['confidence_threshold']
             self.alert_timeout = self.config['detection']['alert_timeout']
+            
+            batching = self.config.get('advanced', {}).get('batching', {})
+            self.batching_enabled = batching.get('enabled', False)
+            self.batch_size = max(1, int(batching.get('batch_size', 4)))
+            self.batch_max_wait = batching.get('max_wait_ms', 50) / 1000.0
+            
+            # Run YOLO on motion crops instead of the whole frame
+            self.region_config = self.config['detection'].get('region_inference', {})
+            self.region_inference = self.region_config.get('enabled', False)
+            
+            threading_config = self.config.get('advanced', {}).get('threading', {})
+            self.detection_threads = max(1, int(threading_config.get('detection_threads', 1)))
+            self.max_queue_size = max(1, int(threading_config.get('max_queue_size', 30)))
+            
+            # Queues between the preprocess -> infer -> postprocess -> sinks stages
+            self.pipeline_config = self.config.get('advanced', {}).get('pipeline', {})
+            
+            # Forward passes run on a blank image before the first frame
+            self.warmup_runs = int(self.config.get('models', {}).get('warmup_runs', 1))
+            
+        self.optimization_config = load_optimization_config(config_path)
     
     def setup_logging(self):
         # Use existing logger
@@ -46,42 +95,124 @@ class ObjectDetector:
     
     def init_yolo(self):
         try:
-            # Check if model files exist
-            for file_path in [self.yolo_weights, self.yolo_cfg, self.coco_names]:
-                if not os.path.exists(file_path):
-                    raise FileNotFoundError(f"YOLO model file not found: {file_path}")
+            model_dir = os.path.dirname(self.yolo_weights) or '.'
+            self.model_registry = ModelRegistry.from_config(self.config, model_dir)
+            if self.model_name is None and 'models' not in self.config:
+                # No model configuration: keep using the files given to the constructor
+                self.model_registry.register('yolov3', {
+                    'weights': os.path.abspath(self.yolo_weights),
+                    'config': os.path.abspath(self.yolo_cfg),
+                    'names': os.path.abspath(self.coco_names)
+                })
             
-            self.net = cv2.dnn.readNet(self.yolo_weights, self.yolo_cfg)
-            self.layer_names = self.net.getLayerNames()
+            if self.model_name is not None:
+                spec = self.model_registry.get(self.model_name)
+                input_size = spec.input_size
+            else:
+                spec, input_size = self.model_registry.for_camera(self.camera_source)
             
-            # Handle output layers correctly for different OpenCV versions
-            try:
-                # Newer OpenCV versions
-                output_layers = self.net.getUnconnectedOutLayers().flatten()
-            except:
-                # Older OpenCV versions
-                output_layers = self.net.getUnconnectedOutLayers()
-                
-            self.output_layers = [self.layer_names[i - 1] for i in output_layers]
+            # Taille d'entrée du réseau par source de caméra, validée avant le chargement du modèle
+            self.input_sizes = {
+                camera_id: self.model_registry.check_input_size(spec, settings['input_size'], camera_id)
+                for camera_id, settings in self.model_registry.camera_settings.items()
+                if 'input_size' in settings
+            }
             
-            with open(self.coco_names, "r") as f:
-                self.classes = [line.strip() for line in f.readlines()]
+            self.engine = DetectionEngine.load(self.model_registry, spec, input_size,
+                                               self.confidence_threshold, self.dangerous_objects,
+                                               self.dangerous_only)
+            self.engine.warm_up(self.warmup_runs)
+            self.model = self.engine.model
+            self.net = self.model.net
+            self.output_layers = self.model.output_layers
+            self.classes = self.model.classes
+            self.input_size = self.model.input_size
                 
-            self.logger.info("YOLO model initialized successfully")
+            self.logger.info(f"YOLO model {spec.name} initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize YOLO model: {str(e)}")
             raise
     
+    def _create_engine(self):
+        """Create a new replica of the detection engine (cv2.dnn.Net is not thread-safe)"""
+        engine = self.engine.replicate()
+        engine.warm_up(self.warmup_runs)
+        return engine
+    
+    def _input_size_for(self, source):
+        """Network input size configured for a camera source"""
+        input_size = self.input_size
+        if source is not None:
+            input_size = self.input_sizes.get(str(source), self.input_size)
+        if self.adaptive_controller is not None and not self.model.spec.fixed_input_size:
+            # The controller may only lower the configured size
+            input_size = min(input_size, self.adaptive_controller.input_size)
+        return input_size
+    
+    def _adapt(self, duration, frames):
+        """Feed an inference duration to the adaptive controller and apply its decision"""
+        if self.adaptive_controller is None:
+            return
+        self.adaptive_controller.record_inference(duration, frames)
+        settings = self.adaptive_controller.update()
+        if settings is not None:
+            for scheduler in list(self.schedulers.values()):
+                scheduler.set_min_interval_ms(settings['detection_interval_ms'])
+    
+    def _build_pipeline(self):
+        """
+        Build the streaming pipeline fed by the camera and by add_frame
+        
+        capture (camera reads) -> preprocess (scheduler, motion gating,
+        regions) -> infer (one engine replica per worker, optionally
+        batched) -> postprocess (tracking, alert decision) -> sinks (alert
+        dispatch, end-to-end latency). Inference results are re-sequenced,
+        so tracking and alerts see the frames of a source in order whatever
+        worker finished first. The alert dispatcher stores and notifies the
+        alerts on its own workers; its handler times are reported with the
+        sinks stage. The metrics are logged every stats_log_interval_s.
+        
+        Returns:
+            Pipeline: The (not yet started) pipeline
+        """
+        if self.batching_enabled and self.batch_size > 1:
+            infer = self._infer_stage
+        else:
+            infer = lambda item, worker_id: self._infer_stage([item], worker_id)[0]
+        return Pipeline([
+            # Fresh frames matter more than old ones: drop the oldest when behind
+            Stage('preprocess', self._preprocess_stage,
+                  queue_size=self.pipeline_config.get('preprocess_queue_size', 4),
+                  drop_oldest=True),
+            Stage('infer', infer, workers=self.detection_threads,
+                  queue_size=self.max_queue_size, drop_oldest=True, ordered=True,
+                  batch_size=self.batch_size if self.batching_enabled else 1,
+                  batch_wait=self.batch_max_wait),
+            Stage('postprocess', self._postprocess_stage,
+                  queue_size=self.pipeline_config.get('postprocess_queue_size', 16),
+                  put_timeout=self.pipeline_config.get('put_timeout_ms', 1000) / 1000.0),
+            Stage('sinks', self._sinks_stage,
+                  queue_size=self.pipeline_config.get('sinks_queue_size', 16),
+                  put_timeout=self.pipeline_config.get('put_timeout_ms', 1000) / 1000.0)
+        ], name='detection',
+           source=Source('capture', self._capture_frame,
+                         retry_delay=self.pipeline_config.get('capture_retry_ms', 500) / 1000.0),
+           report=self.log_pipeline_stats,
+           report_interval=self.pipeline_config.get('stats_log_interval_s', 60))
+    
     def start_detection(self):
-        """Start the detection thread and open the camera"""
+        """Start the detection pipeline and open the camera"""
         self.is_running = True
-        # Try to open the camera before starting the detection thread
+        # Try to open the camera before starting the detection workers
         if not self.open_camera():
             self.is_running = False
             return False
             
-        self.detection_thread = threading.Thread(target=self._detection_loop)
-        self.detection_thread.start()
+        while len(self.worker_engines) < self.detection_threads:
+            self.worker_engines.append(self._create_engine())
+            
+        self.alert_dispatcher.start()
+        self.pipeline.start()
         return True
     
     def open_camera(self):
@@ -147,33 +278,197 @@ class ObjectDetector:
         return success
             
     def stop_detection(self):
-        """Stop detection thread and release camera"""
+        """Stop the detection pipeline and the alert dispatcher, release camera"""
         self.is_running = False
-        if self.detection_thread:
-            self.detection_thread.join()
+        # Frames still queued are discarded, alerts already raised are still sent
+        self.pipeline.stop()
+        self.alert_dispatcher.stop()
+        self.log_pipeline_stats()
             
         # Release the camera
         if self.camera is not None and self.camera.isOpened():
             self.camera.release()
             self.camera = None
     
-    def _detection_loop(self):
-        while self.is_running:
-            try:
-                frame = self.frame_queue.get(timeout=1)
-                self.process_frame(frame)
-            except queue.Empty:
-                continue
-            except Exception as e:
-                self.logger.error(f"Error in detection loop: {str(e)}")
+    def add_frame(self, frame, source=None):
+        """
+        Submit a frame from another camera to the detection pipeline
+        
+        The frames of the detector's own camera are read by the capture
+        source. Scheduling, motion gating and region extraction run in the
+        pipeline's preprocess stage, off the caller's thread.
+        
+        Args:
+            frame (numpy.ndarray): Frame to analyse
+            source: Optional identifier of the camera the frame comes from
+            
+        Returns:
+            bool: True if the frame was queued, False if it was dropped right away
+        """
+        return self.pipeline.put((source, frame, time.monotonic()))
     
-    def add_frame(self, frame):
-        try:
-            if self.frame_queue.full():
-                self.frame_queue.get_nowait()  # Remove oldest frame
-            self.frame_queue.put_nowait(frame)
-        except queue.Full:
-            pass
+    def _capture_frame(self):
+        """Pipeline source: read a frame from the detector's camera"""
+        success, frame = self.get_frame()
+        if not success:
+            self.logger.warning("Failed to grab frame, reopening the camera")
+            self.open_camera()
+            return None
+        self.latest_frame = frame
+        # The displayed frame stays clean: alerts are drawn on the copy
+        return None, frame.copy(), time.monotonic()
+    
+    def get_display_frame(self):
+        """
+        Latest frame read from the camera by the capture source
+        
+        Returns:
+            numpy.ndarray: BGR frame, None before the first read
+        """
+        return self.latest_frame
+    
+    def _get_scheduler(self, source):
+        if source not in self.schedulers:
+            scheduler = DetectionScheduler.from_config(self.config, self.optimization_config)
+            if self.adaptive_controller is not None:
+                scheduler.set_min_interval_ms(self.adaptive_controller.interval_ms)
+            self.schedulers[source] = scheduler
+        return self.schedulers[source]
+    
+    def _preprocess_stage(self, item, worker_id):
+        """Pipeline stage: skip the frames the scheduler does not select or without motion, compute the regions"""
+        source, frame, enqueued_at = item
+        if not self._get_scheduler(source).should_detect():
+            return None
+        if source not in self.motion_detectors:
+            self.motion_detectors[source] = MotionDetector.from_config(self.config)
+        motion_detector = self.motion_detectors[source]
+        if motion_detector is not None and not motion_detector.detect(frame):
+            return None
+            
+        regions = None
+        if self.region_inference and motion_detector is not None:
+            regions = motion_detector.get_motion_regions(
+                frame.shape,
+                padding=self.region_config.get('padding', 16),
+                min_size=self.region_config.get('min_region_size', 96),
+                max_regions=self.region_config.get('max_regions', 4),
+                max_area_ratio=self.region_config.get('max_area_ratio', 0.5)
+            )
+        return source, frame, enqueued_at, regions
+    
+    def _infer_stage(self, items, worker_id):
+        """Pipeline stage: run inference on a batch with the worker's own engine replica"""
+        engine = self.worker_engines[worker_id]
+        started = time.monotonic()
+        results = engine.detect([item[1] for item in items],
+                                [item[3] for item in items],
+                                [self._input_size_for(item[0]) for item in items])
+        self._adapt(time.monotonic() - started, len(items))
+        return [(source, frame, enqueued_at, detections)
+                for (source, frame, enqueued_at, _), detections in zip(items, results)]
+    
+    def _postprocess_stage(self, item, worker_id):
+        """Pipeline stage: track objects, decide which detections raise an alert and draw them"""
+        source, frame, enqueued_at, detections = item
+        alerts = self._handle_detections(frame, detections, source=source, timestamp=enqueued_at)
+        return source, frame, enqueued_at, alerts
+    
+    def _sinks_stage(self, item, worker_id):
+        """Pipeline stage: hand the alerts to the alert dispatcher, record the frame latency"""
+        source, frame, enqueued_at, alerts = item
+        self._send_alerts(frame, alerts, source)
+        self._record_latency(enqueued_at)
+        return item
+    
+    def get_pipeline_stats(self):
+        """
+        Get the metrics of the detection pipeline
+        
+        Returns:
+            dict: Capture and per-stage queue depth, counters and timings (the
+                sinks stage with the alert handler times), end-to-end latency,
+                alert dispatcher and image writer metrics
+        """
+        stats = self.pipeline.get_stats()
+        stats["latency"] = self.get_latency_stats()
+        stats["alerts"] = self.alert_dispatcher.get_stats()
+        stats["sinks"]["handlers"] = stats["alerts"]["handlers"]
+        stats["image_writer"] = self.image_writer.get_stats()
+        return stats
+    
+    def log_pipeline_stats(self):
+        """Log the pipeline, latency, alert, image writer and motion metrics"""
+        stats = self.get_pipeline_stats()
+        latency, alerts, writer = stats["latency"], stats["alerts"], stats["image_writer"]
+        self.logger.info(f"Pipeline: {format_stats(stats)}")
+        handlers = ", ".join(f"{name} {times['mean_ms']:.1f} ms (max {times['max_ms']:.1f})"
+                             for name, times in alerts["handlers"].items())
+        self.logger.info(f"Latency: {latency['mean_ms']:.1f} ms (p95 {latency['p95_ms']:.1f}) "
+                         f"over {latency['frames']} frames | alerts: {alerts['dispatched']} dispatched, "
+                         f"{alerts['pending']} pending, {alerts['dropped']} dropped"
+                         f"{', ' + handlers if handlers else ''} | images: {writer['written']} written, "
+                         f"{writer['dropped']} dropped")
+        for source, motion in self.get_motion_stats().items():
+            self.logger.info(f"Motion ({source}): {motion}")
+    
+    def _get_tracker(self, source):
+        if source not in self.trackers:
+            self.trackers[source] = ObjectTracker.from_config(self.config)
+        return self.trackers[source]
+    
+    def get_tracked_objects(self, source=None, timestamp=None):
+        """
+        Predicted positions of the objects tracked for a camera source
+        
+        Cheap enough to call on every displayed frame, including frames
+        that were not analysed. Coordinates are those of the frames given
+        to add_frame.
+        
+        Args:
+            source: Camera source identifier given to add_frame
+            timestamp (float, optional): time.monotonic() value to predict at
+            
+        Returns:
+            list: Track objects, empty if tracking is disabled
+        """
+        with self.tracker_lock:
+            tracker = self._get_tracker(source)
+            if tracker is None:
+                return []
+            return tracker.predict(time.monotonic() if timestamp is None else timestamp)
+    
+    def get_motion_stats(self):
+        """
+        Get motion-activity metrics per camera source
+        
+        Returns:
+            dict: MotionDetector.get_stats() keyed by source, empty if gating is disabled
+        """
+        return {source: detector.get_stats()
+                for source, detector in self.motion_detectors.items()
+                if detector is not None}
+    
+    def _record_latency(self, enqueued_at):
+        self.frame_latencies.append(time.monotonic() - enqueued_at)
+    
+    def get_latency_stats(self):
+        """
+        Get per-frame latency statistics, from add_frame to end of processing
+        
+        Returns:
+            dict: Number of samples and mean/p95/max latency in milliseconds
+        """
+        if not self.frame_latencies:
+            return {"frames": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+            
+        latencies = np.array(self.frame_latencies) * 1000.0
+        return {
+            "frames": int(latencies.size),
+            "mean_ms": float(latencies.mean()),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "max_ms": float(latencies.max())
+        }
             
     def get_frame(self):
         """
@@ -190,84 +485,103 @@ class ObjectDetector:
         return success, frame
     
     def process_frame(self, frame):
-        # Resize frame to smaller dimensions for faster processing
-        frame = cv2.resize(frame, (416, 416))
-        
-        # Convert to float16 for reduced memory usage
-        blob = cv2.dnn.blobFromImage(frame, 0.00392, (416, 416), (0, 0, 0), True, crop=False).astype(np.float16)
-        
-        # Use asyncio for non-blocking detection
-        async def detect_objects():
-            self.net.setInput(blob)
-            return self.net.forward(self.output_layers)
+        """
+        Run detection on a single frame and handle its alerts
         
-        height, width = frame.shape[:2]
-        outs = self.net.forward(self.output_layers)
+        Args:
+            frame (numpy.ndarray): BGR frame
+            
+        Returns:
+            numpy.ndarray: The frame, with dangerous objects drawn on it
+        """
+        started = time.monotonic()
+        detections = self.engine.detect([frame], input_sizes=[self._input_size_for(None)])[0]
+        self._adapt(time.monotonic() - started, 1)
+        self._send_alerts(frame, self._handle_detections(frame, detections))
         
-        class_ids = []
-        confidences = []
-        boxes = []
+        return frame
+
+    def _handle_detections(self, frame, detections, source=None, timestamp=None):
+        """
+        Decide which detections of a frame raise an alert and draw them
         
-        # Détection des objets
-        for out in outs:
-            for detection in out:
-                scores = detection[5:]
-                class_id = np.argmax(scores)
-                confidence = scores[class_id]
-                
-                if confidence > self.confidence_threshold:
-                    center_x = int(detection[0] * width)
-                    center_y = int(detection[1] * height)
-                    w = int(detection[2] * width)
-                    h = int(detection[3] * height)
-                    
-                    x = int(center_x - w / 2)
-                    y = int(center_y - h / 2)
-                    
-                    boxes.append([x, y, w, h])
-                    confidences.append(float(confidence))
-                    class_ids.append(class_id)
+        Alerts are limited to one per label every alert_timeout seconds.
+        With tracking enabled, detections are also associated with tracks
+        and a tracked object raises at most one alert, so it does not
+        re-alert once the timeout is over; an object whose track expired
+        (e.g. hidden for longer than max_age) gets a new track, but still
+        waits for the timeout.
         
-        indexes = cv2.dnn.NMSBoxes(boxes, confidences, self.confidence_threshold, 0.4)
+        Args:
+            frame (numpy.ndarray): Frame the detections belong to
+            detections (Detections): Output of DetectionEngine.detect for this frame
+            source: Camera source identifier
+            timestamp (float, optional): time.monotonic() value of the frame
+            
+        Returns:
+            list: (label, confidence, box) of the alerts to send with _send_alerts
+        """
+        alerts = []
+        with self.tracker_lock:
+            tracker = self._get_tracker(source)
+            if tracker is not None:
+                tracker.update(detections.boxes, detections.confidences, detections.labels,
+                               time.monotonic() if timestamp is None else timestamp,
+                               detections.class_ids)
+                new_alerts = [(track.label, track.confidence, track.box)
+                              for track in tracker.pop_new_alerts(self.engine.is_dangerous)]
         now = datetime.now()
+        if tracker is not None:
+            for label, confidence, box in new_alerts:
+                if self._alert_due(label, now):
+                    alerts.append(self._raise_alert(frame, label, confidence, box))
+            return alerts
         
-        for i in range(len(boxes)):
-            if i in indexes:
-                x, y, w, h = boxes[i]
-                label = self.classes[class_ids[i]]
-                confidence = confidences[i]
-                
-                if label in self.dangerous_objects:
-                    # Vérifier si assez de temps s'est écoulé depuis la dernière détection
-                    last_detection = self.last_detections.get(label)
-                    if (last_detection is None or 
-                        (now - last_detection).total_seconds() > self.alert_timeout):
-                        
-                        # Mettre à jour le timestamp de dernière détection
-                        self.last_detections[label] = now
-                        
-                        # Dessiner le rectangle de détection
-                        color = (0, 0, 255)  # Rouge pour les objets dangereux
-                        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-                        cv2.putText(frame, f"{label} ({confidence:.2f})", 
-                                  (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 
-                                  0.6, color, 2)
-                        
-                        # Sauvegarder l'alerte
-                        alert_id = self.analytics_manager.add_alert(
-                            label, confidence,
-                            location=f"x:{x},y:{y},w:{w},h:{h}"
-                        )
-                        
-                        # Envoyer la notification avec l'image
-                        self.notification_manager.send_alert(
-                            label, confidence, frame.copy()
-                        )
-                        
-                        logging.info(f"Dangerous object detected: {label} "
-                                   f"(confidence: {confidence:.2f})")
+        for x, y, w, h, label, confidence, is_dangerous in detections.to_list():
+            if is_dangerous and self._alert_due(label, now):
+                alerts.append(self._raise_alert(frame, label, confidence, (x, y, w, h)))
+        return alerts
+    
+    def _alert_due(self, label, now):
+        """Vérifier si assez de temps s'est écoulé depuis la dernière alerte du label, et la noter"""
+        last_detection = self.last_detections.get(label)
+        if last_detection is not None and (now - last_detection).total_seconds() <= self.alert_timeout:
+            return False
+        # Mettre à jour le timestamp de dernière détection
+        self.last_detections[label] = now
+        return True
+    
+    def _raise_alert(self, frame, label, confidence, box):
+        """Draw the detection of an alert on the frame and return the alert"""
+        x, y, w, h = box
         
-        return frame
+        # Dessiner le rectangle de détection
+        color = (0, 0, 255)  # Rouge pour les objets dangereux
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(frame, f"{label} ({confidence:.2f})", 
+                  (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 
+                  0.6, color, 2)
+        
+        logging.info(f"Dangerous object detected: {label} "
+                   f"(confidence: {confidence:.2f})")
+        return label, confidence, box
+    
+    def _send_alerts(self, frame, alerts, source=None):
+        """Hand the alerts of a frame, once all of them are drawn, to the alert dispatcher"""
+        if not alerts:
+            return
+        # The caller keeps drawing on its frame: the alerts share one snapshot
+        snapshot = frame.copy()
+        for label, confidence, box in alerts:
+            self.alert_dispatcher.dispatch(AlertEvent(label, confidence, box, snapshot, source))
+    
+    def _store_alert(self, event):
+        """Alert handler: sauvegarder l'alerte"""
+        self.analytics_manager.add_alert(event.label, event.confidence, location=event.location)
+    
+    def _notify_alert(self, event):
+        """Alert handler: envoyer la notification avec l'image"""
+        self.notification_manager.send_alert(event.label, event.confidence, event.frame)
 
 def main():
     try:
@@ -313,26 +627,24 @@ def main():
                 print("Error: Could not open camera. Make sure a camera is connected and not in use by another application.")
                 return
         
-        # Main loop - use detector.get_frame() instead of direct camera access
+        if not detector.is_running:
+            detector.start_detection()
+        
+        # Main loop - the pipeline reads the camera, this loop only displays its frames
         while True:
-            ret, frame = detector.get_frame()
-            if not ret:
-                logging.error("Failed to grab frame")
-                print("Error grabbing frame, trying to reconnect...")
-                # Try to reopen the camera
-                if not detector.open_camera():
-                    print("Failed to reconnect to camera. Exiting.")
-                    break
-                continue
-            
-            # Ajouter le frame à la queue de détection
-            detector.add_frame(frame.copy())
-            
-            # Afficher le frame
-            cv2.imshow("Danger Detection System", frame)
+            frame = detector.get_display_frame()
+            if frame is not None:
+                # Afficher le frame avec la position prédite des objets suivis
+                frame = frame.copy()
+                for track in detector.get_tracked_objects():
+                    x, y, w, h = track.box
+                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                    cv2.putText(frame, f"{track.label} #{track.track_id}",
+                              (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+                cv2.imshow("Danger Detection System", frame)
             
             # Sortir avec 'q'
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            if cv2.waitKey(30) & 0xFF == ord('q'):
                 break
         
         # Nettoyage
@@ -0,0 +1,363 @@
+import logging
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from .yolo_decoder import decode_candidates, apply_nms, split_batch_outputs
+
+STAGES = ("preprocess", "inference", "postprocess")
+LETTERBOX_FILL = (114, 114, 114)
+
+
+def normalize_labels(labels):
+    """
+    Labels as they are matched against the model classes
+
+    Args:
+        labels (iterable): Labels as configured or typed by the user
+
+    Returns:
+        set: Stripped, lower-case labels, without empty ones
+    """
+    return {str(label).strip().lower() for label in labels} - {""}
+
+
+def resolve_dangerous_objects(config):
+    """
+    Labels considered dangerous by a configuration
+
+    The labels of detection.dangerous_objects are merged with every label
+    of the category groups in the top-level dangerous_objects section
+    (e.g. {"weapons": ["knife", "scissors"]}).
+
+    Args:
+        config (dict): Main configuration
+
+    Returns:
+        set: Lower-case labels
+    """
+    labels = list(config.get('detection', {}).get('dangerous_objects', []))
+    categories = config.get('dangerous_objects', {})
+    if isinstance(categories, dict):
+        for group in categories.values():
+            labels.extend(group)
+    else:
+        labels.extend(categories)
+    return normalize_labels(labels)
+
+
+class Detections:
+    """
+    Detections of one frame, in the pixel coordinates of that frame
+
+    Attributes:
+        boxes (numpy.ndarray): (N, 4) int [x, y, w, h] boxes
+        confidences (numpy.ndarray): (N,) class scores
+        class_ids (numpy.ndarray): (N,) class ids
+        labels (list): Class label of each detection
+        dangerous (numpy.ndarray): (N,) True for dangerous objects
+    """
+    def __init__(self, boxes, confidences, class_ids, labels, dangerous):
+        self.boxes = boxes
+        self.confidences = confidences
+        self.class_ids = class_ids
+        self.labels = labels
+        self.dangerous = dangerous
+
+    def __len__(self):
+        return len(self.labels)
+
+    def to_list(self):
+        """
+        Detections as (x, y, w, h, label, confidence, is_dangerous) tuples
+
+        Returns:
+            list: One tuple per detection
+        """
+        return [(x, y, w, h, label, confidence, is_dangerous)
+                for (x, y, w, h), label, confidence, is_dangerous
+                in zip(self.boxes.tolist(), self.labels, self.confidences.tolist(),
+                       self.dangerous.tolist())]
+
+
+class DetectionEngine:
+    """
+    Model inference shared by ObjectDetector and the GUI
+
+    detect() takes frames and returns Detections without side effects: no
+    drawing, alerting or storage. Input images are letterboxed (resized
+    with their aspect ratio kept, then padded) into reused buffers, one
+    pair per input size and batch size, and the time spent in each stage
+    is recorded so the engine can be benchmarked on its own.
+
+    A cv2.dnn.Net must not be used from several threads at once; use
+    replicate() to get one engine per worker thread.
+    """
+    def __init__(self, model, registry=None, confidence_threshold=0.5, dangerous_objects=(),
+                 dangerous_only=False):
+        """
+        Initialize the engine
+
+        Args:
+            model (LoadedModel): Loaded network
+            registry (ModelRegistry, optional): Registry used by replicate()
+            confidence_threshold (float): Minimum class score to keep a detection
+            dangerous_objects (iterable): Labels considered dangerous
+            dangerous_only (bool): Drop candidates of other classes before NMS
+        """
+        self.logger = logging.getLogger(__name__)
+        self.model = model
+        self.registry = registry
+        self.input_size = model.input_size
+        self.confidence_threshold = confidence_threshold
+        self.dangerous_only = dangerous_only
+        self.set_dangerous_objects(dangerous_objects)
+
+        self._buffers = {}  # (input size, batch size) -> (uint8 NHWC canvas, float32 NCHW blob)
+        self._geometries = {}  # (height, width, input size) -> (affine matrix, scale, pad_x, pad_y)
+        self.timings = {stage: deque(maxlen=200) for stage in STAGES}
+        self.last_timings = dict.fromkeys(STAGES, 0.0)
+        self.is_warm = False
+
+    @classmethod
+    def load(cls, registry, spec=None, input_size=None, confidence_threshold=0.5,
+             dangerous_objects=(), dangerous_only=False):
+        """
+        Load a model from a registry and wrap it in an engine
+
+        Args:
+            registry (ModelRegistry): Model registry
+            spec (ModelSpec or str, optional): Model to load, the default model if None
+            input_size (int, optional): Network input size, the model default if None
+            confidence_threshold (float): Minimum class score to keep a detection
+            dangerous_objects (iterable): Labels considered dangerous
+            dangerous_only (bool): Drop candidates of other classes before NMS
+
+        Returns:
+            DetectionEngine: Engine ready to detect
+        """
+        model = registry.load(spec, input_size)
+        return cls(model, registry, confidence_threshold, dangerous_objects, dangerous_only)
+
+    def replicate(self):
+        """
+        Create an engine with the same settings and its own copy of the network
+
+        Returns:
+            DetectionEngine: New engine, safe to use from another thread
+        """
+        if self.registry is None:
+            raise RuntimeError("Cannot replicate an engine created without a registry")
+        engine = DetectionEngine.load(self.registry, self.model.spec, self.model.input_size,
+                                      self.confidence_threshold, self.dangerous_objects,
+                                      self.dangerous_only)
+        engine.input_size = self.input_size
+        return engine
+
+    @property
+    def net(self):
+        return self.model.net
+
+    @property
+    def classes(self):
+        return self.model.classes
+
+    @property
+    def spec(self):
+        return self.model.spec
+
+    def set_dangerous_objects(self, dangerous_objects):
+        """
+        Replace the set of labels considered dangerous
+
+        The labels are compiled into a boolean mask over class ids, so
+        per-frame matching is a single array lookup.
+
+        Args:
+            dangerous_objects (iterable): Labels, matched exactly and case-insensitively
+        """
+        self.dangerous_objects = normalize_labels(dangerous_objects)
+        class_labels = [str(label).lower() for label in self.model.classes]
+        self.dangerous_mask = np.array([label in self.dangerous_objects for label in class_labels],
+                                       dtype=bool)
+        unknown = self.dangerous_objects.difference(class_labels)
+        if unknown:
+            self.logger.debug(f"Dangerous objects not detected by {self.model.spec.name}: "
+                              f"{', '.join(sorted(unknown))}")
+
+    def is_dangerous(self, label):
+        """Tell whether a label is one of the dangerous objects"""
+        return str(label).lower() in self.dangerous_objects
+
+    def _get_buffers(self, size, count):
+        key = (size, count)
+        if key not in self._buffers:
+            self._buffers[key] = (np.empty((count, size, size, 3), dtype=np.uint8),
+                                  np.empty((count, 3, size, size), dtype=np.float32))
+        return self._buffers[key]
+
+    def _letterbox_geometry(self, height, width, size):
+        """Affine transform fitting a height x width image in the size x size canvas"""
+        key = (height, width, size)
+        if key not in self._geometries:
+            scale = min(size / float(width), size / float(height))
+            pad_x = (size - int(round(width * scale))) // 2
+            pad_y = (size - int(round(height * scale))) // 2
+            # Pixel-center alignment identical to cv2.resize
+            offset = 0.5 * (scale - 1.0)
+            matrix = np.array([[scale, 0, pad_x + offset],
+                               [0, scale, pad_y + offset]], dtype=np.float32)
+            self._geometries[key] = (matrix, scale, pad_x, pad_y)
+        return self._geometries[key]
+
+    def _make_blob(self, images, size):
+        """
+        Letterbox images into the reused canvas and normalize them into the reused blob
+
+        Returns:
+            tuple: (blob, geometries) where geometries holds the (scale, pad_x,
+                   pad_y) of each image, or None when the model is stretched
+        """
+        spec = self.model.spec
+        canvas, blob = self._get_buffers(size, len(images))
+        geometries = []
+        for image, slot in zip(images, canvas):
+            if image.ndim == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            if spec.letterbox:
+                matrix, scale, pad_x, pad_y = self._letterbox_geometry(image.shape[0], image.shape[1], size)
+                cv2.warpAffine(image, matrix, (size, size), dst=slot, flags=cv2.INTER_LINEAR,
+                               borderMode=cv2.BORDER_CONSTANT, borderValue=LETTERBOX_FILL)
+                geometries.append((scale, pad_x, pad_y))
+            else:
+                cv2.resize(image, (size, size), dst=slot)
+                geometries.append(None)
+
+        channels = canvas[..., ::-1] if spec.swap_rb else canvas
+        np.copyto(blob, channels.transpose(0, 3, 1, 2), casting='unsafe')
+        if any(spec.mean):
+            blob -= np.asarray(spec.mean[:3], dtype=np.float32).reshape(1, 3, 1, 1)
+        blob *= spec.scale
+        return blob, geometries
+
+    def detect(self, frames, regions=None, input_sizes=None):
+        """
+        Detect objects in a list of frames
+
+        Frames with motion regions are analysed crop by crop, and crop boxes
+        are mapped back to full-frame coordinates before a single NMS per
+        frame. Images sharing an input size go through one forward pass.
+
+        Args:
+            frames (list): BGR frames
+            regions (list, optional): Per frame, a list of (x, y, w, h) crops or None
+            input_sizes (list, optional): Per frame network input size,
+                                          self.input_size by default
+
+        Returns:
+            list: Detections per input frame, in frame coordinates
+        """
+        regions = regions or [None] * len(frames)
+        input_sizes = input_sizes or [self.input_size] * len(frames)
+        spec = self.model.spec
+
+        groups = {}  # input size -> [(image, frame index, crop origin or None)]
+        for index, (frame, frame_regions, size) in enumerate(zip(frames, regions, input_sizes)):
+            group = groups.setdefault(size, [])
+            if frame_regions:
+                for x, y, w, h in frame_regions:
+                    group.append((frame[y:y + h, x:x + w], index, (x, y)))
+            else:
+                group.append((frame, index, None))
+
+        elapsed = dict.fromkeys(STAGES, 0.0)
+        candidates = [[] for _ in frames]
+        for size, group in groups.items():
+            started = time.perf_counter()
+            blob, geometries = self._make_blob([image for image, _, _ in group], size)
+            self.model.net.setInput(blob)
+            inferred = time.perf_counter()
+            outs = self.model.net.forward(self.model.output_layers)
+            decoded = time.perf_counter()
+            elapsed["preprocess"] += inferred - started
+            elapsed["inference"] += decoded - inferred
+
+            for (image, index, origin), geometry, image_outs in zip(
+                    group, geometries, split_batch_outputs(outs, len(group))):
+                height, width = image.shape[:2] if geometry is None else (size, size)
+                boxes, confidences, class_ids = decode_candidates(
+                    image_outs, width, height, self.confidence_threshold,
+                    class_mask=self.dangerous_mask if self.dangerous_only else None,
+                    letterbox=geometry, **spec.decode_params(size)
+                )
+                if origin is not None:
+                    boxes[:, 0] += origin[0]
+                    boxes[:, 1] += origin[1]
+                candidates[index].append((boxes, confidences, class_ids))
+            elapsed["postprocess"] += time.perf_counter() - decoded
+
+        started = time.perf_counter()
+        results = []
+        for frame_candidates in candidates:
+            boxes, confidences, class_ids = apply_nms(
+                np.concatenate([c[0] for c in frame_candidates]),
+                np.concatenate([c[1] for c in frame_candidates]),
+                np.concatenate([c[2] for c in frame_candidates]),
+                self.confidence_threshold, spec.nms_threshold
+            )
+            labels = [str(self.model.classes[class_id]) for class_id in class_ids.tolist()]
+            dangerous = self.dangerous_mask[class_ids]
+            results.append(Detections(boxes, confidences, class_ids, labels, dangerous))
+        elapsed["postprocess"] += time.perf_counter() - started
+
+        for stage, duration in elapsed.items():
+            self.timings[stage].append(duration)
+        self.last_timings = elapsed
+        return results
+
+    def warm_up(self, runs=1):
+        """
+        Run forward passes on a blank image before the first real frame
+
+        The first forward of a cv2.dnn.Net allocates its layer buffers and
+        picks its kernels, which makes it several times slower than the
+        following ones. Warm-up runs are not recorded in the stage timings.
+
+        Args:
+            runs (int): Number of forward passes
+
+        Returns:
+            list: Duration of each forward pass, in seconds
+        """
+        size = self.input_size
+        blob, _ = self._make_blob([np.zeros((size, size, 3), dtype=np.uint8)], size)
+        durations = []
+        for _ in range(max(0, int(runs))):
+            started = time.perf_counter()
+            self.model.net.setInput(blob)
+            self.model.net.forward(self.model.output_layers)
+            durations.append(time.perf_counter() - started)
+        self.is_warm = True
+        if durations:
+            self.logger.info(f"Warm-up of {self.model.spec.name}: first forward "
+                             f"{durations[0] * 1000:.0f} ms, last {durations[-1] * 1000:.0f} ms")
+        return durations
+
+    def get_timing_stats(self):
+        """
+        Get per-stage timing statistics
+
+        Returns:
+            dict: For each stage, number of samples and mean/p95 time in milliseconds
+        """
+        stats = {}
+        for stage, samples in self.timings.items():
+            if samples:
+                values = np.array(samples) * 1000.0
+                stats[stage] = {"samples": int(values.size), "mean_ms": float(values.mean()),
+                                "p95_ms": float(np.percentile(values, 95))}
+            else:
+                stats[stage] = {"samples": 0, "mean_ms": 0.0, "p95_ms": 0.0}
+        return stats
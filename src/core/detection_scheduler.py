@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import time
+
+
+def load_optimization_config(config_path):
+    """
+    Load optimization.json stored alongside the main configuration file
+
+    Both the directory of config_path and its config/ subdirectory are
+    searched, so the root config.json and config/config.json both find
+    config/optimization.json.
+
+    Args:
+        config_path (str): Path to the main configuration file
+
+    Returns:
+        dict: Optimization settings, empty if no file was found
+    """
+    base_dir = os.path.dirname(os.path.abspath(config_path))
+    for candidate in (os.path.join(base_dir, 'optimization.json'),
+                      os.path.join(base_dir, 'config', 'optimization.json')):
+        if os.path.exists(candidate):
+            try:
+                with open(candidate, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logging.getLogger(__name__).error(
+                    f"Error loading optimization config {candidate}: {str(e)}")
+    return {}
+
+
+class DetectionScheduler:
+    """
+    Decide which frames get a full inference pass
+
+    A frame is selected when at least frame_skip frames were skipped since
+    the last inference and the minimum interval (given directly in
+    milliseconds or derived from a target inference FPS) has elapsed.
+    Frames that are not selected should reuse the last detection results.
+    """
+    def __init__(self, frame_skip=0, min_interval_ms=0, target_fps=None):
+        """
+        Initialize the scheduler
+
+        Args:
+            frame_skip (int): Number of frames to skip between two inferences
+            min_interval_ms (float): Minimum time between two inferences
+            target_fps (float, optional): Maximum inference rate, in frames per second
+        """
+        self.frame_skip = max(0, int(frame_skip))
+        self.min_interval = max(0.0, float(min_interval_ms)) / 1000.0
+        self.target_fps = target_fps
+        if target_fps:
+            self.min_interval = max(self.min_interval, 1.0 / float(target_fps))
+        self.base_min_interval = self.min_interval
+
+        self.frames_seen = 0
+        self.frames_detected = 0
+        self._frames_since_detection = None
+        self._last_detection_time = None
+
+    @classmethod
+    def from_config(cls, config, optimization_config=None):
+        """
+        Build a scheduler from the application configuration
+
+        detection.frame_skip takes precedence over optimization.json's
+        processing.skip_frames; advanced.detection_interval gives the
+        minimum interval in milliseconds and detection.target_fps an
+        optional inference rate cap.
+
+        Args:
+            config (dict): Main configuration
+            optimization_config (dict, optional): Content of optimization.json
+
+        Returns:
+            DetectionScheduler: Configured scheduler
+        """
+        detection = config.get('detection', {})
+        processing = (optimization_config or {}).get('processing', {})
+
+        frame_skip = detection.get('frame_skip', processing.get('skip_frames', 0))
+        min_interval_ms = config.get('advanced', {}).get('detection_interval', 0)
+        target_fps = detection.get('target_fps')
+
+        return cls(frame_skip=frame_skip, min_interval_ms=min_interval_ms,
+                   target_fps=target_fps)
+
+    def should_detect(self, now=None):
+        """
+        Register a new frame and tell whether it must go through inference
+
+        Args:
+            now (float, optional): Monotonic timestamp of the frame
+
+        Returns:
+            bool: True if the frame should be analysed
+        """
+        now = time.monotonic() if now is None else now
+        self.frames_seen += 1
+
+        if self._frames_since_detection is not None:
+            self._frames_since_detection += 1
+            if self._frames_since_detection <= self.frame_skip:
+                return False
+            if now - self._last_detection_time < self.min_interval:
+                return False
+
+        self._frames_since_detection = 0
+        self._last_detection_time = now
+        self.frames_detected += 1
+        return True
+
+    def set_min_interval_ms(self, interval_ms):
+        """
+        Override the minimum interval, never going below the configured one
+
+        Args:
+            interval_ms (float): Requested minimum time between two inferences
+        """
+        self.min_interval = max(self.base_min_interval, float(interval_ms) / 1000.0)
+
+    def reset(self):
+        """Force inference on the next frame"""
+        self._frames_since_detection = None
+        self._last_detection_time = None
+
+    def get_stats(self):
+        """
+        Get scheduling statistics
+
+        Returns:
+            dict: Frames seen, frames analysed and the resulting ratio
+        """
+        ratio = self.frames_detected / self.frames_seen if self.frames_seen else 0.0
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_detected": self.frames_detected,
+            "detection_ratio": ratio
+        }
@@ -0,0 +1,238 @@
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+FORMATS = {
+    'jpg': cv2.IMWRITE_JPEG_QUALITY,
+    'webp': cv2.IMWRITE_WEBP_QUALITY
+}
+
+
+class ImageWriter:
+    """
+    Write images to disk on background workers
+
+    save() reserves a unique file name and returns it right away; the
+    image is encoded (downscaled to max_dimension, at a fixed quality) and
+    written by a worker. The queue is bounded: when it is full the image
+    is dropped and counted rather than stalling the caller. Files are
+    written under a temporary name and renamed, so a reader never sees a
+    partial image.
+    """
+    def __init__(self, workers=2, queue_size=64, image_format='jpg', quality=90, max_dimension=0):
+        """
+        Initialize the writer
+
+        Args:
+            workers (int): Number of writer threads
+            queue_size (int): Maximum number of images waiting to be written
+            image_format (str): 'jpg' or 'webp'
+            quality (int): Encoding quality (0-100)
+            max_dimension (int): Longest side of written images, 0 to keep the original size
+        """
+        if image_format not in FORMATS:
+            raise ValueError(f"Unsupported image format: {image_format}")
+        self.logger = logging.getLogger(__name__)
+        self.image_format = image_format
+        self.quality = int(quality)
+        self.max_dimension = int(max_dimension)
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.bytes_written = 0
+        self.max_backlog = 0
+        self.write_times = deque(maxlen=500)
+
+        self._threads = []
+        for worker_id in range(max(1, int(workers))):
+            thread = threading.Thread(target=self._worker, name=f"image-writer-{worker_id}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a writer from the advanced.image_writer section of the configuration
+
+        Args:
+            config (dict): Application configuration
+
+        Returns:
+            ImageWriter: The writer, with its workers started
+        """
+        settings = config.get('advanced', {}).get('image_writer', {})
+        return cls(workers=settings.get('workers', 2),
+                   queue_size=settings.get('queue_size', 64),
+                   image_format=settings.get('format', 'jpg'),
+                   quality=settings.get('quality', 90),
+                   max_dimension=settings.get('max_dimension', 0))
+
+    def reserve_path(self, directory, prefix, extension=None):
+        """
+        Build a file name no other save() of this process will use
+
+        Args:
+            directory (str): Output directory, created if needed
+            prefix (str): Start of the file name
+            extension (str, optional): File extension, the writer format by default
+
+        Returns:
+            str: Path of the future file
+        """
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return os.path.join(directory, f"{prefix}_{timestamp}_{next(self._counter):04d}."
+                                       f"{extension or self.image_format}")
+
+    def save(self, image, directory, prefix):
+        """
+        Queue an image under a new unique name
+
+        Args:
+            image (numpy.ndarray): BGR image, encoded with the writer settings
+            directory (str): Output directory
+            prefix (str): Start of the file name
+
+        Returns:
+            str: Path the image will be written to, None if it was dropped
+        """
+        path = self.reserve_path(directory, prefix)
+        return path if self.submit(path, image) else None
+
+    def submit(self, path, data):
+        """
+        Queue an image for a given path
+
+        Args:
+            path (str): Destination, usually from reserve_path
+            data: BGR image (numpy.ndarray) to encode, or already encoded bytes written as-is
+
+        Returns:
+            bool: False if the queue was full and the image was dropped
+        """
+        try:
+            self.queue.put_nowait((path, data, time.monotonic()))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            self.logger.warning(f"Image writer backlog full, dropped {os.path.basename(path)}")
+            return False
+        with self._lock:
+            self.max_backlog = max(self.max_backlog, self.queue.qsize())
+        return True
+
+    def _encode(self, image):
+        height, width = image.shape[:2]
+        if self.max_dimension > 0 and max(height, width) > self.max_dimension:
+            scale = self.max_dimension / max(height, width)
+            image = cv2.resize(image, (max(1, int(round(width * scale))), max(1, int(round(height * scale)))),
+                               interpolation=cv2.INTER_AREA)
+        success, buffer = cv2.imencode(f".{self.image_format}", image,
+                                       [FORMATS[self.image_format], self.quality])
+        if not success:
+            raise IOError("image encoding failed")
+        return buffer.tobytes()
+
+    def _worker(self):
+        while True:
+            path, data, queued_at = self.queue.get()
+            started = time.monotonic()
+            try:
+                if isinstance(data, np.ndarray):
+                    data = self._encode(data)
+                temporary = f"{path}.tmp"
+                with open(temporary, 'wb') as f:
+                    f.write(data)
+                os.replace(temporary, path)
+                with self._lock:
+                    self.written += 1
+                    self.bytes_written += len(data)
+                    self.write_times.append(time.monotonic() - started)
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                self.logger.error(f"Failed to write image {path}: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every queued image has been written
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if the backlog is empty
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def get_stats(self):
+        """
+        Get the writer metrics
+
+        Returns:
+            dict: Backlog, written/dropped/failed counts, bytes written and write times
+        """
+        with self._lock:
+            times = np.array(self.write_times) * 1000.0
+            return {
+                "backlog": self.queue.unfinished_tasks,
+                "max_backlog": self.max_backlog,
+                "capacity": self.queue.maxsize,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "bytes_written": self.bytes_written,
+                "mean_write_ms": float(times.mean()) if times.size else 0.0,
+                "p95_write_ms": float(np.percentile(times, 95)) if times.size else 0.0
+            }
+
+
+_writer = None
+_writer_settings = None
+_writer_lock = threading.Lock()
+
+
+def get_image_writer(config=None):
+    """
+    Process-wide image writer, shared by alerts, detections and screenshots
+
+    The writer is created by the first call, which should be made at
+    startup with the application configuration; the writer is then
+    injected where images are saved. A later call with different
+    advanced.image_writer settings still gets the existing writer, and a
+    warning is logged.
+
+    Args:
+        config (dict, optional): Configuration used if the writer does not exist yet
+
+    Returns:
+        ImageWriter: The shared writer
+    """
+    global _writer, _writer_settings
+    with _writer_lock:
+        settings = (config or {}).get('advanced', {}).get('image_writer', {})
+        if _writer is None:
+            _writer = ImageWriter.from_config(config or {})
+            _writer_settings = settings
+        elif config is not None and settings != _writer_settings:
+            logging.getLogger(__name__).warning(
+                f"Image writer already created with {_writer_settings}, ignoring settings {settings}")
+        return _writer
@@ -0,0 +1,362 @@
+import logging
+import os
+import time
+
+import cv2
+
+SUPPORTED_INPUT_SIZES = (320, 416, 608)
+PRECISIONS = ('fp32', 'fp16', 'int8')
+
+# Built-in entries; the "models.available" config section can override or extend them
+DEFAULT_MODELS = {
+    "yolov3": {
+        "format": "darknet",
+        "weights": "yolov3.weights",
+        "config": "yolov3.cfg",
+        "names": "coco.names",
+        "input_size": 416,
+        "scale": 1 / 255.0,
+        "mean": [0, 0, 0],
+        "swap_rb": True,
+        "nms_threshold": 0.4,
+        "box_units": "relative",
+        "objectness": False
+    },
+    "yolov3-tiny": {
+        "format": "darknet",
+        "weights": "yolov3-tiny.weights",
+        "config": "yolov3-tiny.cfg",
+        "names": "coco.names",
+        "input_size": 416,
+        "scale": 1 / 255.0,
+        "mean": [0, 0, 0],
+        "swap_rb": True,
+        "nms_threshold": 0.4,
+        "box_units": "relative",
+        "objectness": False
+    },
+    "yolov3-onnx": {
+        "format": "onnx",
+        "weights": "yolov3.onnx",
+        "config": None,
+        "names": "coco.names",
+        "input_size": 416,
+        "scale": 1 / 255.0,
+        "mean": [0, 0, 0],
+        "swap_rb": True,
+        "nms_threshold": 0.4,
+        "box_units": "pixels",
+        "objectness": True,
+        "fixed_input_size": True
+    },
+    # Produced offline from yolov3.onnx by quantize_model.py
+    "yolov3-int8": {
+        "format": "onnx",
+        "weights": "yolov3-int8.onnx",
+        "config": None,
+        "names": "coco.names",
+        "input_size": 416,
+        "scale": 1 / 255.0,
+        "mean": [0, 0, 0],
+        "swap_rb": True,
+        "nms_threshold": 0.4,
+        "box_units": "pixels",
+        "objectness": True,
+        "fixed_input_size": True,
+        "precision": "int8"
+    }
+}
+
+
+def resolve_precision(config):
+    """
+    Inference precision requested by advanced.optimization
+
+    advanced.optimization.precision is one of 'fp32', 'fp16' or 'int8';
+    the older use_float16 flag is honoured when it is not set.
+
+    Args:
+        config (dict): Main configuration
+
+    Returns:
+        str: Requested precision
+    """
+    optimization = config.get('advanced', {}).get('optimization', {})
+    precision = optimization.get('precision')
+    if precision is None:
+        precision = 'fp16' if optimization.get('use_float16', False) else 'fp32'
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+    return precision
+
+
+class ModelSpec:
+    """
+    Description of one detection model: files, preprocessing and decoding
+
+    Attributes:
+        name (str): Registry name
+        format (str): 'darknet' or 'onnx'
+        weights, config, names (str): Paths of the model files, resolved against model_dir
+        input_size (int): Default square network input size
+        scale (float), mean (tuple), swap_rb (bool): blobFromImage parameters
+        nms_threshold (float): IoU threshold used by NMS
+        box_units (str): 'relative' when boxes are normalized to [0, 1],
+                         'pixels' when they are in network input pixels
+        objectness (bool): True when class scores must be multiplied by the
+                           objectness column (most ONNX exports)
+        fixed_input_size (bool): True when the network cannot be reshaped
+        letterbox (bool): Keep the aspect ratio and pad instead of stretching
+        precision (str): 'int8' for offline-quantized models, 'fp32' otherwise
+    """
+    def __init__(self, name, entry, model_dir):
+        self.name = name
+        self.format = entry.get('format', 'darknet')
+        self.weights = self._resolve(model_dir, entry.get('weights'))
+        self.config = self._resolve(model_dir, entry.get('config'))
+        self.names = self._resolve(model_dir, entry.get('names', 'coco.names'))
+        self.input_size = int(entry.get('input_size', 416))
+        self.scale = float(entry.get('scale', 1 / 255.0))
+        self.mean = tuple(entry.get('mean', [0, 0, 0]))
+        self.swap_rb = bool(entry.get('swap_rb', True))
+        self.nms_threshold = float(entry.get('nms_threshold', 0.4))
+        # ONNX exports usually output boxes in input pixels with a separate objectness
+        is_onnx = self.format == 'onnx'
+        self.box_units = entry.get('box_units', 'pixels' if is_onnx else 'relative')
+        self.objectness = bool(entry.get('objectness', is_onnx))
+        self.fixed_input_size = bool(entry.get('fixed_input_size', is_onnx))
+        self.letterbox = bool(entry.get('letterbox', True))
+        self.precision = entry.get('precision', 'fp32')
+
+    @staticmethod
+    def _resolve(model_dir, path):
+        if not path:
+            return None
+        return path if os.path.isabs(path) else os.path.join(str(model_dir), path)
+
+    def required_files(self):
+        """Model files that must exist on disk"""
+        return [p for p in (self.weights, self.config, self.names) if p]
+
+    def missing_files(self):
+        """Required model files that are not on disk"""
+        return [p for p in self.required_files() if not os.path.exists(p)]
+
+    def decode_params(self, input_size):
+        """Keyword arguments for decode_candidates matching this model's output layout"""
+        return {
+            "input_size": input_size if self.box_units == 'pixels' else None,
+            "objectness": self.objectness
+        }
+
+
+class LoadedModel:
+    """A network loaded from a ModelSpec, with its output layers and class names"""
+    def __init__(self, spec, net, output_layers, classes, input_size, precision='fp32'):
+        self.spec = spec
+        self.net = net
+        self.output_layers = output_layers
+        self.classes = classes
+        self.input_size = input_size
+        self.precision = precision
+
+
+class ModelRegistry:
+    """
+    Registry of detection models available to a deployment
+
+    The "models" configuration section selects the default model, can add
+    or override entries under "available", and can pick a model and input
+    size per camera under "cameras":
+
+        "models": {
+            "default": "yolov3-tiny",
+            "available": {"my-model": {"format": "onnx", "weights": "my.onnx"}},
+            "cameras": {"0": {"model": "yolov3", "input_size": 608}}
+        }
+    """
+    def __init__(self, model_dir='models', models_config=None, precision='fp32'):
+        """
+        Initialize the registry
+
+        Args:
+            model_dir (str): Directory relative model paths are resolved against
+            models_config (dict, optional): The "models" configuration section
+            precision (str): Default inference precision, see resolve_precision
+        """
+        self.logger = logging.getLogger(__name__)
+        self.model_dir = str(model_dir)
+        models_config = models_config or {}
+
+        self.entries = {name: dict(entry) for name, entry in DEFAULT_MODELS.items()}
+        for name, entry in models_config.get('available', {}).items():
+            self.register(name, entry)
+
+        self.default_model = models_config.get('default', 'yolov3')
+        self.camera_settings = {str(k): v for k, v in models_config.get('cameras', {}).items()}
+        self.precision = precision
+
+    @classmethod
+    def from_config(cls, config, model_dir='models'):
+        """
+        Build a registry from the application configuration
+
+        Args:
+            config (dict): Main configuration
+            model_dir (str): Directory containing the model files
+
+        Returns:
+            ModelRegistry: Configured registry
+        """
+        return cls(model_dir, config.get('models', {}), resolve_precision(config))
+
+    def register(self, name, entry):
+        """
+        Add a model entry, or override fields of an existing one
+
+        Args:
+            name (str): Model name
+            entry (dict): Entry fields (format, weights, config, names, input_size, ...)
+        """
+        self.entries[name] = {**self.entries.get(name, {}), **entry}
+
+    def names(self):
+        """Names of all registered models"""
+        return sorted(self.entries)
+
+    def get(self, name=None):
+        """
+        Get the specification of a model
+
+        Args:
+            name (str, optional): Model name, the default model if None
+
+        Returns:
+            ModelSpec: Model specification
+
+        Raises:
+            KeyError: If the model is not registered
+        """
+        name = name or self.default_model
+        if name not in self.entries:
+            raise KeyError(f"Unknown model '{name}', available: {', '.join(self.names())}")
+        return ModelSpec(name, self.entries[name], self.model_dir)
+
+    def for_camera(self, camera_id):
+        """
+        Model and input size configured for a camera
+
+        Args:
+            camera_id: Camera index or source identifier
+
+        Returns:
+            tuple: (ModelSpec, input_size)
+        """
+        settings = self.camera_settings.get(str(camera_id), {})
+        spec = self.get(settings.get('model'))
+        input_size = int(settings.get('input_size', spec.input_size))
+        return spec, self.check_input_size(spec, input_size, camera_id)
+
+    def check_input_size(self, spec, input_size, camera_id=None):
+        """
+        Validate a network input size configured for a model
+
+        Args:
+            spec (ModelSpec): Model the size is used with
+            input_size (int): Configured size
+            camera_id: Camera the size is configured for, for the logs
+
+        Returns:
+            int: The size to use (the model's own size if it is fixed)
+
+        Raises:
+            ValueError: If the size is not a multiple of 32
+        """
+        input_size = int(input_size)
+        if spec.fixed_input_size and input_size != spec.input_size:
+            self.logger.warning(f"Model {spec.name} has a fixed input size, "
+                                f"ignoring {input_size} for camera {camera_id}")
+            input_size = spec.input_size
+        if input_size % 32 != 0:
+            raise ValueError(f"Input size must be a multiple of 32, got {input_size}")
+        if input_size not in SUPPORTED_INPUT_SIZES:
+            self.logger.warning(f"Input size {input_size} is not one of {SUPPORTED_INPUT_SIZES}")
+        return input_size
+
+    def _int8_variant(self, spec):
+        """Offline-quantized variant of a model, if registered and on disk"""
+        if spec.precision == 'int8':
+            return spec
+        name = f"{spec.name}-int8"
+        if name in self.entries:
+            variant = self.get(name)
+            if not variant.missing_files():
+                return variant
+        self.logger.warning(f"No INT8 variant of {spec.name} found ({name}), running FP32; "
+                            f"create one with quantize_model.py")
+        return spec
+
+    def _set_precision(self, net, spec, precision):
+        """Select the OpenCV DNN target matching a precision, return the effective precision"""
+        if spec.precision == 'int8':
+            return 'int8'
+        if precision == 'fp16':
+            target = getattr(cv2.dnn, 'DNN_TARGET_CPU_FP16', None)
+            if target is None:
+                self.logger.warning(f"OpenCV {cv2.__version__} has no CPU FP16 target, running FP32")
+                return 'fp32'
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            net.setPreferableTarget(target)
+            return 'fp16'
+        return 'fp32'
+
+    def load(self, spec, input_size=None, precision=None):
+        """
+        Load a model through cv2.dnn.readNet
+
+        Args:
+            spec (ModelSpec or str): Model specification or registry name
+            input_size (int, optional): Network input size, the model default if None
+            precision (str, optional): 'fp32', 'fp16' (OpenCV CPU FP16 target) or
+                                       'int8' (the "<name>-int8" model variant),
+                                       the registry precision if None
+
+        Returns:
+            LoadedModel: The loaded network
+
+        Raises:
+            FileNotFoundError: If a model file is missing
+        """
+        if isinstance(spec, str) or spec is None:
+            spec = self.get(spec)
+        precision = precision or self.precision
+        if precision == 'int8':
+            spec = self._int8_variant(spec)
+            if spec.fixed_input_size:
+                input_size = spec.input_size
+
+        missing = spec.missing_files()
+        if missing:
+            raise FileNotFoundError(f"Model file not found: {missing[0]}")
+
+        started = time.perf_counter()
+        if spec.config:
+            net = cv2.dnn.readNet(spec.weights, spec.config)
+        else:
+            net = cv2.dnn.readNet(spec.weights)
+        self.logger.info(f"Read model {spec.name} in {time.perf_counter() - started:.2f}s")
+
+        try:
+            output_layers = list(net.getUnconnectedOutLayersNames())
+        except AttributeError:
+            layer_names = net.getLayerNames()
+            output_layers = [layer_names[int(i) - 1]
+                             for i in net.getUnconnectedOutLayers().flatten()]
+
+        with open(spec.names, "r") as f:
+            classes = [line.strip() for line in f.readlines()]
+
+        effective = self._set_precision(net, spec, precision)
+        self.logger.info(f"Loaded model {spec.name} ({spec.format}, {effective}) "
+                         f"with input size {input_size or spec.input_size}")
+        return LoadedModel(spec, net, output_layers, classes, input_size or spec.input_size, effective)
@@ -0,0 +1,224 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionDetector:
+    """
+    Cheap motion stage run before object detection
+
+    Frames are downscaled to a small grayscale image and compared with a
+    running-average background (or a MOG2 background subtractor). Only
+    frames where a large enough share of pixels changed are reported as
+    having motion, so static scenes can skip the YOLO forward pass.
+    """
+    def __init__(self, sensitivity=0.3, method='diff', downscale_width=160,
+                 idle_check_interval=30.0, learning_rate=0.05):
+        """
+        Initialize the motion detector
+
+        Args:
+            sensitivity (float): Between 0 and 1, higher values react to smaller changes
+            method (str): 'diff' for running-average differencing, 'mog2' for
+                          background subtraction
+            downscale_width (int): Width of the image motion is computed on
+            idle_check_interval (float): Seconds after which a frame is reported
+                                         as moving even in a static scene, so the
+                                         detector re-checks it (0 disables)
+            learning_rate (float): Background adaptation speed for 'diff'
+        """
+        self.sensitivity = min(max(float(sensitivity), 0.0), 1.0)
+        self.method = method
+        self.downscale_width = downscale_width
+        self.idle_check_interval = idle_check_interval
+        self.learning_rate = learning_rate
+
+        # Higher sensitivity means a lower per-pixel threshold and a smaller changed area
+        self.pixel_threshold = int(5 + (1.0 - self.sensitivity) * 45)
+        self.min_area_ratio = 0.001 + (1.0 - self.sensitivity) * 0.01
+
+        self._background = None
+        self._subtractor = None
+        if method == 'mog2':
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(
+                history=500, varThreshold=self.pixel_threshold, detectShadows=False)
+
+        self.last_mask = None
+        self.last_activity = 0.0
+        self.mean_activity = 0.0
+        self.frames = 0
+        self.motion_frames = 0
+        self._last_motion_time = None
+        self._last_pass_time = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a motion detector from the detection section of the configuration
+
+        Args:
+            config (dict): Main configuration
+
+        Returns:
+            MotionDetector: Configured detector, or None if motion gating is disabled
+        """
+        detection = config.get('detection', {})
+        if not detection.get('enable_motion_detection', False):
+            return None
+        return cls(
+            sensitivity=detection.get('motion_sensitivity', 0.3),
+            method=detection.get('motion_method', 'diff'),
+            idle_check_interval=detection.get('motion_idle_check_interval', 30.0)
+        )
+
+    def _prepare(self, frame):
+        height, width = frame.shape[:2]
+        scale = self.downscale_width / float(width)
+        small = cv2.resize(frame, (self.downscale_width, max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def detect(self, frame, now=None):
+        """
+        Update the background model and tell whether the frame shows motion
+
+        Args:
+            frame (numpy.ndarray): BGR or grayscale frame
+            now (float, optional): Monotonic timestamp of the frame
+
+        Returns:
+            bool: True if the frame should go through object detection
+        """
+        now = time.monotonic() if now is None else now
+        small = self._prepare(frame)
+        self.frames += 1
+
+        if self._subtractor is not None:
+            mask = self._subtractor.apply(small)
+        elif self._background is None:
+            self._background = small.astype(np.float32)
+            mask = np.full(small.shape, 255, dtype=np.uint8)
+        else:
+            diff = cv2.absdiff(small, cv2.convertScaleAbs(self._background))
+            _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+            cv2.accumulateWeighted(small, self._background, self.learning_rate)
+
+        mask = cv2.dilate(mask, None, iterations=2)
+        self.last_mask = mask
+        self.last_activity = cv2.countNonZero(mask) / float(mask.size)
+        self.mean_activity = 0.95 * self.mean_activity + 0.05 * self.last_activity
+
+        has_motion = self.last_activity >= self.min_area_ratio
+        if has_motion:
+            self.motion_frames += 1
+            self._last_motion_time = now
+        elif (self.idle_check_interval and self._last_pass_time is not None
+                and now - self._last_pass_time >= self.idle_check_interval):
+            has_motion = True
+
+        if has_motion:
+            self._last_pass_time = now
+        return has_motion
+
+    def get_motion_regions(self, frame_shape, padding=16, min_size=96,
+                           max_regions=4, max_area_ratio=0.5):
+        """
+        Bounding regions of change from the last motion mask, in full-frame coordinates
+
+        Nearby regions are padded, grown to min_size and merged when they
+        overlap. When the change is too scattered (more than max_regions
+        regions) or too large (more than max_area_ratio of the frame),
+        cropping would not save anything and None is returned.
+
+        Args:
+            frame_shape (tuple): Shape of the full-resolution frame
+            padding (int): Margin added around each region, in pixels
+            min_size (int): Minimum width and height of a region, in pixels
+            max_regions (int): Maximum number of regions to return
+            max_area_ratio (float): Maximum share of the frame covered by regions
+
+        Returns:
+            list: (x, y, w, h) regions sorted by decreasing area, or None
+                  if the full frame should be analysed
+        """
+        if self.last_mask is None:
+            return None
+
+        frame_height, frame_width = frame_shape[:2]
+        mask_height, mask_width = self.last_mask.shape[:2]
+        scale_x = frame_width / float(mask_width)
+        scale_y = frame_height / float(mask_height)
+
+        # OpenCV 3 returns (image, contours, hierarchy), OpenCV 4 (contours, hierarchy)
+        contours = cv2.findContours(self.last_mask, cv2.RETR_EXTERNAL,
+                                    cv2.CHAIN_APPROX_SIMPLE)[-2]
+        if not contours:
+            return None
+
+        rects = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            rects.append(self._fit_region(
+                x * scale_x - padding, y * scale_y - padding,
+                w * scale_x + 2 * padding, h * scale_y + 2 * padding,
+                min_size, frame_width, frame_height))
+
+        # Merge overlapping regions until no pair overlaps
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    ax, ay, aw, ah = rects[i]
+                    bx, by, bw, bh = rects[j]
+                    if ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah:
+                        x1, y1 = min(ax, bx), min(ay, by)
+                        x2, y2 = max(ax + aw, bx + bw), max(ay + ah, by + bh)
+                        rects[i] = (x1, y1, x2 - x1, y2 - y1)
+                        del rects[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+
+        total_area = sum(w * h for _, _, w, h in rects)
+        if len(rects) > max_regions or total_area > max_area_ratio * frame_width * frame_height:
+            return None
+
+        return sorted(rects, key=lambda r: r[2] * r[3], reverse=True)
+
+    @staticmethod
+    def _fit_region(x, y, w, h, min_size, frame_width, frame_height):
+        """Grow a region to min_size around its center and clip it to the frame"""
+        if w < min_size:
+            x -= (min_size - w) / 2.0
+            w = min_size
+        if h < min_size:
+            y -= (min_size - h) / 2.0
+            h = min_size
+        w = min(int(round(w)), frame_width)
+        h = min(int(round(h)), frame_height)
+        x = int(min(max(round(x), 0), frame_width - w))
+        y = int(min(max(round(y), 0), frame_height - h))
+        return (x, y, w, h)
+
+    def get_stats(self, now=None):
+        """
+        Get motion-activity metrics
+
+        Returns:
+            dict: Frame counts, share of static frames and activity levels
+        """
+        now = time.monotonic() if now is None else now
+        return {
+            "frames": self.frames,
+            "motion_frames": self.motion_frames,
+            "static_ratio": 1.0 - self.motion_frames / self.frames if self.frames else 0.0,
+            "last_activity": self.last_activity,
+            "mean_activity": self.mean_activity,
+            "seconds_since_motion": (now - self._last_motion_time
+                                     if self._last_motion_time is not None else None)
+        }
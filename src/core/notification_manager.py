@@ -1,12 +1,19 @@
 import logging
-import cv2
-from datetime import datetime
 import os
 
+from .image_writer import get_image_writer
+
 class NotificationManager:
-    def __init__(self):
+    def __init__(self, image_writer=None):
+        """
+        Initialize the notification manager
+        
+        Args:
+            image_writer (ImageWriter, optional): Writer for alert images, the shared one by default
+        """
         self.logger = logging.getLogger(__name__)
         self.logger.info("NotificationManager initialized")
+        self.image_writer = image_writer or get_image_writer()
         
         # Create alerts directory if it doesn't exist
         self.alerts_dir = "alerts"
@@ -21,16 +28,10 @@ class NotificationManager:
             confidence (float): Detection confidence score
             image (numpy.ndarray): Image frame containing the detected object
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"alert_{object_type}_{timestamp}.jpg"
-        filepath = os.path.join(self.alerts_dir, filename)
-        
-        # Save the image with detection
-        try:
-            cv2.imwrite(filepath, image)
-            self.logger.info(f"Alert image saved as {filepath}")
-        except Exception as e:
-            self.logger.error(f"Failed to save alert image: {str(e)}")
+        # Save the image with detection, in the background
+        filepath = self.image_writer.save(image, self.alerts_dir, f"alert_{object_type}")
+        if filepath is not None:
+            self.logger.info(f"Alert image queued as {filepath}")
         
         # Here you would implement actual notification sending (email, SMS, etc.)
         self.logger.info(f"Alert sent: {object_type} detected with {confidence:.2f} confidence")
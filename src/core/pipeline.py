@@ -0,0 +1,464 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class Stage:
+    """
+    One step of a Pipeline: a bounded input queue served by worker threads
+
+    func(item, worker_id) returns the item passed to the next stage, or None
+    to drop it (e.g. a frame the scheduler skips). With batch_size > 1,
+    func receives a list of up to batch_size items, collected for at most
+    batch_wait seconds, and returns a list of results in the same order.
+
+    When the input queue is full, a drop_oldest stage discards its oldest
+    item to make room (fresh frames matter more than old ones); other
+    stages apply backpressure, blocking the upstream stage for up to
+    put_timeout seconds before dropping the new item.
+    """
+    def __init__(self, name, func, workers=1, queue_size=8, drop_oldest=False,
+                 ordered=False, batch_size=1, batch_wait=0.0, put_timeout=1.0):
+        """
+        Initialize the stage
+
+        Args:
+            name (str): Stage name used in logs and statistics
+            func (callable): Processing function, see the class docstring
+            workers (int): Number of worker threads
+            queue_size (int): Capacity of the input queue
+            drop_oldest (bool): Drop the oldest queued item instead of blocking when full
+            ordered (bool): Emit results in input order even with several workers
+            batch_size (int): Maximum number of items handed to func at once
+            batch_wait (float): Seconds to wait for a batch to fill up
+            put_timeout (float): Seconds to block on a full queue before dropping
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.drop_oldest = drop_oldest
+        self.ordered = ordered
+        self.batch_size = max(1, int(batch_size))
+        self.batch_wait = batch_wait
+        self.put_timeout = put_timeout
+
+        self.lock = threading.Lock()
+        self.order_lock = threading.Lock()
+        self.pending = {}  # seq -> result or None, waiting for earlier sequence numbers
+        self.next_seq = 0
+        self.outbox = deque()  # (seq, result) in order, waiting to be sent to the next stage
+        self.forwarding = False  # A worker is sending the outbox
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.received = 0
+            self.processed = 0
+            self.filtered = 0
+            self.dropped = 0
+            self.errors = 0
+            self.max_depth = 0
+            self.busy_times = deque(maxlen=500)
+            self.wait_times = deque(maxlen=500)
+
+    def get_stats(self):
+        """
+        Get the stage metrics
+
+        Returns:
+            dict: Queue depth, item counters and time spent waiting and in the stage
+        """
+        with self.lock:
+            busy = np.array(self.busy_times) * 1000.0
+            wait = np.array(self.wait_times) * 1000.0
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "max_queue_depth": self.max_depth,
+                "received": self.received,
+                "processed": self.processed,
+                "filtered": self.filtered,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "mean_stage_ms": float(busy.mean()) if busy.size else 0.0,
+                "p95_stage_ms": float(np.percentile(busy, 95)) if busy.size else 0.0,
+                "mean_wait_ms": float(wait.mean()) if wait.size else 0.0
+            }
+
+
+class Source:
+    """
+    Entry of a Pipeline: a thread reading items from a device, e.g. a camera
+
+    read() returns the next item, or None when nothing could be read; the
+    failure is counted and the read retried after retry_delay seconds.
+    Every item read is submitted to the first stage, whose drop policy
+    applies when the pipeline falls behind. interval sets the minimum time
+    between two reads (0 reads as fast as read() returns).
+    """
+    def __init__(self, name, read, interval=0.0, retry_delay=0.1):
+        """
+        Initialize the source
+
+        Args:
+            name (str): Source name used in logs and statistics
+            read (callable): Function returning the next item or None
+            interval (float): Minimum seconds between two reads
+            retry_delay (float): Seconds to wait after a failed read
+        """
+        self.name = name
+        self.read = read
+        self.interval = interval
+        self.retry_delay = retry_delay
+
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.captured = 0
+            self.failed = 0
+            self.errors = 0
+            self.started_at = None
+            self.read_times = deque(maxlen=500)
+
+    def get_stats(self):
+        """
+        Get the source metrics
+
+        Returns:
+            dict: Item counters, capture rate and time spent reading
+        """
+        with self.lock:
+            busy = np.array(self.read_times) * 1000.0
+            elapsed = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+            return {
+                "captured": self.captured,
+                "failed": self.failed,
+                "errors": self.errors,
+                "fps": self.captured / elapsed if elapsed > 0 else 0.0,
+                "mean_stage_ms": float(busy.mean()) if busy.size else 0.0,
+                "p95_stage_ms": float(np.percentile(busy, 95)) if busy.size else 0.0
+            }
+
+
+class Pipeline:
+    """
+    Chain of stages, each on its own workers, connected by bounded queues
+
+    Every item gets a sequence number when it enters the pipeline. Ordered
+    stages re-sequence their results so the next stage receives items in
+    input order whatever worker finishes first; items dropped or filtered
+    anywhere upstream are skipped so the re-sequencer never waits for them.
+    Re-sequenced results are sent on by the ordered stage's own workers,
+    never under its lock: a caller discarding an item (e.g. put on a full
+    drop_oldest stage) does not wait for a downstream queue.
+
+    With a Source, the pipeline reads its own input on a capture thread;
+    items can still be submitted with put. With a report callable, a
+    thread calls it every report_interval seconds while the pipeline runs,
+    e.g. to log the metrics.
+    """
+    def __init__(self, stages, name='pipeline', source=None, report=None, report_interval=0.0):
+        """
+        Initialize the pipeline
+
+        Args:
+            stages (list): Stage objects, in processing order
+            name (str): Pipeline name used for worker thread names
+            source (Source, optional): Capture source feeding the first stage
+            report (callable, optional): Called periodically while running
+            report_interval (float): Seconds between two report calls, 0 to disable
+        """
+        self.logger = logging.getLogger(__name__)
+        self.stages = list(stages)
+        self.name = name
+        self.source = source
+        self.report = report
+        self.report_interval = report_interval
+        self.is_running = False
+        self._threads = []
+        self._seq_lock = threading.Lock()
+        self._next_seq = 0
+        self.submitted = 0
+
+    def start(self):
+        """Start the worker threads of every stage"""
+        if self.is_running:
+            return
+        self.is_running = True
+        for index, stage in enumerate(self.stages):
+            for worker_id in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(index, worker_id),
+                                          name=f"{self.name}-{stage.name}-{worker_id}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        names = [f"{stage.name}[{stage.workers}]" for stage in self.stages]
+        if self.source is not None:
+            with self.source.lock:
+                self.source.started_at = time.monotonic()
+            thread = threading.Thread(target=self._capture, name=f"{self.name}-{self.source.name}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            names.insert(0, self.source.name)
+        if self.report is not None and self.report_interval > 0:
+            thread = threading.Thread(target=self._report, name=f"{self.name}-report", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"Started {self.name}: " + " -> ".join(names))
+
+    def stop(self):
+        """Stop the workers, discard the items still queued and reset the sequencing"""
+        self.is_running = False
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for stage in self.stages:
+            while True:
+                try:
+                    stage.queue.get_nowait()
+                except queue.Empty:
+                    break
+            stage.pending = {}
+            stage.next_seq = 0
+            stage.outbox.clear()
+            stage.forwarding = False
+        with self._seq_lock:
+            self._next_seq = 0
+
+    def put(self, item):
+        """
+        Submit an item to the first stage
+
+        Args:
+            item: Input of the first stage's function
+
+        Returns:
+            bool: False if the item was dropped right away
+        """
+        with self._seq_lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self.submitted += 1
+        return self._send(0, seq, item)
+
+    def _send(self, index, seq, item):
+        """Queue an item for stage index (past the last stage, the item is done)"""
+        if index >= len(self.stages):
+            return True
+        stage = self.stages[index]
+        entry = (seq, time.monotonic(), item)
+
+        if stage.drop_oldest:
+            while True:
+                try:
+                    stage.queue.put_nowait(entry)
+                    break
+                except queue.Full:
+                    try:
+                        dropped = stage.queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                    with stage.lock:
+                        stage.dropped += 1
+                    self._discard(index, dropped[0])
+        else:
+            try:
+                stage.queue.put(entry, timeout=stage.put_timeout)
+            except queue.Full:
+                with stage.lock:
+                    stage.dropped += 1
+                self._discard(index, seq)
+                return False
+
+        with stage.lock:
+            stage.received += 1
+            stage.max_depth = max(stage.max_depth, stage.queue.qsize())
+        return True
+
+    def _discard(self, index, seq):
+        """Tell the ordered stages from index on that seq will never reach them"""
+        for later in range(index, len(self.stages)):
+            if self.stages[later].ordered:
+                self._complete(later, seq, None)
+
+    def _complete(self, index, seq, result):
+        """Forward a result of stage index; ordered stages queue it in their outbox, in sequence order"""
+        stage = self.stages[index]
+        if not stage.ordered:
+            if result is not None:
+                self._send(index + 1, seq, result)
+            return
+
+        with stage.order_lock:
+            stage.pending[seq] = result
+            while stage.next_seq in stage.pending:
+                ready_seq = stage.next_seq
+                ready = stage.pending.pop(ready_seq)
+                stage.next_seq += 1
+                if ready is not None:
+                    stage.outbox.append((ready_seq, ready))
+
+    def _forward(self, index):
+        """Send the outbox of an ordered stage to the next stage, one worker at a time to keep the order"""
+        stage = self.stages[index]
+        with stage.order_lock:
+            if stage.forwarding or not stage.outbox:
+                return
+            stage.forwarding = True
+        while True:
+            with stage.order_lock:
+                if not stage.outbox:
+                    stage.forwarding = False
+                    return
+                seq, item = stage.outbox.popleft()
+            # May block on a full queue: the lock is released, other workers keep completing
+            self._send(index + 1, seq, item)
+
+    def _collect(self, stage):
+        """Block for one entry, then wait up to batch_wait for the batch to fill up"""
+        try:
+            batch = [stage.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(stage.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _capture(self):
+        """Capture thread: read items from the source and submit them"""
+        source = self.source
+        while self.is_running:
+            started = time.monotonic()
+            try:
+                item = source.read()
+            except Exception as e:
+                self.logger.error(f"Error in {self.name} source {source.name}: {str(e)}")
+                with source.lock:
+                    source.errors += 1
+                time.sleep(source.retry_delay)
+                continue
+            finished = time.monotonic()
+
+            if item is None:
+                with source.lock:
+                    source.failed += 1
+                time.sleep(source.retry_delay)
+                continue
+            with source.lock:
+                source.captured += 1
+                source.read_times.append(finished - started)
+            self.put(item)
+
+            remaining = source.interval - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _report(self):
+        """Report thread: call report every report_interval seconds"""
+        next_report = time.monotonic() + self.report_interval
+        while self.is_running:
+            time.sleep(max(0.0, min(0.5, next_report - time.monotonic())))
+            if not self.is_running or time.monotonic() < next_report:
+                continue
+            next_report += self.report_interval
+            try:
+                self.report()
+            except Exception as e:
+                self.logger.error(f"Error in {self.name} report: {str(e)}")
+
+    def _worker(self, index, worker_id):
+        stage = self.stages[index]
+        while self.is_running:
+            batch = self._collect(stage)
+            if stage.ordered:
+                # Also sends results released by items discarded from other threads
+                self._forward(index)
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            failed = False
+            try:
+                if stage.batch_size > 1:
+                    results = stage.func([item for _, _, item in batch], worker_id)
+                else:
+                    results = [stage.func(batch[0][2], worker_id)]
+            except Exception as e:
+                self.logger.error(f"Error in {self.name} stage {stage.name}: {str(e)}")
+                results = [None] * len(batch)
+                failed = True
+            finished = time.monotonic()
+
+            with stage.lock:
+                stage.busy_times.append(finished - started)
+                stage.wait_times.extend(started - queued_at for _, queued_at, _ in batch)
+                if failed:
+                    stage.errors += len(batch)
+                else:
+                    kept = sum(result is not None for result in results)
+                    stage.processed += kept
+                    stage.filtered += len(batch) - kept
+
+            for (seq, _, _), result in zip(batch, results):
+                if result is None:
+                    self._discard(index, seq)
+                else:
+                    self._complete(index, seq, result)
+            if stage.ordered:
+                self._forward(index)
+
+    def get_stats(self):
+        """
+        Get the metrics of every stage
+
+        Returns:
+            dict: Source and stage name -> Source/Stage.get_stats(), plus the
+                number of submitted items
+        """
+        stats = {}
+        if self.source is not None:
+            stats[self.source.name] = self.source.get_stats()
+        stats.update((stage.name, stage.get_stats()) for stage in self.stages)
+        stats["submitted"] = self.submitted
+        return stats
+
+
+def format_stats(stats):
+    """
+    One-line summary of Pipeline.get_stats(), source and stages in order
+
+    Args:
+        stats (dict): Output of Pipeline.get_stats(), extra keys are ignored
+
+    Returns:
+        str: e.g. "capture 30.0 fps 1.2 ms | infer 120/300 in 41.0 ms (p95 55.2), ..."
+    """
+    parts = []
+    for name, stage in stats.items():
+        if not isinstance(stage, dict):
+            continue
+        if 'captured' in stage:
+            parts.append(f"{name} {stage['fps']:.1f} fps {stage['mean_stage_ms']:.1f} ms "
+                         f"({stage['failed']} failed reads)")
+        elif 'processed' in stage:
+            parts.append(f"{name} {stage['processed']}/{stage['received']} in "
+                         f"{stage['mean_stage_ms']:.1f} ms (p95 {stage['p95_stage_ms']:.1f}), "
+                         f"wait {stage['mean_wait_ms']:.1f} ms, "
+                         f"queue {stage['queue_depth']}/{stage['queue_capacity']}, "
+                         f"{stage['filtered']} filtered, {stage['dropped']} dropped, {stage['errors']} errors")
+    return " | ".join(parts)
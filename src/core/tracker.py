@@ -0,0 +1,215 @@
+import numpy as np
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Pairwise intersection-over-union of two sets of [x, y, w, h] boxes
+
+    Args:
+        boxes_a (numpy.ndarray): (N, 4) boxes
+        boxes_b (numpy.ndarray): (M, 4) boxes
+
+    Returns:
+        numpy.ndarray: (N, M) IoU matrix
+    """
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+
+    inter_w = np.clip(np.minimum(ax2[:, None], bx2[None, :]) -
+                      np.maximum(a[:, None, 0], b[None, :, 0]), 0, None)
+    inter_h = np.clip(np.minimum(ay2[:, None], by2[None, :]) -
+                      np.maximum(a[:, None, 1], b[None, :, 1]), 0, None)
+    inter = inter_w * inter_h
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+class Track:
+    """
+    One tracked object with a constant-velocity Kalman filter
+
+    The state is [cx, cy, w, h, vx, vy, vw, vh], with velocities expressed
+    per second so predictions stay valid when inference is skipped for a
+    variable number of frames.
+    """
+    def __init__(self, track_id, box, label, confidence, class_id, now):
+        x, y, w, h = [float(v) for v in box]
+        self.track_id = track_id
+        self.label = label
+        self.class_id = class_id
+        self.confidence = float(confidence)
+        self.state = np.array([x + w / 2, y + h / 2, w, h, 0, 0, 0, 0], dtype=np.float64)
+        self.covariance = np.diag([10.0, 10.0, 10.0, 10.0, 1e3, 1e3, 1e3, 1e3])
+        self.hits = 1
+        self.alerted = False
+        self.created_at = now
+        self.last_seen = now
+        self.last_time = now
+
+    @property
+    def box(self):
+        cx, cy, w, h = self.state[:4]
+        return (int(cx - w / 2), int(cy - h / 2), int(max(w, 1)), int(max(h, 1)))
+
+    def predict(self, now, process_noise):
+        dt = max(0.0, now - self.last_time)
+        self.last_time = now
+        if dt == 0:
+            return
+        transition = np.eye(8)
+        transition[:4, 4:] = np.eye(4) * dt
+        self.state = transition @ self.state
+        noise = np.diag([1.0, 1.0, 1.0, 1.0, 10.0, 10.0, 10.0, 10.0]) * process_noise * dt
+        self.covariance = transition @ self.covariance @ transition.T + noise
+
+    def update(self, box, confidence, measurement_noise, now):
+        x, y, w, h = [float(v) for v in box]
+        measurement = np.array([x + w / 2, y + h / 2, w, h])
+        observation = np.hstack([np.eye(4), np.zeros((4, 4))])
+        innovation = measurement - observation @ self.state
+        innovation_cov = observation @ self.covariance @ observation.T + np.eye(4) * measurement_noise
+        gain = self.covariance @ observation.T @ np.linalg.inv(innovation_cov)
+        self.state = self.state + gain @ innovation
+        self.covariance = (np.eye(8) - gain @ observation) @ self.covariance
+        self.confidence = float(confidence)
+        self.hits += 1
+        self.last_seen = now
+
+
+class ObjectTracker:
+    """
+    Lightweight IoU + Kalman multi-object tracker
+
+    Detections are associated with existing tracks of the same class by
+    greedy IoU matching on the predicted boxes. Between inference frames,
+    predict() moves tracks along their estimated velocity so overlays stay
+    current without running the detector.
+    """
+    def __init__(self, iou_threshold=0.3, max_age=2.0, min_hits=1,
+                 process_noise=1.0, measurement_noise=10.0):
+        """
+        Initialize the tracker
+
+        Args:
+            iou_threshold (float): Minimum IoU to associate a detection with a track
+            max_age (float): Seconds a track survives without a matching detection
+            min_hits (int): Detections needed before a track is confirmed
+            process_noise (float): Kalman process noise scale
+            measurement_noise (float): Kalman measurement noise, in pixels squared
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.tracks = []
+        self._next_id = 1
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a tracker from the detection.tracking section of the configuration
+
+        Args:
+            config (dict): Main configuration
+
+        Returns:
+            ObjectTracker: Configured tracker, or None if tracking is disabled
+        """
+        tracking = config.get('detection', {}).get('tracking', {})
+        if not tracking.get('enabled', False):
+            return None
+        return cls(
+            iou_threshold=tracking.get('iou_threshold', 0.3),
+            max_age=tracking.get('max_age', 2.0),
+            min_hits=tracking.get('min_hits', 1)
+        )
+
+    def predict(self, now):
+        """
+        Advance every track to time now and drop the expired ones
+
+        Args:
+            now (float): Monotonic timestamp
+
+        Returns:
+            list: Confirmed tracks at their predicted position
+        """
+        for track in self.tracks:
+            track.predict(now, self.process_noise)
+        self.tracks = [t for t in self.tracks if now - t.last_seen <= self.max_age]
+        return self.confirmed_tracks()
+
+    def update(self, boxes, confidences, labels, now, class_ids=None):
+        """
+        Associate a new set of detections with the tracks
+
+        Args:
+            boxes (numpy.ndarray): (N, 4) detected [x, y, w, h] boxes
+            confidences (numpy.ndarray): Detection scores
+            labels (list): Class label of each detection
+            now (float): Monotonic timestamp of the analysed frame
+            class_ids (numpy.ndarray, optional): Class id of each detection
+
+        Returns:
+            list: Tracks matched or created by these detections
+        """
+        self.predict(now)
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        if class_ids is None:
+            class_ids = [None] * len(boxes)
+
+        matched_tracks = []
+        unmatched = set(range(len(boxes)))
+        if self.tracks and len(boxes):
+            ious = iou_matrix(np.array([t.box for t in self.tracks]), boxes)
+            # Never associate different classes
+            same_label = np.array([[t.label == label for label in labels] for t in self.tracks])
+            ious = np.where(same_label, ious, 0.0)
+
+            used_tracks = set()
+            for flat in np.argsort(ious, axis=None)[::-1]:
+                t, d = np.unravel_index(flat, ious.shape)
+                if ious[t, d] < self.iou_threshold:
+                    break
+                if t in used_tracks or d not in unmatched:
+                    continue
+                track = self.tracks[t]
+                track.update(boxes[d], confidences[d], self.measurement_noise, now)
+                used_tracks.add(t)
+                unmatched.discard(d)
+                matched_tracks.append(track)
+
+        for d in sorted(unmatched):
+            track = Track(self._next_id, boxes[d], labels[d], confidences[d],
+                          class_ids[d], now)
+            self._next_id += 1
+            self.tracks.append(track)
+            matched_tracks.append(track)
+
+        return [t for t in matched_tracks if t.hits >= self.min_hits]
+
+    def confirmed_tracks(self):
+        """Tracks that received at least min_hits detections"""
+        return [t for t in self.tracks if t.hits >= self.min_hits]
+
+    def pop_new_alerts(self, should_alert):
+        """
+        Confirmed tracks that should raise an alert and have not raised one yet
+
+        Each track is returned at most once over its whole lifetime.
+
+        Args:
+            should_alert (callable): Takes a label, returns True for dangerous objects
+
+        Returns:
+            list: Tracks to alert on
+        """
+        new_alerts = []
+        for track in self.confirmed_tracks():
+            if not track.alerted and should_alert(track.label):
+                track.alerted = True
+                new_alerts.append(track)
+        return new_alerts
@@ -0,0 +1,156 @@
+import cv2
+import numpy as np
+
+
+def _empty_detections():
+    return (np.zeros((0, 4), dtype=np.int32),
+            np.zeros(0, dtype=np.float32),
+            np.zeros(0, dtype=np.int32))
+
+
+def decode_candidates(outs, width, height, confidence_threshold, input_size=None, objectness=False,
+                      class_mask=None, letterbox=None):
+    """
+    Decode raw YOLO output tensors into thresholded candidates, before NMS
+
+    All candidate rows of every output layer are processed as one array:
+    class selection, thresholding and box conversion are whole-array
+    operations.
+
+    Args:
+        outs (list): Output tensors returned by net.forward(output_layers),
+                     each of shape (rows, 5 + num_classes)
+        width (int): Width of the image the boxes are scaled to
+        height (int): Height of the image the boxes are scaled to
+        confidence_threshold (float): Minimum class score to keep a candidate
+        input_size (int, optional): Network input size when the model outputs
+                                    boxes in input pixels instead of [0, 1]
+        objectness (bool): Multiply class scores by the objectness column
+        class_mask (numpy.ndarray, optional): Boolean array indexed by class id;
+                                              candidates of other classes are dropped
+        letterbox (tuple, optional): (scale, pad_x, pad_y) when the image was
+                                     letterboxed; width and height are then the
+                                     network input size and boxes are mapped
+                                     back to the original image
+
+    Returns:
+        tuple: (boxes, confidences, class_ids) as numpy arrays, where boxes is
+               an (N, 4) int array of [x, y, w, h] rows
+    """
+    if not len(outs):
+        return _empty_detections()
+
+    detections = np.concatenate(
+        [np.asarray(out).reshape(-1, out.shape[-1]) for out in outs], axis=0
+    )
+    if detections.shape[0] == 0:
+        return _empty_detections()
+
+    scores = detections[:, 5:]
+    if objectness:
+        scores = scores * detections[:, 4:5]
+    class_ids = np.argmax(scores, axis=1)
+    confidences = np.take_along_axis(scores, class_ids[:, None], axis=1)[:, 0]
+
+    keep = confidences > confidence_threshold
+    if class_mask is not None:
+        keep &= class_mask[class_ids]
+    if not np.any(keep):
+        return _empty_detections()
+
+    detections = detections[keep]
+    if input_size:
+        detections = detections[:, :4] / float(input_size)
+    confidences = confidences[keep].astype(np.float32)
+    class_ids = class_ids[keep].astype(np.int32)
+
+    scale, pad_x, pad_y = letterbox if letterbox is not None else (1.0, 0.0, 0.0)
+
+    # Same truncation semantics as int() on each coordinate
+    center_x = ((detections[:, 0] * width - pad_x) / scale).astype(np.int32)
+    center_y = ((detections[:, 1] * height - pad_y) / scale).astype(np.int32)
+    w = (detections[:, 2] * width / scale).astype(np.int32)
+    h = (detections[:, 3] * height / scale).astype(np.int32)
+    x = (center_x - w / 2).astype(np.int32)
+    y = (center_y - h / 2).astype(np.int32)
+    boxes = np.stack([x, y, w, h], axis=1)
+
+    return boxes, confidences, class_ids
+
+
+def apply_nms(boxes, confidences, class_ids, confidence_threshold, nms_threshold=0.4):
+    """
+    Run non-maximum suppression on decoded candidates
+
+    Args:
+        boxes (numpy.ndarray): (N, 4) int array of [x, y, w, h] rows
+        confidences (numpy.ndarray): Candidate scores
+        class_ids (numpy.ndarray): Candidate class ids
+        confidence_threshold (float): Minimum score passed to NMS
+        nms_threshold (float): IoU threshold used by non-maximum suppression
+
+    Returns:
+        tuple: (boxes, confidences, class_ids) kept after NMS
+    """
+    if len(boxes) == 0:
+        return _empty_detections()
+
+    indexes = cv2.dnn.NMSBoxes(boxes.tolist(), confidences.tolist(),
+                               confidence_threshold, nms_threshold)
+    indexes = np.asarray(indexes, dtype=np.int64).reshape(-1)
+    if indexes.size == 0:
+        return _empty_detections()
+
+    return boxes[indexes], confidences[indexes], class_ids[indexes]
+
+
+def decode_yolo_outputs(outs, width, height, confidence_threshold, nms_threshold=0.4,
+                        input_size=None, objectness=False, class_mask=None):
+    """
+    Decode raw YOLO output tensors into final detections
+
+    Args:
+        outs (list): Output tensors returned by net.forward(output_layers),
+                     each of shape (rows, 5 + num_classes)
+        width (int): Width of the image the boxes are scaled to
+        height (int): Height of the image the boxes are scaled to
+        confidence_threshold (float): Minimum class score to keep a candidate
+        nms_threshold (float): IoU threshold used by non-maximum suppression
+        input_size (int, optional): See decode_candidates
+        objectness (bool): See decode_candidates
+        class_mask (numpy.ndarray, optional): See decode_candidates
+
+    Returns:
+        tuple: (boxes, confidences, class_ids) as numpy arrays, where boxes is
+               an (N, 4) int array of [x, y, w, h] rows kept after NMS
+    """
+    boxes, confidences, class_ids = decode_candidates(outs, width, height, confidence_threshold,
+                                                      input_size, objectness, class_mask)
+    return apply_nms(boxes, confidences, class_ids, confidence_threshold, nms_threshold)
+
+
+def split_batch_outputs(outs, batch_size):
+    """
+    Split the outputs of a batched forward pass into per-image outputs
+
+    Depending on the OpenCV version, YOLO layers return either a
+    (batch, rows, attrs) tensor or the rows of all images stacked in a
+    single (batch * rows, attrs) matrix.
+
+    Args:
+        outs (list): Output tensors returned by net.forward(output_layers)
+        batch_size (int): Number of images in the input blob
+
+    Returns:
+        list: One list of output tensors per image, in blob order
+    """
+    per_image = [[] for _ in range(batch_size)]
+    for out in outs:
+        out = np.asarray(out)
+        if out.ndim == 3:
+            parts = list(out)
+        else:
+            parts = np.split(out, batch_size, axis=0)
+        for i, part in enumerate(parts):
+            per_image[i].append(part)
+    return per_image
@@ -2,10 +2,10 @@ import sys
 import cv2
 import numpy as np
 import sqlite3
-import requests
 import csv
 import json
 import logging
+import time
 from datetime import datetime
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
@@ -15,6 +15,20 @@ import os
 
 # Corriger l'import en utilisant le chemin complet
 from src.core.camera_manager import CameraManager
+from src.core.image_writer import get_image_writer
+from src.core.detection_scheduler import DetectionScheduler, load_optimization_config
+from src.core.adaptive_controller import AdaptiveController
+from src.core.motion_detector import MotionDetector
+from src.core.tracker import ObjectTracker
+from src.core.model_registry import ModelRegistry
+from src.core.detection_engine import DetectionEngine, normalize_labels, resolve_dangerous_objects
+from src.core.alert_dispatcher import AlertDispatcher, AlertEvent
+from src.core.pipeline import Pipeline, Source, Stage, format_stats
+from src.services.telegram_client import get_client
+from src.services.alert_image import AlertImageEncoder
+from src.services.alert_rollups import create_rollups
+from src.services.alert_schema import migrate, today_number
+from src.services.alert_store import AlertStore
 from src.gui.camera_dialog import CameraDialog
 
 # Setup logging
@@ -49,6 +63,15 @@ class AlertRecorder:
         if self.is_recording:
             self.recorded_alerts.append(alert_data)
 
+class AlertSignals(QObject):
+    """Signals emitted by the alert dispatcher workers, delivered on the GUI thread"""
+    alert_saved = pyqtSignal(object)
+
+class FrameSignals(QObject):
+    """Signals emitted by the frame pipeline workers, delivered on the GUI thread"""
+    frame_ready = pyqtSignal(QImage)
+    alert_raised = pyqtSignal(str)
+
 class VideoRecorder(QThread):
     """Thread for video recording"""
     finished = pyqtSignal(str)
@@ -104,6 +127,49 @@ class VideoRecorder(QThread):
                 self.out.release()
             self.finished.emit(self.output_path)
 
+class ModelLoader(QThread):
+    """Thread loading and warming up the detection engine"""
+    progress = pyqtSignal(str)
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, config, model_dir, camera_index, confidence_threshold,
+                 dangerous_objects, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger('ModelLoader')
+        self.config = config
+        self.model_dir = model_dir
+        self.camera_index = camera_index
+        self.confidence_threshold = confidence_threshold
+        self.dangerous_objects = set(dangerous_objects)
+        self.warmup_runs = int(config.get('models', {}).get('warmup_runs', 1))
+
+    def run(self):
+        try:
+            self.progress.emit("Loading YOLO model...")
+            registry = ModelRegistry.from_config(self.config, self.model_dir)
+            spec, input_size = registry.for_camera(self.camera_index)
+
+            missing = spec.missing_files()
+            if missing:
+                self.failed.emit(f"{os.path.basename(missing[0])} not found at {missing[0]}")
+                return
+
+            self.progress.emit(f"Loading {spec.name} ({input_size}x{input_size})...")
+            started = time.perf_counter()
+            engine = DetectionEngine.load(registry, spec, input_size,
+                                          self.confidence_threshold, self.dangerous_objects,
+                                          self.config.get('detection', {}).get('dangerous_only', False))
+            self.logger.info(f"Model {spec.name} read in {time.perf_counter() - started:.2f}s")
+
+            for run in range(self.warmup_runs):
+                self.progress.emit(f"Warming up {spec.name} ({run + 1}/{self.warmup_runs})...")
+                engine.warm_up(1)
+            self.loaded.emit(engine)
+        except Exception as e:
+            self.logger.error(f"Failed to load YOLO model: {str(e)}", exc_info=True)
+            self.failed.emit(str(e))
+
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -172,7 +238,10 @@ class DangerDetectionApp(QMainWindow):
         # Initialize UI
         self.initUI()
         
-        # Lazy loading of YOLO
+        # Lazy loading of YOLO, in a background thread
+        self.engine = None
+        self.model_loader = None
+        self.activate_when_loaded = False
         self.net = None
         self.classes = None
         self.output_layers = None
@@ -180,12 +249,28 @@ class DangerDetectionApp(QMainWindow):
         # Initialize database
         self.init_db()
         
+        # Created once from the configuration and handed to everything that saves images
+        self.image_writer = get_image_writer(getattr(self, 'config', {}))
+        
+        # Database writes and Telegram requests run off the GUI thread
+        self.image_encoder = AlertImageEncoder.from_config(getattr(self, 'config', {}))
+        self.alert_signals = AlertSignals()
+        self.alert_signals.alert_saved.connect(self.on_alert_saved)
+        self.alert_dispatcher = AlertDispatcher.from_config(getattr(self, 'config', {}), [
+            ('database', self.save_alert_to_db),
+            ('telegram', self.send_event_to_telegram)
+        ], name='gui-alerts')
+        self.alert_dispatcher.start()
+        
         # Initialize camera if available
         if self.has_cameras:
-            self.camera_manager = CameraManager()
-            self.timer = QTimer(self)
-            self.timer.timeout.connect(self.update_frame)
-            self.timer.start(30)
+            self.camera_manager = CameraManager(image_writer=self.image_writer)
+            # Capture, inference and drawing run on pipeline workers, the GUI thread only shows frames
+            self.frame_signals = FrameSignals()
+            self.frame_signals.frame_ready.connect(self.show_frame)
+            self.frame_signals.alert_raised.connect(self.alert_box.append)
+            self.frame_pipeline = self.build_frame_pipeline()
+            self.frame_pipeline.start()
         else:
             self.logger.warning("No cameras available")
             self.statusBar().showMessage("No cameras detected")
@@ -200,7 +285,7 @@ class DangerDetectionApp(QMainWindow):
                 self.config = json.load(f)
                 
             # Initialize dangerous objects from config
-            self.dangerous_objects = set(self.config['detection']['dangerous_objects'])
+            self.dangerous_objects = resolve_dangerous_objects(self.config)
             self.confidence_threshold = self.config['detection']['confidence_threshold']
             self.alert_timeout = self.config['detection']['alert_timeout']
             
@@ -218,6 +303,22 @@ class DangerDetectionApp(QMainWindow):
         # Set detection state
         self.detection_active = False
         self.recording = False
+        
+        # Decide which frames get full inference; the others reuse the last results
+        self.detection_scheduler = DetectionScheduler.from_config(
+            getattr(self, 'config', {}), load_optimization_config(self.config_path)
+        )
+        self.last_detection_results = []
+        self.last_alerts = {}  # Time of the last alert per label, for alert_timeout
+        
+        # Skip inference on static scenes (None when motion gating is disabled)
+        self.motion_detector = MotionDetector.from_config(getattr(self, 'config', {}))
+        
+        # Keep object identities between analysed frames (None when disabled)
+        self.tracker = ObjectTracker.from_config(getattr(self, 'config', {}))
+        
+        # Created with the model, once the configured input size is known
+        self.adaptive_controller = None
 
     def initUI(self):
         self.setWindowTitle("Advanced Danger Detection System")
@@ -360,7 +461,7 @@ class DangerDetectionApp(QMainWindow):
     def load_alerts_from_db(self):
         """Load alerts from the database into the table"""
         try:
-            self.cursor.execute('SELECT object, timestamp, confidence, location FROM alerts ORDER BY timestamp DESC')
+            self.cursor.execute('SELECT object, timestamp, confidence, location FROM alerts ORDER BY ts DESC')
             alerts = self.cursor.fetchall()
             
             self.alerts_table.setRowCount(len(alerts))
@@ -381,7 +482,7 @@ class DangerDetectionApp(QMainWindow):
         filename, _ = QFileDialog.getSaveFileName(self, "Export Alerts", "", "CSV Files (*.csv)")
         if filename:
             try:
-                self.cursor.execute('SELECT object, timestamp, confidence, location FROM alerts ORDER BY timestamp DESC')
+                self.cursor.execute('SELECT object, timestamp, confidence, location FROM alerts ORDER BY ts DESC')
                 alerts = self.cursor.fetchall()
                 
                 with open(filename, 'w', newline='') as csvfile:
@@ -421,6 +522,8 @@ class DangerDetectionApp(QMainWindow):
             # Update confidence threshold if changed
             if self.confidence_threshold != new_threshold:
                 self.confidence_threshold = new_threshold
+                if self.engine is not None:
+                    self.engine.confidence_threshold = new_threshold
                 self.confidence_slider.setValue(int(new_threshold * 100)) # Update slider
                 self.logger.info(f"Confidence threshold updated via settings: {self.confidence_threshold:.2f}")
                 
@@ -535,75 +638,95 @@ class DangerDetectionApp(QMainWindow):
     def toggle_detection(self):
         """Toggle object detection on/off"""
         if not self.detection_active:
-            if self.net is None:
-                if not self.load_yolo():
-                    self.logger.error("Failed to load YOLO model. Cannot start detection.")
-                    QMessageBox.critical(self, "Model Error", "Failed to load YOLO model. Check logs.")
-                    return
-
-            self.detection_active = True
-            self.logger.info("Object detection activated.")
-            self.detection_status_label.setText("Detection: ON")
-            self.statusBar().showMessage("Detection Activated", 3000)
+            if self.engine is None:
+                # Detection starts from on_model_loaded once the engine is warm
+                self.load_yolo(activate=True)
+                return
+            self.activate_detection()
         else:
+            self.activate_when_loaded = False
             self.detection_active = False
             self.logger.info("Object detection deactivated.")
             self.detection_status_label.setText("Detection: OFF")
             self.statusBar().showMessage("Detection Deactivated", 3000)
 
-    def load_yolo(self):
-        """Lazy loading of YOLO model with correct paths"""
-        if self.net is None:
-            try:
-                self.logger.info("Loading YOLO model...")
-                weights_path = self.model_dir / 'yolov3.weights'
-                cfg_path = self.model_dir / 'yolov3.cfg'
-                names_path = self.model_dir / 'coco.names'
-
-                if not weights_path.exists():
-                    self.alert_box.append(f"Error: yolov3.weights not found at {weights_path}")
-                    self.logger.error(f"yolov3.weights not found at {weights_path}")
-                    return False
-
-                if not cfg_path.exists():
-                    self.alert_box.append(f"Error: yolov3.cfg not found at {cfg_path}")
-                    self.logger.error(f"yolov3.cfg not found at {cfg_path}")
-                    return False
-
-                if not names_path.exists():
-                    self.alert_box.append(f"Error: coco.names not found at {names_path}")
-                    self.logger.error(f"coco.names not found at {names_path}")
-                    return False
-
-                self.net = cv2.dnn.readNet(str(weights_path), str(cfg_path))
-                layer_names = self.net.getLayerNames()
-                self.logger.info(f"YOLO model read successfully from {weights_path} and {cfg_path}")
-
-                try:
-                    unconnected_layers = self.net.getUnconnectedOutLayers()
-                    if isinstance(unconnected_layers[0], (list, tuple)):
-                        self.output_layers = [layer_names[i[0] - 1] for i in unconnected_layers]
-                    else:
-                         self.output_layers = [layer_names[i - 1] for i in unconnected_layers]
-                except Exception as e:
-                    self.logger.error(f"Error getting output layer names: {str(e)}")
-                    return False
-
-                with open(names_path, "r") as f:
-                    self.classes = [line.strip() for line in f.readlines()]
-
-                self.logger.info("YOLO model loaded successfully")
-                self.alert_box.append("✅ YOLO model loaded successfully")
-                return True
+    def activate_detection(self):
+        """Switch detection on, the engine must be loaded"""
+        self.detection_scheduler.reset()
+        self.last_detection_results = []
+        self.detection_active = True
+        self.logger.info("Object detection activated.")
+        self.detection_status_label.setText("Detection: ON")
+        self.statusBar().showMessage("Detection Activated", 3000)
 
-            except Exception as e:
-                self.alert_box.append(f"Error loading YOLO model: {str(e)}")
-                self.logger.error(f"Failed to load YOLO model: {str(e)}", exc_info=True)
-                return False
-        return True
+    def load_yolo(self, activate=False):
+        """
+        Start loading the detection model selected in the model registry
+
+        Loading and warm-up run in a ModelLoader thread so the event loop
+        keeps running; progress is shown in the status bar.
+
+        Args:
+            activate (bool): Switch detection on once the engine is warm
+
+        Returns:
+            bool: True if the engine is already loaded
+        """
+        if self.engine is not None:
+            return True
+        self.activate_when_loaded = self.activate_when_loaded or activate
+        if self.model_loader is not None and self.model_loader.isRunning():
+            self.statusBar().showMessage("YOLO model is still loading...", 3000)
+            return False
+
+        camera_index = self.camera_manager.camera_index if hasattr(self, 'camera_manager') else 0
+        self.model_loader = ModelLoader(getattr(self, 'config', {}), self.model_dir, camera_index,
+                                        self.confidence_threshold, self.dangerous_objects, self)
+        self.model_loader.progress.connect(self.on_model_progress)
+        self.model_loader.loaded.connect(self.on_model_loaded)
+        self.model_loader.failed.connect(self.on_model_failed)
+        self.detection_status_label.setText("Detection: LOADING")
+        self.model_loader.start()
+        return False
+
+    def on_model_progress(self, message):
+        """Show model loading progress in the status bar"""
+        self.logger.info(message)
+        self.statusBar().showMessage(message)
+
+    def on_model_loaded(self, engine):
+        """Install the warm engine and switch detection on if it was requested"""
+        # Settings may have changed while the model was loading
+        engine.confidence_threshold = self.confidence_threshold
+        if engine.dangerous_objects != set(self.dangerous_objects):
+            engine.set_dangerous_objects(self.dangerous_objects)
+        self.engine = engine
+        self.model = engine.model
+        self.net = self.model.net
+        self.output_layers = self.model.output_layers
+        self.classes = self.model.classes
+        self.adaptive_controller = AdaptiveController.from_config(getattr(self, 'config', {}), engine.input_size)
+
+        spec = engine.spec
+        self.logger.info(f"YOLO model {spec.name} loaded successfully from {spec.weights}")
+        self.alert_box.append(f"✅ YOLO model loaded successfully ({spec.name}, {engine.input_size}x{engine.input_size})")
+        self.statusBar().showMessage("YOLO model ready", 3000)
+        self.detection_status_label.setText("Detection: OFF")
+
+        if self.activate_when_loaded:
+            self.activate_when_loaded = False
+            self.activate_detection()
+
+    def on_model_failed(self, error):
+        """Report a model loading failure"""
+        self.activate_when_loaded = False
+        self.detection_status_label.setText("Detection: OFF")
+        self.alert_box.append(f"Error loading YOLO model: {error}")
+        self.logger.error("Failed to load YOLO model. Cannot start detection.")
+        QMessageBox.critical(self, "Model Error", f"Failed to load YOLO model: {error}")
 
     def send_telegram_alert(self, label, confidence, image=None):
-        """Send alert via Telegram (Placeholder)"""
+        """Send alert via Telegram, on the shared keep-alive client"""
         token = self.settings.get('telegram_bot_token')
         chat_id = self.settings.get('telegram_chat_id')
 
@@ -612,64 +735,171 @@ class DangerDetectionApp(QMainWindow):
             return
 
         message = f"🚨 Danger Detected! 🚨\nObject: {label}\nConfidence: {confidence:.2f}"
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
-        payload = {'chat_id': chat_id, 'text': message}
+        client = get_client(token, chat_id)
 
         try:
-            response = requests.post(url, data=payload, timeout=10)
-            response.raise_for_status()
+            client.send_message(message)
             self.logger.info(f"Telegram alert sent successfully for {label}.")
-
-            if image is not None:
-                try:
-                    image_url = f"https://api.telegram.org/bot{token}/sendPhoto"
-                    is_success, buffer = cv2.imencode(".jpg", image)
-                    if is_success:
-                        files = {'photo': ('alert.jpg', buffer.tobytes(), 'image/jpeg')}
-                        photo_payload = {'chat_id': chat_id, 'caption': f"{label} detected"}
-                        photo_response = requests.post(image_url, data=photo_payload, files=files, timeout=20)
-                        photo_response.raise_for_status()
-                        self.logger.info("Telegram alert image sent successfully.")
-                    else:
-                         self.logger.error("Failed to encode image for Telegram.")
-                except requests.exceptions.RequestException as img_e:
-                    self.logger.error(f"Failed to send Telegram image: {str(img_e)}")
-                except Exception as img_e_gen:
-                    self.logger.error(f"Unexpected error sending Telegram image: {str(img_e_gen)}")
-
-        except requests.exceptions.RequestException as e:
+        except Exception as e:
             self.logger.error(f"Failed to send Telegram message: {str(e)}")
-        except Exception as e_gen:
-             self.logger.error(f"Unexpected error sending Telegram message: {str(e_gen)}")
-
-    def update_frame(self):
-        if not hasattr(self, 'camera_manager') or self.camera_manager is None:
             return
-            
+
+        if image is not None:
+            try:
+                client.send_photo(image, caption=f"{label} detected")
+                self.logger.info("Telegram alert image sent successfully.")
+            except Exception as e:
+                self.logger.error(f"Failed to send Telegram image: {str(e)}")
+
+    def build_frame_pipeline(self):
+        """
+        Build the pipeline that captures, analyses and annotates the camera frames
+
+        capture (one camera read every 30 ms at most) -> preprocess
+        (scheduler and motion gating) -> infer -> postprocess (tracking,
+        alert decision, overlays) -> sinks (alert dispatch, frame handed to
+        the GUI thread). Every frame is shown; frames the scheduler skips
+        are drawn with the latest results. The single infer worker is the
+        only thread using the engine. The metrics are logged every
+        stats_log_interval_s.
+
+        Returns:
+            Pipeline: The (not yet started) pipeline
+        """
+        pipeline_config = getattr(self, 'config', {}).get('advanced', {}).get('pipeline', {})
+        put_timeout = pipeline_config.get('put_timeout_ms', 1000) / 1000.0
+        return Pipeline([
+            # Fresh frames matter more than old ones: drop the oldest when behind
+            Stage('preprocess', self.preprocess_frame, queue_size=2, drop_oldest=True),
+            Stage('infer', self.infer_frame, queue_size=2, drop_oldest=True),
+            # Tracking and alerts must see every analysed frame
+            Stage('postprocess', self.postprocess_frame, queue_size=4, put_timeout=put_timeout),
+            Stage('sinks', self.publish_frame, queue_size=4, put_timeout=put_timeout)
+        ], name='gui-frames', source=Source('capture', self.capture_frame, interval=0.03),
+           report=self.log_pipeline_stats,
+           report_interval=pipeline_config.get('stats_log_interval_s', 60))
+
+    def capture_frame(self):
+        """Pipeline source: read a camera frame"""
         frame = self.camera_manager.get_frame()
         if frame is None:
-            return
+            return None
+        # The camera manager keeps its last frame: draw on a copy
+        return frame.copy(), time.monotonic()
+
+    def preprocess_frame(self, item, worker_id):
+        """Pipeline stage: decide whether the frame is analysed"""
+        frame, captured_at = item
+        analyse = self.detection_active and self.detection_scheduler.should_detect() and (
+            self.motion_detector is None or self.motion_detector.detect(frame))
+        return frame, captured_at, analyse
+
+    def infer_frame(self, item, worker_id):
+        """Pipeline stage: run the engine on the frames selected for analysis"""
+        frame, captured_at, analyse = item
+        engine = self.engine
+        result = None
+        if analyse and engine is not None:
+            started = time.monotonic()
+            result = engine.detect([frame])[0]
+            self.adapt_detection(time.monotonic() - started)
+        return frame, captured_at, analyse, result
+
+    def postprocess_frame(self, item, worker_id):
+        """Pipeline stage: track objects, decide which detections raise an alert and draw the overlays"""
+        frame, captured_at, analyse, result = item
+        alerts = []
+        if not self.detection_active:
+            return frame, alerts
 
-        if self.detection_active:
-            frame = self.process_frame(frame)
+        if analyse and result is None:
+            cv2.putText(frame, "Detection: ON",
+                      (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            cv2.putText(frame, "YOLO not loaded - Press Ctrl+D to start",
+                      (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            return frame, alerts
+
+        if result is None:
+            if self.tracker is not None:
+                tracks = self.tracker.predict(captured_at)
+                self.last_detection_results = self.tracks_to_detections(tracks)
+            return self.draw_detections(frame, self.last_detection_results), alerts
+
+        if self.tracker is not None:
+            self.tracker.update(result.boxes, result.confidences, result.labels,
+                                captured_at, result.class_ids)
+            # Once per tracked object, and once per label every alert_timeout
+            # seconds: a track re-created after a dropout does not re-alert
+            for track in self.tracker.pop_new_alerts(self.is_dangerous_label):
+                if self.alert_due(track.label):
+                    alerts.append(self.create_alert(frame, track.label, track.confidence, track.box))
+            detections = self.tracks_to_detections(self.tracker.confirmed_tracks())
+        else:
+            detections = result.to_list()
+            for x, y, w, h, label, confidence, is_dangerous in detections:
+                if is_dangerous and self.alert_due(label):
+                    alerts.append(self.create_alert(frame, label, confidence, (x, y, w, h)))
+
+        self.last_detection_results = detections
+        return self.draw_detections(frame, detections), alerts
+
+    def alert_due(self, label):
+        """Tell whether alert_timeout has elapsed since the last alert for label, and record the alert"""
+        now = datetime.now()
+        last_alert_time = self.last_alerts.get(label)
+        if last_alert_time is not None and (now - last_alert_time).total_seconds() <= self.alert_timeout:
+            return False
+        self.last_alerts[label] = now
+        return True
 
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        height, width, _ = frame.shape
-        qt_img = QImage(frame.data, width, height, width * 3, QImage.Format_RGB888)
+    def publish_frame(self, item, worker_id):
+        """Pipeline stage: dispatch the alerts and hand the annotated frame to the GUI thread"""
+        frame, alerts = item
+        for event in alerts:
+            self.raise_alert(event)
+
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        height, width, _ = rgb.shape
+        # copy(): the QImage must not outlive the numpy buffer it points to
+        qt_img = QImage(rgb.data, width, height, width * 3, QImage.Format_RGB888).copy()
+        self.frame_signals.frame_ready.emit(qt_img)
+        return item
+
+    def show_frame(self, qt_img):
+        """Show an annotated frame, on the GUI thread"""
         self.video_label.setPixmap(QPixmap.fromImage(qt_img))
 
+    def get_pipeline_stats(self):
+        """
+        Get the metrics of the frame pipeline
+
+        Returns:
+            dict: Capture and per-stage counters, queue depths and timings
+        """
+        if not hasattr(self, 'frame_pipeline'):
+            return {}
+        return self.frame_pipeline.get_stats()
+
+    def log_pipeline_stats(self):
+        """Log the frame pipeline metrics"""
+        self.logger.info(f"Frame pipeline: {format_stats(self.get_pipeline_stats())}")
+
     def update_confidence_threshold(self, value):
         """Update detection confidence threshold"""
         self.confidence_threshold = value / 100.0
+        if self.engine is not None:
+            self.engine.confidence_threshold = self.confidence_threshold
         self.statusBar().showMessage(f"Confidence Threshold: {value}%")
         self.logger.info(f"Updated confidence threshold to {self.confidence_threshold:.2f}")
 
     def update_danger_objects(self):
         """Update the list of dangerous objects from user input"""
-        user_input = self.danger_input.text().strip().lower()
-        if user_input:
-            new_objects = {obj.strip() for obj in user_input.split(",")}
+        # Same normalization as the configured labels, so the fallback match works too
+        new_objects = normalize_labels(self.danger_input.text().split(","))
+        if new_objects:
             self.dangerous_objects.update(new_objects)
+            if self.engine is not None:
+                self.engine.set_dangerous_objects(self.dangerous_objects)
             self.alert_box.append(f"✅ Dangerous objects updated: {', '.join(self.dangerous_objects)}\n")
             self.logger.info(f"Updated dangerous objects list: {self.dangerous_objects}")
         else:
@@ -722,7 +952,6 @@ class DangerDetectionApp(QMainWindow):
         """ Initialize the SQLite database """
         db_path = Path.cwd() / 'data' / 'danger_detection.db'
         db_path.parent.mkdir(parents=True, exist_ok=True)
-        
         self.conn = sqlite3.connect(str(db_path))
         self.cursor = self.conn.cursor()
         self.cursor.execute('''
@@ -735,145 +964,158 @@ class DangerDetectionApp(QMainWindow):
             )
         ''')
         self.conn.commit()
+        # Indexed ts/day columns for the date filters, rollups for the statistics
+        migrate(self.conn)
+        create_rollups(self.conn)
+        # Alerts are written behind, in batches, by the store's own WAL connection
+        self.alert_store = AlertStore.from_config(db_path, getattr(self, 'config', {}))
         self.logger.info(f"Database initialized at {db_path}")
 
-    def save_alert_to_db(self, label, confidence, location):
-        """Save detected alert to the database"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        try:
-            self.cursor.execute(
-                'INSERT INTO alerts (object, timestamp, confidence, location) VALUES (?, ?, ?, ?)', 
-                (label, timestamp, confidence, location)
-            )
-            self.conn.commit()
-            self.logger.info(f"Saved alert to DB: {label} at {timestamp}")
-            self.load_alerts_from_db() 
-            self.update_statistics() 
-        except Exception as e:
-            self.logger.error(f"Failed to save alert to DB: {str(e)}")
+    def save_alert_to_db(self, event):
+        """
+        Save detected alert to the database
+        
+        The alert store commits it with the next batch; the GUI is
+        refreshed through the alert_saved signal once it is written.
+        
+        Args:
+            event (AlertEvent): Alert to save
+        """
+        future = self.alert_store.add(event.label, event.confidence,
+                                      timestamp=event.timestamp, location=event.location)
+        future.add_done_callback(lambda f: self.on_alert_written(event, f))
+    
+    def on_alert_written(self, event, future):
+        """Called on the alert store thread once the alert's transaction is done"""
+        if future.exception() is not None:
+            self.logger.error(f"Failed to save alert to DB: {str(future.exception())}")
+            return
+        self.logger.info(f"Saved alert to DB: {event.label} at {event.timestamp:%Y-%m-%d %H:%M:%S}")
+        self.alert_signals.alert_saved.emit(event)
+    
+    def on_alert_saved(self, event):
+        """Add a saved alert at the top of the alerts table and refresh the statistics"""
+        self.alerts_table.insertRow(0)
+        self.alerts_table.setItem(0, 0, QTableWidgetItem(event.label))
+        self.alerts_table.setItem(0, 1, QTableWidgetItem(event.timestamp.strftime('%Y-%m-%d %H:%M:%S')))
+        self.alerts_table.setItem(0, 2, QTableWidgetItem(f"{event.confidence:.2f}"))
+        self.alerts_table.setItem(0, 3, QTableWidgetItem(event.location))
+        self.update_statistics()
 
     def update_statistics(self):
         """Update statistics labels"""
         try:
-            self.cursor.execute('SELECT COUNT(*) FROM alerts')
+            # Read from the rollups, kept up to date by the alert store with each batch
+            self.cursor.execute('SELECT COALESCE(SUM(count), 0) FROM rollup_object')
             total = self.cursor.fetchone()[0]
             self.total_alerts_label.setText(f"Alertes totales: {total}")
             
-            today = datetime.now().strftime('%Y-%m-%d')
-            self.cursor.execute('SELECT COUNT(*) FROM alerts WHERE date(timestamp) = ?', (today,))
+            self.cursor.execute('SELECT COALESCE(SUM(count), 0) FROM rollup_daily_object WHERE day = ?',
+                                (today_number(),))
             today_count = self.cursor.fetchone()[0]
             self.today_alerts_label.setText(f"Alertes aujourd'hui: {today_count}")
         except Exception as e:
             self.logger.error(f"Failed to update statistics: {str(e)}")
 
-    def process_frame(self, frame):
-        """Process a frame with object detection"""
-        if frame is None:
-            return None
-
-        try:
-            height, width = frame.shape[:2]
-            
-            cv2.putText(frame, f"Detection: {'ON' if self.detection_active else 'OFF'}", 
-                      (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
-            if self.net is None:
-                cv2.putText(frame, "YOLO not loaded - Press Ctrl+D to start", 
-                          (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                return frame
-                
-            blob = cv2.dnn.blobFromImage(frame, 1/255.0, (416, 416), swapRB=True, crop=False)
-            self.net.setInput(blob)
-            
-            outs = self.net.forward(self.output_layers)
-            
-            class_ids = []
-            confidences = []
-            boxes = []
-            
-            for out in outs:
-                for detection in out:
-                    scores = detection[5:]
-                    class_id = np.argmax(scores)
-                    confidence = scores[class_id]
-                    
-                    if confidence > self.confidence_threshold:
-                        center_x = int(detection[0] * width)
-                        center_y = int(detection[1] * height)
-                        w = int(detection[2] * width)
-                        h = int(detection[3] * height)
-                        x = int(center_x - w/2)
-                        y = int(center_y - h/2)
-                        
-                        class_ids.append(class_id)
-                        confidences.append(float(confidence))
-                        boxes.append([x, y, w, h])
-            
-            indexes = cv2.dnn.NMSBoxes(boxes, confidences, self.confidence_threshold, 0.4)
+    def adapt_detection(self, duration):
+        """Feed the inference duration to the adaptive controller and apply its decision"""
+        if self.adaptive_controller is None:
+            return
+        self.adaptive_controller.record_inference(duration)
+        settings = self.adaptive_controller.update()
+        if settings is None:
+            return
+        if not self.engine.spec.fixed_input_size:
+            self.engine.input_size = settings['input_size']
+        self.detection_scheduler.set_min_interval_ms(settings['detection_interval_ms'])
+
+    def is_dangerous_label(self, label):
+        """Tell whether a detected label matches one of the dangerous objects"""
+        if self.engine is not None:
+            return self.engine.is_dangerous(label)
+        return label.lower() in self.dangerous_objects
+
+    def create_alert(self, frame, label, confidence, box):
+        """Build an alert event, on a copy of the frame showing only the alert's detection"""
+        x, y, w, h = box
+        alert_frame = frame.copy()
+        color = (0, 0, 255)
+        cv2.rectangle(alert_frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(alert_frame, f"{label} ({confidence:.2f})",
+                  (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        return AlertEvent(label, confidence, box, alert_frame)
+
+    def raise_alert(self, event):
+        """Show an alert and queue its storage and notification"""
+        self.frame_signals.alert_raised.emit(
+            f"⚠️ ALERT: {event.label} detected! (Confidence: {event.confidence:.2f})")
+        self.alert_dispatcher.dispatch(event)
+    
+    def send_event_to_telegram(self, event):
+        """Alert handler: send an alert event via Telegram"""
+        image = None
+        if event.frame is not None:
+            # Encoded once, at the configured quality and size, before upload
+            encoded = self.image_encoder.encode(event.frame)
+            image = encoded.data if encoded is not None else None
+        self.send_telegram_alert(event.label, event.confidence, image)
+
+    def tracks_to_detections(self, tracks):
+        """Convert tracker tracks into the overlay tuples used by draw_detections"""
+        detections = []
+        for track in tracks:
+            x, y, w, h = track.box
+            detections.append((x, y, w, h, f"{track.label} #{track.track_id}",
+                               track.confidence, self.is_dangerous_label(track.label)))
+        return detections
+
+    def draw_detections(self, frame, detections):
+        """
+        Draw detection overlays on a frame
+        
+        Used both for analysed frames and, with the most recent results,
+        for frames the detection scheduler skipped.
+        
+        Args:
+            frame (numpy.ndarray): Frame to draw on
+            detections (list): (x, y, w, h, label, confidence, is_dangerous) tuples
             
-            detected_danger = False
+        Returns:
+            numpy.ndarray: The annotated frame
+        """
+        height, width = frame.shape[:2]
+        
+        cv2.putText(frame, f"Detection: {'ON' if self.detection_active else 'OFF'}", 
+                  (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        
+        detected_danger = False
+        for x, y, w, h, label, confidence, is_dangerous in detections:
+            if is_dangerous:
+                detected_danger = True
+                color = (0, 0, 255)
+            else:
+                color = (0, 255, 0)
             
-            if indexes is not None and len(indexes) > 0:
-                if isinstance(indexes, tuple):
-                    indexes = indexes[0]
-                if not isinstance(indexes, (list, np.ndarray)):
-                    indexes = [indexes] 
-                
-                for i in indexes:
-                    if i < len(boxes):
-                        x, y, w, h = boxes[i]
-                        label = str(self.classes[class_ids[i]]).lower()
-                        confidence = confidences[i]
-                        
-                        is_dangerous = any(obj in label for obj in self.dangerous_objects)
-                        
-                        if is_dangerous:
-                            detected_danger = True
-                            color = (0, 0, 255)
-                            
-                            now = datetime.now()
-                            last_alert_time = getattr(self, f'_last_alert_{label}', None)
-                            if last_alert_time is None or (now - last_alert_time).total_seconds() > self.alert_timeout:
-                                setattr(self, f'_last_alert_{label}', now)
-                                
-                                self.alert_box.append(f"⚠️ ALERT: {label} detected! (Confidence: {confidence:.2f})")
-                                location_str = f"x:{x},y:{y},w:{w},h:{h}"
-                                self.save_alert_to_db(label, confidence, location_str)
-                                alert_frame = frame.copy()
-                                cv2.rectangle(alert_frame, (x, y), (x + w, y + h), color, 2)
-                                cv2.putText(alert_frame, f"{label} ({confidence:.2f})",
-                                          (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                                self.send_telegram_alert(label, confidence, alert_frame)
-                        else:
-                            color = (0, 255, 0)
-                        
-                        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-                        cv2.putText(frame, f"{label} ({confidence:.2f})", 
-                                  (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                    else:
-                        self.logger.warning(f"Invalid index {i} encountered during NMS processing.")
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+            cv2.putText(frame, f"{label} ({confidence:.2f})", 
+                      (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        
+        cv2.putText(frame, f"Objects: {len(detections)}", 
+                   (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             
-            cv2.putText(frame, f"Objects: {len(indexes) if indexes is not None else 0}", 
-                       (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-            if detected_danger:
-                cv2.putText(frame, "DANGER DETECTED!", 
-                          (width // 2 - 100, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-                
-            return frame
+        if detected_danger:
+            cv2.putText(frame, "DANGER DETECTED!", 
+                      (width // 2 - 100, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
             
-        except Exception as e:
-            self.logger.error(f"Error processing frame: {str(e)}", exc_info=True)
-            cv2.putText(frame, f"Detection Error", 
-                      (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            return frame
+        return frame
 
     def closeEvent(self, event):
         """Handle application close event"""
         self.logger.info("Closing application...")
-        if hasattr(self, 'timer') and self.timer is not None:
-            self.timer.stop()
-            self.logger.info("Stopped frame update timer.")
+        if hasattr(self, 'frame_pipeline'):
+            self.frame_pipeline.stop()
+            self.log_pipeline_stats()
+            self.logger.info("Stopped frame pipeline.")
 
         if hasattr(self, 'camera_manager') and self.camera_manager is not None:
             self.camera_manager.stop()
@@ -885,6 +1127,17 @@ class DangerDetectionApp(QMainWindow):
             self.video_recorder.wait()
             self.logger.info("Video recorder stopped.")
 
+        if self.model_loader is not None and self.model_loader.isRunning():
+            self.logger.info("Waiting for the model loader...")
+            self.model_loader.wait()
+
+        if hasattr(self, 'alert_dispatcher'):
+            self.logger.info("Sending pending alerts...")
+            self.alert_dispatcher.stop()
+
+        if hasattr(self, 'alert_store'):
+            self.alert_store.close()
+
         if hasattr(self, 'conn'):
             self.conn.close()
             self.logger.info("Closed database connection.")
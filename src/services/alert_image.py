@@ -0,0 +1,96 @@
+import logging
+from pathlib import Path
+
+import cv2
+
+
+class EncodedImage:
+    """Image d'alerte encodée une fois en JPEG, partagée par le disque, Telegram et l'e-mail"""
+    def __init__(self, data, width, height, thumbnail=None):
+        """
+        Args:
+            data (bytes): Image JPEG
+            width (int): Largeur après réduction
+            height (int): Hauteur après réduction
+            thumbnail (bytes, optional): Vignette JPEG
+        """
+        self.data = data
+        self.width = width
+        self.height = height
+        self.thumbnail = thumbnail
+
+    def __len__(self):
+        return len(self.data)
+
+    def save(self, path, thumbnail_path=None):
+        """Écrit l'image (et la vignette si demandé) telle quelle, sans ré-encodage"""
+        Path(path).write_bytes(self.data)
+        if thumbnail_path is not None and self.thumbnail is not None:
+            Path(thumbnail_path).write_bytes(self.thumbnail)
+
+
+class AlertImageEncoder:
+    """
+    Encode les images d'alerte en JPEG en une seule passe
+
+    L'image est réduite à max_dimension pixels sur son plus grand côté
+    avant l'encodage ; une vignette de thumbnail_size pixels est produite
+    en même temps.
+    """
+    def __init__(self, quality=85, max_dimension=1280, thumbnail_size=320, thumbnail_quality=70):
+        """
+        Args:
+            quality (int): Qualité JPEG de l'image (0-100)
+            max_dimension (int): Plus grand côté de l'image, 0 pour garder la taille d'origine
+            thumbnail_size (int): Plus grand côté de la vignette, 0 pour ne pas en produire
+            thumbnail_quality (int): Qualité JPEG de la vignette
+        """
+        self.logger = logging.getLogger(__name__)
+        self.quality = int(quality)
+        self.max_dimension = int(max_dimension)
+        self.thumbnail_size = int(thumbnail_size)
+        self.thumbnail_quality = int(thumbnail_quality)
+
+    @classmethod
+    def from_config(cls, config):
+        """Crée l'encodeur à partir de la section notifications.images"""
+        images = config.get('notifications', {}).get('images', {})
+        return cls(images.get('jpeg_quality', 85),
+                   images.get('max_dimension', 1280),
+                   images.get('thumbnail_size', 320),
+                   images.get('thumbnail_quality', 70))
+
+    def encode(self, frame):
+        """
+        Encode une image BGR
+
+        Args:
+            frame (numpy.ndarray): Image à encoder
+
+        Returns:
+            EncodedImage: L'image encodée, ou None si l'encodage a échoué
+        """
+        image = _fit(frame, self.max_dimension)
+        success, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not success:
+            self.logger.error("Failed to encode alert image")
+            return None
+
+        thumbnail = None
+        if self.thumbnail_size > 0:
+            success, thumb = cv2.imencode(".jpg", _fit(image, self.thumbnail_size),
+                                          [cv2.IMWRITE_JPEG_QUALITY, self.thumbnail_quality])
+            if success:
+                thumbnail = thumb.tobytes()
+        height, width = image.shape[:2]
+        return EncodedImage(buffer.tobytes(), width, height, thumbnail)
+
+
+def _fit(frame, max_dimension):
+    """Réduit une image pour que son plus grand côté ne dépasse pas max_dimension"""
+    height, width = frame.shape[:2]
+    if max_dimension <= 0 or max(height, width) <= max_dimension:
+        return frame
+    scale = max_dimension / max(height, width)
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
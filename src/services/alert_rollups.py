@@ -0,0 +1,169 @@
+import logging
+
+from .alert_schema import SECONDS_PER_DAY
+
+# Agrégats des alertes, tenus à jour au fil des insertions. Ils sont
+# conservés quand les alertes brutes sont purgées.
+ROLLUP_TABLES = (
+    # Nombre d'alertes et somme des confiances par jour et par objet
+    '''CREATE TABLE IF NOT EXISTS rollup_daily_object (
+        day INTEGER NOT NULL,
+        object TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        confidence_sum REAL NOT NULL,
+        PRIMARY KEY (day, object)
+    ) WITHOUT ROWID''',
+    # Nombre d'alertes par jour et par heure (0-23), d'où les cartes heure x jour de semaine
+    '''CREATE TABLE IF NOT EXISTS rollup_hourly (
+        day INTEGER NOT NULL,
+        hour INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (day, hour)
+    ) WITHOUT ROWID''',
+    # Totaux par objet depuis le début
+    '''CREATE TABLE IF NOT EXISTS rollup_object (
+        object TEXT PRIMARY KEY,
+        count INTEGER NOT NULL,
+        confidence_sum REAL NOT NULL,
+        first_ts INTEGER,
+        last_ts INTEGER
+    )''',
+    # Statistiques journalières, recalculées depuis rollup_daily_object pour les jours modifiés
+    '''CREATE TABLE IF NOT EXISTS daily_stats (
+        date DATE PRIMARY KEY,
+        total_alerts INTEGER,
+        unique_objects INTEGER,
+        avg_confidence REAL
+    )''',
+    # Dernier id d'alerte déjà compté, par table source
+    '''CREATE TABLE IF NOT EXISTS rollup_watermark (
+        source TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL
+    )''',
+)
+
+
+def create_rollups(conn, table='alerts'):
+    """
+    Crée les tables d'agrégats et y reporte les alertes existantes
+
+    La table des alertes doit avoir été migrée (colonnes ts et day,
+    voir alert_schema.migrate).
+
+    Args:
+        conn (sqlite3.Connection): Connexion à la base
+        table (str): Table des alertes
+
+    Returns:
+        int: Nombre d'alertes reportées
+    """
+    with conn:
+        for statement in ROLLUP_TABLES:
+            conn.execute(statement)
+    return refresh_rollups(conn, table)
+
+
+def _pending(conn, table):
+    """(dernier id compté, id maximum) ; le repère repart de 0 si la table a été vidée"""
+    row = conn.execute('SELECT last_id FROM rollup_watermark WHERE source = ?', (table,)).fetchone()
+    last_id = row[0] if row else 0
+    max_id = conn.execute(f'SELECT MAX(id) FROM {table}').fetchone()[0] or 0
+    if max_id < last_id:
+        # Tous les ids comptés ont été supprimés : SQLite renumérote à partir de 1
+        last_id = 0
+    return last_id, max_id
+
+
+def catch_up(conn, table='alerts'):
+    """
+    Ajoute aux agrégats les alertes insérées depuis le dernier passage
+
+    Seules les alertes d'id supérieur au repère sont lues (recherche sur
+    la clé primaire), si bien que le coût dépend du nombre de nouvelles
+    alertes et non de la taille de la table. Doit être appelé dans une
+    transaction d'écriture déjà ouverte : le repère est lu et avancé dans
+    la même transaction que les agrégats.
+
+    Args:
+        conn (sqlite3.Connection): Connexion, dans une transaction d'écriture
+        table (str): Table des alertes
+
+    Returns:
+        int: Nombre d'alertes ajoutées aux agrégats
+    """
+    last_id, max_id = _pending(conn, table)
+    if max_id == last_id:
+        return 0
+
+    new_rows = f'FROM {table} WHERE id > ? AND id <= ? AND ts IS NOT NULL'
+    bounds = (last_id, max_id)
+    added = conn.execute(f'SELECT COUNT(*) {new_rows}', bounds).fetchone()[0]
+
+    conn.execute(f'''
+        INSERT INTO rollup_daily_object (day, object, count, confidence_sum)
+        SELECT day, object, COUNT(*), TOTAL(confidence) {new_rows}
+        GROUP BY day, object
+        ON CONFLICT (day, object) DO UPDATE SET
+            count = count + excluded.count,
+            confidence_sum = confidence_sum + excluded.confidence_sum
+    ''', bounds)
+    conn.execute(f'''
+        INSERT INTO rollup_hourly (day, hour, count)
+        SELECT day, ts % {SECONDS_PER_DAY} / 3600 AS hour, COUNT(*) {new_rows}
+        GROUP BY day, hour
+        ON CONFLICT (day, hour) DO UPDATE SET count = count + excluded.count
+    ''', bounds)
+    conn.execute(f'''
+        INSERT INTO rollup_object (object, count, confidence_sum, first_ts, last_ts)
+        SELECT object, COUNT(*), TOTAL(confidence), MIN(ts), MAX(ts) {new_rows}
+        GROUP BY object
+        ON CONFLICT (object) DO UPDATE SET
+            count = count + excluded.count,
+            confidence_sum = confidence_sum + excluded.confidence_sum,
+            first_ts = MIN(first_ts, excluded.first_ts),
+            last_ts = MAX(last_ts, excluded.last_ts)
+    ''', bounds)
+    # Seuls les jours touchés sont recalculés, à partir de quelques lignes d'agrégats chacun
+    conn.execute(f'''
+        INSERT OR REPLACE INTO daily_stats (date, total_alerts, unique_objects, avg_confidence)
+        SELECT date(day * {SECONDS_PER_DAY}, 'unixepoch'), SUM(count), COUNT(*),
+               SUM(confidence_sum) / SUM(count)
+        FROM rollup_daily_object
+        WHERE day IN (SELECT DISTINCT day {new_rows})
+        GROUP BY day
+    ''', bounds)
+    conn.execute('''
+        INSERT INTO rollup_watermark (source, last_id) VALUES (?, ?)
+        ON CONFLICT (source) DO UPDATE SET last_id = excluded.last_id
+    ''', (table, max_id))
+    return added
+
+
+def refresh_rollups(conn, table='alerts'):
+    """
+    Rattrape les agrégats dans une transaction à part
+
+    Pour les lecteurs (rapports) et les alertes écrites hors d'AlertStore ;
+    ne prend le verrou d'écriture que s'il y a des alertes à reporter.
+
+    Args:
+        conn (sqlite3.Connection): Connexion à la base
+        table (str): Table des alertes
+
+    Returns:
+        int: Nombre d'alertes ajoutées aux agrégats
+    """
+    last_id, max_id = _pending(conn, table)
+    if max_id == last_id:
+        return 0
+    conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        added = catch_up(conn, table)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if added:
+        logging.info(f"Rollups caught up with {added} alerts")
+    return added
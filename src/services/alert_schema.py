@@ -0,0 +1,102 @@
+import calendar
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+SECONDS_PER_DAY = 86400
+
+# (nom, colonnes) des index créés sur la table des alertes
+ALERT_INDEXES = (
+    ('ts', ('ts',)),
+    ('object_ts', ('object', 'ts')),
+    ('day', ('day',)),
+)
+
+
+def to_epoch(value):
+    """
+    Convertit un horodatage en secondes entières, lues comme la colonne timestamp
+
+    L'heure affichée est prise telle quelle (comme strftime('%s', timestamp)
+    dans SQLite) : un filtre sur ts garde exactement le sens qu'il avait
+    sur le texte de la colonne timestamp.
+
+    Args:
+        value (str|datetime|date): '2024-05-01 12:30:00', '2024-05-01', datetime ou date
+
+    Returns:
+        int: Secondes depuis 1970-01-01 00:00:00
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    return calendar.timegm(value.timetuple())
+
+
+def day_number(value):
+    """
+    Numéro du jour d'un horodatage (jours depuis 1970-01-01), valeur de la colonne day
+
+    Args:
+        value (str|datetime|date): Horodatage ou date
+
+    Returns:
+        int: Numéro du jour
+    """
+    return to_epoch(value) // SECONDS_PER_DAY
+
+
+def utc_days_ago(days):
+    """Numéro du jour de date('now', '-N days') : le jour UTC d'il y a N jours"""
+    return day_number(datetime.now(timezone.utc) - timedelta(days=days))
+
+
+def utc_midnight_ago(days):
+    """Secondes de date('now', '-N days') : minuit UTC d'il y a N jours"""
+    return utc_days_ago(days) * SECONDS_PER_DAY
+
+
+def utc_epoch_ago(days):
+    """Secondes de datetime('now', '-N days') : l'heure UTC d'il y a N jours"""
+    return to_epoch(datetime.now(timezone.utc) - timedelta(days=days))
+
+
+def today_number():
+    """Numéro du jour local courant"""
+    return day_number(date.today())
+
+
+def migrate(conn, table='alerts'):
+    """
+    Ajoute à la table des alertes les colonnes ts et day, et leurs index
+
+    ts (secondes) et day (numéro du jour) sont calculés depuis timestamp
+    pour les lignes qui ne les ont pas encore, puis indexés sur (ts),
+    (object, ts) et (day). Les requêtes peuvent alors filtrer et grouper
+    sur des entiers indexés au lieu d'appeler date() sur chaque ligne.
+    Sans effet si la migration a déjà été faite.
+
+    Args:
+        conn (sqlite3.Connection): Connexion à la base
+        table (str): Table des alertes
+
+    Returns:
+        int: Nombre de lignes complétées
+    """
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if not columns:
+        return 0
+    with conn:
+        for column in ('ts', 'day'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} INTEGER')
+        # Remplir avant d'indexer : une seule construction d'index plutôt qu'une mise à jour par ligne
+        filled = conn.execute(f'''
+            UPDATE {table}
+            SET ts = CAST(strftime('%s', timestamp) AS INTEGER),
+                day = CAST(strftime('%s', timestamp) AS INTEGER) / {SECONDS_PER_DAY}
+            WHERE ts IS NULL AND timestamp IS NOT NULL
+        ''').rowcount
+        for name, indexed in ALERT_INDEXES:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{name} ON {table} ({", ".join(indexed)})')
+    if filled:
+        logging.info(f"Alerts table migrated: {filled} rows given ts/day columns")
+    return filled
@@ -0,0 +1,241 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .alert_rollups import catch_up
+from .alert_schema import SECONDS_PER_DAY, to_epoch
+
+ALERT_COLUMNS = ('object', 'confidence', 'timestamp', 'image_path', 'location', 'ts', 'day')
+
+
+class AlertStore:
+    """
+    Écriture différée et groupée des alertes dans SQLite
+
+    Un seul thread possède une connexion longue durée en mode WAL. add()
+    met l'alerte en file et retourne aussitôt un Future résolu avec l'id
+    de la ligne ; le thread regroupe les insertions en une transaction
+    dès que batch_size alertes attendent ou que flush_interval secondes
+    se sont écoulées depuis la première. Si la base a les tables
+    d'agrégats (alert_rollups), elles sont mises à jour dans la même
+    transaction.
+    """
+    def __init__(self, db_path, table='alerts', batch_size=100, flush_interval=0.2,
+                 queue_size=10000, synchronous='NORMAL'):
+        """
+        Args:
+            db_path (str): Base SQLite, dont la table des alertes existe déjà
+            table (str): Table des alertes
+            batch_size (int): Nombre maximum d'alertes par transaction
+            flush_interval (float): Attente maximum, en secondes, avant de valider une transaction
+            queue_size (int): Nombre maximum d'opérations en attente
+            synchronous (str): PRAGMA synchronous ; NORMAL suffit en WAL (pas de fsync par transaction)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_path = str(db_path)
+        self.table = table
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.synchronous = synchronous
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self.committed = 0
+        self.failed = 0
+        self.batch_sizes = deque(maxlen=500)
+        self.commit_times = deque(maxlen=500)
+
+        ready = Future()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="alert-store", daemon=True)
+        self._thread.start()
+        self.columns = ready.result()  # Propage les erreurs d'ouverture de la base
+
+    @classmethod
+    def from_config(cls, db_path, config, table='alerts'):
+        """Crée le magasin à partir de la section database.write_behind"""
+        settings = config.get('database', {}).get('write_behind', {})
+        return cls(db_path, table,
+                   batch_size=settings.get('batch_size', 100),
+                   flush_interval=settings.get('flush_interval_ms', 200) / 1000.0,
+                   queue_size=settings.get('queue_size', 10000),
+                   synchronous=settings.get('synchronous', 'NORMAL'))
+
+    def add(self, object_name, confidence, timestamp=None, image_path=None, location=None):
+        """
+        Met une alerte en file d'écriture, sans attendre la base
+
+        Args:
+            object_name (str): Objet détecté
+            confidence (float): Confiance de la détection
+            timestamp (str|datetime, optional): Horodatage, l'heure UTC courante par défaut
+                (comme CURRENT_TIMESTAMP)
+            image_path (str, optional): Image de la détection, ignorée si la table n'a pas la colonne
+            location (str, optional): Position de l'objet
+
+        Les colonnes ts et day (voir alert_schema.migrate) sont remplies
+        depuis timestamp quand la table les a.
+
+        Returns:
+            Future: Résolu avec l'id de la ligne une fois la transaction validée
+        """
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc)
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        ts = to_epoch(timestamp)
+        row = {'object': object_name, 'confidence': float(confidence), 'timestamp': timestamp,
+               'image_path': image_path, 'location': location,
+               'ts': ts, 'day': ts // SECONDS_PER_DAY}
+        return self._put(('insert', row))
+
+    def submit(self, func):
+        """
+        Exécute func(connection) sur le thread d'écriture, dans l'ordre des alertes
+
+        Returns:
+            Future: Résolu avec le résultat de func
+        """
+        return self._put(('call', func))
+
+    def _put(self, operation):
+        future = Future()
+        self.queue.put((operation, future))  # Ne bloque que si queue_size opérations attendent déjà
+        return future
+
+    def flush(self, timeout=10.0):
+        """
+        Attend que tout ce qui a été mis en file soit validé
+
+        Returns:
+            bool: True si tout a été écrit dans le délai
+        """
+        try:
+            self.submit(lambda conn: None).result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout=10.0):
+        """Écrit les alertes en attente puis ferme la connexion"""
+        if not self._thread.is_alive():
+            return
+        self.queue.put((None, None))
+        self._thread.join(timeout)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)  # Transactions explicites
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute('PRAGMA busy_timeout=5000')
+        return conn
+
+    def _run(self, ready):
+        try:
+            conn = self._connect()
+            existing = {row[1] for row in conn.execute(f'PRAGMA table_info({self.table})')}
+            if not existing:
+                raise sqlite3.OperationalError(f"no such table: {self.table}")
+            columns = [c for c in ALERT_COLUMNS if c in existing]
+            self.rollups = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                                        "AND name = 'rollup_watermark'").fetchone() is not None
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(columns)
+        sql = (f"INSERT INTO {self.table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)})")
+
+        closing = False
+        while not closing:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][0] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch[-1][0] is None:
+                batch.pop()
+                closing = True
+            if batch:
+                self._commit(conn, sql, columns, batch)
+        conn.close()
+
+    def _commit(self, conn, sql, columns, batch):
+        """Écrit un lot dans une seule transaction et résout ses Futures"""
+        started = time.monotonic()
+        results = []
+        try:
+            conn.execute('BEGIN')
+            for (kind, payload), _ in batch:
+                if kind == 'insert':
+                    results.append(conn.execute(sql, [payload[c] for c in columns]).lastrowid)
+                    continue
+                # Un appel en échec n'annule que ses propres écritures, pas celles du lot
+                conn.execute('SAVEPOINT call')
+                try:
+                    results.append(payload(conn))
+                    conn.execute('RELEASE call')
+                except Exception as e:
+                    if not conn.in_transaction:
+                        raise  # Transaction annulée par SQLite : tout le lot échoue
+                    conn.execute('ROLLBACK TO call')
+                    conn.execute('RELEASE call')
+                    results.append(e)
+            if self.rollups:
+                self._catch_up(conn)
+            conn.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            with self._lock:
+                self.failed += len(batch)
+            self.logger.error(f"Failed to write {len(batch)} alert(s): {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self.committed += sum(1 for (kind, _), _ in batch if kind == 'insert')
+            self.batch_sizes.append(len(batch))
+            self.commit_times.append(time.monotonic() - started)
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _catch_up(self, conn):
+        """Reporte le lot dans les agrégats ; en cas d'échec les alertes sont quand même écrites"""
+        conn.execute('SAVEPOINT rollups')
+        try:
+            catch_up(conn, self.table)
+            conn.execute('RELEASE rollups')
+        except Exception as e:
+            if not conn.in_transaction:
+                raise
+            conn.execute('ROLLBACK TO rollups')
+            conn.execute('RELEASE rollups')
+            self.logger.error(f"Failed to update alert rollups: {str(e)}")
+
+    def get_stats(self):
+        """File d'attente, alertes écrites, taille moyenne des lots et durée des transactions"""
+        with self._lock:
+            sizes = np.array(self.batch_sizes)
+            times = np.array(self.commit_times) * 1000.0
+            return {
+                "pending": self.queue.qsize(),
+                "committed": self.committed,
+                "failed": self.failed,
+                "mean_batch_size": float(sizes.mean()) if sizes.size else 0.0,
+                "mean_commit_ms": float(times.mean()) if times.size else 0.0
+            }
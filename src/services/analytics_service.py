@@ -6,12 +6,22 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 import logging
 
+from .alert_rollups import create_rollups
+from .alert_schema import migrate, to_epoch, utc_days_ago, utc_epoch_ago, SECONDS_PER_DAY
+from .alert_store import AlertStore
+
 class AnalyticsManager:
     def __init__(self, db_path='danger_detection.db', config_path='config.json'):
         self.db_path = db_path
         self.config = self._load_config(config_path)
         self.setup_logging()
         self.init_database()
+        self.store = None
+        try:
+            # Connexion WAL unique, écritures groupées sur un thread dédié
+            self.store = AlertStore.from_config(self.db_path, self.config)
+        except Exception as e:
+            logging.error(f"Failed to open alert store: {str(e)}")
         
     def _load_config(self, config_path):
         with open(config_path, 'r') as f:
@@ -44,37 +54,41 @@ class AnalyticsManager:
                     )
                 ''')
                 
-                # Table des statistiques journalières
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS daily_stats (
-                        date DATE PRIMARY KEY,
-                        total_alerts INTEGER,
-                        unique_objects INTEGER,
-                        avg_confidence REAL
-                    )
-                ''')
-                
                 conn.commit()
+                # Colonnes ts/day indexées pour les filtres par date
+                migrate(conn)
+                # Agrégats par jour, par heure et par objet (dont daily_stats), lus par les rapports
+                create_rollups(conn)
                 logging.info("Database initialized successfully")
                 
         except Exception as e:
             logging.error(f"Database initialization failed: {str(e)}")
     
     def add_alert(self, object_name, confidence, image_path=None, location=None):
-        """Ajoute une nouvelle alerte dans la base de données"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO alerts (object, confidence, image_path, location)
-                    VALUES (?, ?, ?, ?)
-                ''', (object_name, confidence, image_path, location))
-                conn.commit()
-                logging.info(f"Alert added: {object_name}")
-                return cursor.lastrowid
-        except Exception as e:
-            logging.error(f"Failed to add alert: {str(e)}")
+        """
+        Ajoute une nouvelle alerte dans la base de données
+        
+        L'écriture est différée et groupée avec les alertes voisines : la
+        méthode ne bloque pas et retourne un Future résolu avec l'id de
+        l'alerte (None si la base n'a pas pu être ouverte).
+        """
+        if self.store is None:
+            logging.error(f"Failed to add alert: alert store unavailable")
             return None
+        future = self.store.add(object_name, confidence, image_path=image_path, location=location)
+        future.add_done_callback(lambda f: self._log_alert_written(object_name, f))
+        return future
+    
+    def _log_alert_written(self, object_name, future):
+        if future.exception() is not None:
+            logging.error(f"Failed to add alert: {str(future.exception())}")
+        else:
+            logging.info(f"Alert added: {object_name}")
+    
+    def close(self):
+        """Écrit les alertes en attente et ferme la base"""
+        if self.store is not None:
+            self.store.close()
     
     def get_daily_statistics(self):
         """Retourne les statistiques du jour"""
@@ -84,13 +98,13 @@ class AnalyticsManager:
                 today = datetime.now().strftime('%Y-%m-%d')
                 cursor.execute('''
                     SELECT 
-                        COUNT(*) as total,
-                        COUNT(DISTINCT object) as unique_objects,
-                        AVG(confidence) as avg_confidence
-                    FROM alerts
-                    WHERE date(timestamp) = ?
+                        total_alerts as total,
+                        unique_objects,
+                        avg_confidence
+                    FROM daily_stats
+                    WHERE date = ?
                 ''', (today,))
-                return cursor.fetchone()
+                return cursor.fetchone() or (0, 0, None)
         except Exception as e:
             logging.error(f"Failed to get daily statistics: {str(e)}")
             return (0, 0, 0.0)
@@ -101,33 +115,35 @@ class AnalyticsManager:
             Path(output_dir).mkdir(exist_ok=True)
             
             with sqlite3.connect(self.db_path) as conn:
-                # Charger les données dans un DataFrame
-                df = pd.read_sql_query('''
+                # Charger les agrégats journaliers dans un DataFrame
+                df = pd.read_sql_query(f'''
                     SELECT 
-                        date(timestamp) as date,
+                        date(day * {SECONDS_PER_DAY}, 'unixepoch') as date,
                         object,
-                        confidence
-                    FROM alerts
-                    WHERE timestamp >= date('now', '-7 days')
-                ''', conn)
+                        count,
+                        confidence_sum
+                    FROM rollup_daily_object
+                    WHERE day >= ?
+                ''', conn, params=(utc_days_ago(7),))
+                by_object = df.groupby('object')[['count', 'confidence_sum']].sum()
                 
                 # Créer des graphiques
                 plt.figure(figsize=(15, 10))
                 
                 # Graphique 1: Détections par jour
                 plt.subplot(2, 2, 1)
-                df['date'].value_counts().sort_index().plot(kind='bar')
+                df.groupby('date')['count'].sum().sort_index().plot(kind='bar')
                 plt.title('Détections par jour')
                 plt.xticks(rotation=45)
                 
                 # Graphique 2: Types d'objets détectés
                 plt.subplot(2, 2, 2)
-                df['object'].value_counts().plot(kind='pie', autopct='%1.1f%%')
+                by_object['count'].sort_values(ascending=False).plot(kind='pie', autopct='%1.1f%%')
                 plt.title('Distribution des objets détectés')
                 
                 # Graphique 3: Niveau de confiance moyen par objet
                 plt.subplot(2, 2, 3)
-                df.groupby('object')['confidence'].mean().plot(kind='bar')
+                (by_object['confidence_sum'] / by_object['count']).plot(kind='bar')
                 plt.title('Niveau de confiance moyen par objet')
                 plt.xticks(rotation=45)
                 
@@ -153,8 +169,8 @@ class AnalyticsManager:
                 cursor = conn.cursor()
                 cursor.execute('''
                     DELETE FROM alerts 
-                    WHERE timestamp < datetime('now', ?)
-                ''', (f'-{retention_days} days',))
+                    WHERE ts < ?
+                ''', (utc_epoch_ago(retention_days),))
                 conn.commit()
                 logging.info(f"Cleaned up records older than {retention_days} days")
         except Exception as e:
@@ -168,11 +184,11 @@ class AnalyticsManager:
                 params = []
                 
                 if start_date:
-                    query += ' AND timestamp >= ?'
-                    params.append(start_date)
+                    query += ' AND ts >= ?'
+                    params.append(to_epoch(start_date))
                 if end_date:
-                    query += ' AND timestamp <= ?'
-                    params.append(end_date)
+                    query += ' AND ts <= ?'
+                    params.append(to_epoch(end_date))
                 
                 df = pd.read_sql_query(query, conn, params=params)
                 
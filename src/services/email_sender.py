@@ -0,0 +1,163 @@
+import logging
+import smtplib
+import threading
+import time
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+
+def is_connection_error(error):
+    """Vrai si la session est perdue (et non refusée par le serveur, qui a répondu)"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SmtpSender:
+    """
+    Envoi d'e-mails sur une session SMTP authentifiée gardée ouverte
+
+    La connexion, le STARTTLS et l'AUTH ne sont faits qu'une fois puis
+    réutilisés d'un message à l'autre. Une session coupée par le serveur
+    est rouverte et l'envoi retenté ; une session inactive depuis plus de
+    idle_timeout secondes est fermée avant le prochain envoi, les serveurs
+    les coupant de toute façon.
+    """
+    def __init__(self, host, port=587, username=None, password=None, sender=None, recipients=(),
+                 use_ssl=False, starttls=True, timeout=10.0, idle_timeout=240.0, max_retries=1):
+        """
+        Args:
+            host (str): Serveur SMTP
+            port (int): Port du serveur
+            username (str, optional): Identifiant, pas d'authentification si absent
+            password (str, optional): Mot de passe
+            sender (str): Adresse de l'expéditeur (username par défaut)
+            recipients (list): Adresses des destinataires
+            use_ssl (bool): TLS dès la connexion (port 465)
+            starttls (bool): Passer en TLS avec STARTTLS après la connexion
+            timeout (float): Délai maximum des opérations réseau, en secondes
+            idle_timeout (float): Inactivité après laquelle la session est rouverte
+            max_retries (int): Nouvelles tentatives après une session coupée
+        """
+        self.logger = logging.getLogger(__name__)
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.recipients = [recipients] if isinstance(recipients, str) else list(recipients)
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_retries = max(0, int(max_retries))
+
+        self._server = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.sent = 0
+
+    @classmethod
+    def from_config(cls, email_config):
+        """Crée l'expéditeur à partir de la section notifications.email"""
+        port = int(email_config.get('smtp_port', 587))
+        secure = email_config.get('use_ssl', True)
+        return cls(email_config.get('smtp_server', ''), port,
+                   username=email_config.get('sender_email') or None,
+                   password=email_config.get('sender_password') or None,
+                   sender=email_config.get('sender_email'),
+                   recipients=email_config.get('recipient_email', ''),
+                   use_ssl=secure and port == 465,
+                   starttls=secure and port != 465,
+                   timeout=email_config.get('timeout', 10.0),
+                   idle_timeout=email_config.get('idle_timeout', 240.0))
+
+    def _connect(self):
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.starttls:
+                server.starttls()
+                server.ehlo()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connections += 1
+        self.logger.info(f"SMTP session opened on {self.host}:{self.port}")
+        return server
+
+    def _disconnect(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+    def send(self, msg):
+        """
+        Envoie un message sur la session ouverte, rouverte au besoin
+
+        Args:
+            msg (email.message.Message): Message complet ; From et To sont complétés s'ils manquent
+        """
+        if 'From' not in msg:
+            msg['From'] = self.sender
+        if 'To' not in msg:
+            msg['To'] = ", ".join(self.recipients)
+
+        with self._lock:
+            if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+                self._disconnect()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    if self._server is None:
+                        self._server = self._connect()
+                    self._server.send_message(msg, self.sender, self.recipients)
+                    break
+                except OSError as e:
+                    if not is_connection_error(e):
+                        raise
+                    if self._server is not None:
+                        self._server.close()
+                        self._server = None
+                    if attempt == self.max_retries:
+                        raise
+                    self.logger.warning(f"SMTP session lost ({str(e)}), reconnecting")
+            self._last_used = time.monotonic()
+            self.sent += 1
+
+    def close(self):
+        """Ferme la session SMTP"""
+        with self._lock:
+            self._disconnect()
+
+
+def build_message(subject, body, attachments=()):
+    """
+    Construit un e-mail texte avec des images jointes
+
+    Args:
+        subject (str): Objet
+        body (str): Texte du message
+        attachments (iterable): (nom de fichier, octets JPEG)
+
+    Returns:
+        MIMEMultipart: Le message, sans From ni To
+    """
+    msg = MIMEMultipart()
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    for filename, data in attachments:
+        image = MIMEImage(data, 'jpeg')
+        image.add_header('Content-Disposition', 'attachment', filename=filename)
+        msg.attach(image)
+    return msg
@@ -0,0 +1,341 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+class ChannelPolicy:
+    """Limites d'envoi d'un canal de notification"""
+    def __init__(self, alert_cooldown=0, min_interval=0, max_images=4,
+                 failure_backoff=5, max_failure_backoff=300):
+        """
+        Args:
+            alert_cooldown (float): Secondes minimum entre deux notifications pour un même objet
+            min_interval (float): Secondes minimum entre deux messages du canal
+            max_images (int): Nombre maximum d'images dans le collage d'un résumé
+            failure_backoff (float): Attente avant de réessayer après un échec, doublée à chaque échec suivant
+            max_failure_backoff (float): Attente maximum entre deux essais après des échecs
+        """
+        self.alert_cooldown = float(alert_cooldown)
+        self.min_interval = float(min_interval)
+        self.max_images = max(1, int(max_images))
+        self.failure_backoff = float(failure_backoff)
+        self.max_failure_backoff = float(max_failure_backoff)
+
+    @classmethod
+    def from_config(cls, channel_config):
+        """Lit alert_cooldown, min_interval, max_images et les délais après échec dans la section du canal"""
+        return cls(channel_config.get('alert_cooldown', 0),
+                   channel_config.get('min_interval', 0),
+                   channel_config.get('max_images', 4),
+                   channel_config.get('failure_backoff', 5),
+                   channel_config.get('max_failure_backoff', 300))
+
+    def backoff(self, failures):
+        """Attente avant le prochain essai après failures échecs consécutifs"""
+        return min(self.failure_backoff * (2 ** (failures - 1)), self.max_failure_backoff)
+
+
+class PendingObject:
+    """Détections d'un même objet en attente d'envoi sur un canal"""
+    def __init__(self, object_name):
+        self.object_name = object_name
+        self.count = 0
+        self.confidence = 0.0
+        self.frame = None
+        self.image = None
+        self.image_path = None
+        self.first_seen = None
+        self.last_seen = None
+
+    def add(self, confidence, frame, image, image_path, timestamp):
+        self.count += 1
+        self.first_seen = self.first_seen or timestamp
+        self.last_seen = timestamp
+        # Garder l'image la plus représentative : celle de meilleure confiance
+        if confidence >= self.confidence:
+            self.confidence = confidence
+            self.frame = frame
+            self.image = image
+            self.image_path = image_path
+
+    def merge(self, other):
+        """Ajoute les détections d'un autre PendingObject du même objet"""
+        self.count += other.count
+        self.first_seen = min(self.first_seen, other.first_seen)
+        self.last_seen = max(self.last_seen, other.last_seen)
+        if other.confidence >= self.confidence:
+            self.confidence = other.confidence
+            self.frame = other.frame
+            self.image = other.image
+            self.image_path = other.image_path
+
+
+class Digest:
+    """Une notification : une alerte seule ou le résumé d'une rafale"""
+    def __init__(self, objects, max_images=4):
+        """
+        Args:
+            objects (list): PendingObject à notifier
+            max_images (int): Nombre maximum d'images dans le collage
+        """
+        self.objects = sorted(objects, key=lambda o: -o.confidence)
+        self.max_images = max_images
+        self.count = sum(o.count for o in self.objects)
+
+    @property
+    def is_single(self):
+        return self.count == 1
+
+    @property
+    def title(self):
+        if self.is_single:
+            return f"Alerte de sécurité - {self.objects[0].object_name} détecté"
+        names = ", ".join(o.object_name for o in self.objects)
+        return f"Alerte de sécurité - {self.count} détections ({names})"
+
+    @property
+    def message(self):
+        if self.is_single:
+            alert = self.objects[0]
+            return (
+                f"⚠️ ALERTE DE SÉCURITÉ ⚠️\n\n"
+                f"Objet dangereux détecté: {alert.object_name}\n"
+                f"Niveau de confiance: {alert.confidence:.2%}\n"
+                f"Horodatage: {alert.last_seen.strftime('%Y-%m-%d %H:%M:%S')}"
+            )
+        first = min(o.first_seen for o in self.objects)
+        last = max(o.last_seen for o in self.objects)
+        lines = [f"- {o.object_name}: {o.count} détection(s), confiance max {o.confidence:.2%}"
+                 for o in self.objects]
+        return (
+            f"⚠️ ALERTE DE SÉCURITÉ ⚠️\n\n"
+            f"{self.count} détections entre {first.strftime('%H:%M:%S')} "
+            f"et {last.strftime('%H:%M:%S')}:\n" + "\n".join(lines)
+        )
+
+    @property
+    def image_path(self):
+        """Image déjà enregistrée, utilisable telle quelle quand un seul objet est concerné"""
+        if len(self.objects) == 1:
+            return self.objects[0].image_path
+        return None
+
+    def images(self):
+        """Image encodée (EncodedImage) de chaque objet, par confiance décroissante, au plus max_images"""
+        return [o.image for o in self.objects if o.image is not None][:self.max_images]
+
+    def frames(self):
+        """Meilleure image de chaque objet, par confiance décroissante, au plus max_images"""
+        return [o.frame for o in self.objects if o.frame is not None][:self.max_images]
+
+    def image(self, tile_width=320):
+        """
+        Image de la notification : l'image de l'objet, ou un collage pour plusieurs objets
+
+        Returns:
+            numpy.ndarray: Image BGR, ou None sans image disponible
+        """
+        frames = self.frames()
+        if not frames:
+            return None
+        if len(frames) == 1:
+            return frames[0]
+        return make_collage(frames, tile_width)
+
+
+def make_collage(frames, tile_width=320):
+    """
+    Assemble des images en une grille de vignettes de même taille
+
+    Args:
+        frames (list): Images BGR
+        tile_width (int): Largeur d'une vignette en pixels
+
+    Returns:
+        numpy.ndarray: Collage BGR
+    """
+    height, width = frames[0].shape[:2]
+    tile_height = max(1, int(round(height * tile_width / width)))
+    columns = int(np.ceil(np.sqrt(len(frames))))
+    rows = int(np.ceil(len(frames) / columns))
+    collage = np.zeros((rows * tile_height, columns * tile_width, 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        row, column = divmod(i, columns)
+        collage[row * tile_height:(row + 1) * tile_height,
+                column * tile_width:(column + 1) * tile_width] = cv2.resize(
+                    frame, (tile_width, tile_height), interpolation=cv2.INTER_AREA)
+    return collage
+
+
+class NotificationScheduler:
+    """
+    Applique les limites d'envoi de chaque canal et regroupe les rafales
+
+    Une alerte part immédiatement si le canal et l'objet sont hors délai
+    de refroidissement ; sinon elle est mise en attente, et les alertes en
+    attente partent ensemble dans un seul résumé dès que les délais le
+    permettent. Un objet encore dans son délai reste en attente même quand
+    un autre objet part. Les délais ne comptent qu'à partir d'un envoi
+    réussi : un envoi en échec remet ses alertes en attente, et le canal
+    n'est réessayé qu'après un délai qui double à chaque nouvel échec.
+    """
+    def __init__(self, clock=time.monotonic):
+        self.logger = logging.getLogger(__name__)
+        self.clock = clock
+        self.channels = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_channel(self, name, send, policy):
+        """
+        Déclare un canal
+
+        Args:
+            name (str): Nom du canal
+            send (callable): Appelée avec un Digest, retourne True si l'envoi a réussi
+            policy (ChannelPolicy): Limites du canal
+        """
+        self.channels[name] = {
+            "send": send,
+            "policy": policy,
+            "last_sent": None,  # Horloge du dernier message du canal
+            "object_sent": {},  # Horloge du dernier message par objet
+            "pending": {},  # Objet -> PendingObject
+            "sending": False,  # Un résumé est en cours d'envoi
+            "failures": 0,  # Échecs consécutifs
+            "retry_at": None,  # Horloge avant laquelle le canal en échec n'est pas réessayé
+            "sent": 0,
+            "coalesced": 0
+        }
+
+    def submit(self, object_name, confidence, frame=None, image=None, image_path=None, timestamp=None):
+        """
+        Soumet une alerte à tous les canaux
+
+        Args:
+            object_name (str): Objet détecté
+            confidence (float): Confiance de la détection
+            frame (numpy.ndarray, optional): Image de la détection, pour les collages
+            image (EncodedImage, optional): Même image, déjà encodée pour l'envoi
+            image_path (str, optional): Fichier où l'image a été enregistrée
+            timestamp (datetime, optional): Heure de la détection
+
+        Returns:
+            dict: Canal -> "sent", "queued" ou "failed"
+        """
+        timestamp = timestamp or datetime.now()
+        results = {}
+        for name, channel in self.channels.items():
+            now = self.clock()
+            with self._lock:
+                pending = channel["pending"].setdefault(object_name, PendingObject(object_name))
+                pending.add(float(confidence), frame, image, image_path, timestamp)
+                digest = self._take_due(channel, now)
+            if digest is None:
+                results[name] = "queued"
+            else:
+                results[name] = "sent" if self._send(name, channel, digest, now) else "failed"
+        return results
+
+    def flush_due(self):
+        """Envoie les résumés dont les délais sont écoulés, retourne le nombre de messages envoyés"""
+        sent = 0
+        for name, channel in self.channels.items():
+            now = self.clock()
+            with self._lock:
+                digest = self._take_due(channel, now)
+            if digest is not None and self._send(name, channel, digest, now):
+                sent += 1
+        return sent
+
+    def _take_due(self, channel, now):
+        """
+        Retire du canal les objets hors délai si un message peut partir maintenant
+
+        Les objets encore dans leur délai de refroidissement restent en
+        attente. Les délais ne sont mis à jour qu'après l'envoi (_send).
+        """
+        if not channel["pending"] or channel["sending"]:
+            return None
+        if channel["retry_at"] is not None and now < channel["retry_at"]:
+            return None
+        policy = channel["policy"]
+        if channel["last_sent"] is not None and now - channel["last_sent"] < policy.min_interval:
+            return None
+        object_sent = channel["object_sent"]
+        due = [pending for object_name, pending in channel["pending"].items()
+               if object_sent.get(object_name) is None or now - object_sent[object_name] >= policy.alert_cooldown]
+        if not due:
+            return None
+
+        for pending in due:
+            del channel["pending"][pending.object_name]
+        channel["sending"] = True
+        return Digest(due, policy.max_images)
+
+    def _send(self, name, channel, digest, now):
+        try:
+            sent = bool(channel["send"](digest))
+        except Exception as e:
+            self.logger.error(f"Failed to send {name} notification: {str(e)}")
+            sent = False
+
+        with self._lock:
+            channel["sending"] = False
+            if sent:
+                channel["sent"] += 1
+                channel["failures"] = 0
+                channel["retry_at"] = None
+                channel["coalesced"] += digest.count - 1
+                channel["last_sent"] = now
+                for pending in digest.objects:
+                    channel["object_sent"][pending.object_name] = now
+            else:
+                # Les alertes repartent après le délai d'échec, sans consommer les délais d'envoi
+                channel["failures"] += 1
+                delay = channel["policy"].backoff(channel["failures"])
+                channel["retry_at"] = self.clock() + delay
+                for pending in digest.objects:
+                    queued = channel["pending"].get(pending.object_name)
+                    if queued is not None:
+                        pending.merge(queued)
+                    channel["pending"][pending.object_name] = pending
+        if sent and not digest.is_single:
+            self.logger.info(f"Sent {name} digest of {digest.count} alerts")
+        if not sent:
+            self.logger.warning(f"{name} notification failed, {digest.count} alerts kept, "
+                                f"next attempt in {delay:.0f}s")
+        return sent
+
+    def start(self, period=1.0):
+        """Démarre le thread qui envoie les résumés en attente"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(period):
+                self.flush_due()
+
+        self._thread = threading.Thread(target=run, name="notification-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le thread d'envoi des résumés"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def get_stats(self):
+        """Messages envoyés, alertes regroupées et en attente par canal"""
+        with self._lock:
+            return {name: {"sent": channel["sent"],
+                           "coalesced": channel["coalesced"],
+                           "pending": sum(p.count for p in channel["pending"].values())}
+                    for name, channel in self.channels.items()}
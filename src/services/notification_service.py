@@ -1,18 +1,22 @@
-import requests
-import smtplib
 import json
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
-from datetime import datetime
-import cv2
 from pathlib import Path
 import logging
 
+from .notification_scheduler import ChannelPolicy, NotificationScheduler
+from .telegram_client import MAX_CAPTION_LENGTH, client_from_config
+from .email_sender import SmtpSender, build_message
+from .alert_image import AlertImageEncoder, EncodedImage
+from ..core.image_writer import get_image_writer
+
 class NotificationManager:
-    def __init__(self, config_path='config.json'):
+    def __init__(self, config_path='config.json', image_writer=None):
         self.config = self._load_config(config_path)
         self.setup_logging()
+        self.smtp_sender = None  # Session SMTP ouverte au premier e-mail
+        # Chaque image d'alerte est encodée une seule fois pour tous les canaux
+        self.image_encoder = AlertImageEncoder.from_config(self.config)
+        self.image_writer = image_writer or get_image_writer(self.config)
+        self.setup_scheduler()
         
     def _load_config(self, config_path):
         with open(config_path, 'r') as f:
@@ -25,30 +29,49 @@ class NotificationManager:
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
     
-    def send_telegram_alert(self, message, image_path=None):
+    def setup_scheduler(self):
+        """Déclare les canaux activés avec leurs délais de refroidissement"""
+        self.scheduler = NotificationScheduler()
+        channels = self.config.get('notifications', {})
+        if channels.get('telegram', {}).get('enabled'):
+            self.scheduler.add_channel('telegram', self._send_telegram_digest,
+                                       ChannelPolicy.from_config(channels['telegram']))
+        if channels.get('email', {}).get('enabled'):
+            self.scheduler.add_channel('email', self._send_email_digest,
+                                       ChannelPolicy.from_config(channels['email']))
+        self.scheduler.start()
+    
+    def _send_telegram_digest(self, digest):
+        telegram_config = self.config['notifications']['telegram']
+        images = digest.images()
+        if not telegram_config.get('send_images', True) or not images:
+            return self.send_telegram_alert(digest.message)
+        if len(images) == 1:
+            return self.send_telegram_alert(digest.message, image=images[0])
+        if telegram_config.get('media_group', True):
+            # Un album avec la meilleure image de chaque objet plutôt qu'un collage
+            return self.send_telegram_album(digest.message, images)
+        return self.send_telegram_alert(digest.message, image=self.image_encoder.encode(digest.image()))
+    
+    def _send_email_digest(self, digest):
+        # Résumé d'une rafale : un seul e-mail avec la meilleure image de chaque objet
+        return self.send_email_alert(digest.title, digest.message, images=digest.images())
+    
+    def send_telegram_alert(self, message, image_path=None, image=None):
         if not self.config['notifications']['telegram']['enabled']:
             return False
             
         try:
-            bot_token = self.config['notifications']['telegram']['bot_token']
-            chat_id = self.config['notifications']['telegram']['chat_id']
+            client = client_from_config(self.config['notifications']['telegram'])
             
             # Envoyer le message
-            url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            response = requests.post(url, data={
-                "chat_id": chat_id,
-                "text": message,
-                "parse_mode": "HTML"
-            })
+            client.send_message(message, parse_mode="HTML")
             
-            # Envoyer l'image si disponible
-            if image_path and Path(image_path).exists():
-                url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
-                with open(image_path, 'rb') as photo:
-                    requests.post(url, files={'photo': photo}, data={
-                        "chat_id": chat_id,
-                        "caption": "Capture de la détection"
-                    })
+            # Envoyer l'image si disponible, de préférence déjà encodée
+            if image is not None:
+                client.send_photo(image.data, caption="Capture de la détection")
+            elif image_path and Path(image_path).exists():
+                client.send_photo(image_path, caption="Capture de la détection")
             
             logging.info(f"Alert sent to Telegram: {message}")
             return True
@@ -57,31 +80,41 @@ class NotificationManager:
             logging.error(f"Failed to send Telegram alert: {str(e)}")
             return False
     
-    def send_email_alert(self, subject, message, image_path=None):
-        if not self.config['notifications']['email']['enabled']:
+    def send_telegram_album(self, message, images):
+        """Envoie plusieurs images en un seul album, légendé par le message"""
+        if not self.config['notifications']['telegram']['enabled']:
             return False
             
         try:
-            email_config = self.config['notifications']['email']
-            msg = MIMEMultipart()
-            msg['From'] = email_config['sender_email']
-            msg['To'] = email_config['recipient_email']
-            msg['Subject'] = subject
+            client = client_from_config(self.config['notifications']['telegram'])
+            if len(message) > MAX_CAPTION_LENGTH:
+                client.send_message(message)
+                message = None
+            client.send_media_group([image.data if isinstance(image, EncodedImage) else image
+                                     for image in images], caption=message)
+            logging.info(f"Album of {len(images)} images sent to Telegram")
+            return True
             
-            msg.attach(MIMEText(message, 'plain'))
+        except Exception as e:
+            logging.error(f"Failed to send Telegram album: {str(e)}")
+            return False
+    
+    def send_email_alert(self, subject, message, image_path=None, images=()):
+        if not self.config['notifications']['email']['enabled']:
+            return False
             
-            # Ajouter l'image si disponible
+        try:
+            # Ajouter les images si disponibles
+            attachments = []
             if image_path and Path(image_path).exists():
-                with open(image_path, 'rb') as f:
-                    img = MIMEImage(f.read())
-                    img.add_header('Content-Disposition', 'attachment', filename=Path(image_path).name)
-                    msg.attach(img)
+                attachments.append((Path(image_path).name, Path(image_path).read_bytes()))
+            for i, image in enumerate(images):
+                attachments.append((f"detection_{i + 1}.jpg", image.data))
             
-            # Connexion au serveur SMTP
-            with smtplib.SMTP(email_config['smtp_server'], email_config['smtp_port']) as server:
-                server.starttls()
-                server.login(email_config['sender_email'], email_config['sender_password'])
-                server.send_message(msg)
+            # Session SMTP gardée ouverte d'une alerte à l'autre
+            if self.smtp_sender is None:
+                self.smtp_sender = SmtpSender.from_config(self.config['notifications']['email'])
+            self.smtp_sender.send(build_message(subject, message, attachments))
             
             logging.info(f"Email alert sent: {subject}")
             return True
@@ -91,42 +124,45 @@ class NotificationManager:
             return False
     
     def save_detection_image(self, frame, object_name):
-        """Sauvegarde une image de la détection"""
+        """
+        Sauvegarde une image de la détection (image BGR ou EncodedImage déjà encodée)
+        
+        L'écriture se fait en arrière-plan ; le chemin, unique, est retourné tout de suite.
+        """
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"detection_{object_name}_{timestamp}.jpg"
-            path = Path("detections") / filename
-            path.parent.mkdir(exist_ok=True)
+            image = frame if isinstance(frame, EncodedImage) else self.image_encoder.encode(frame)
+            if image is None:
+                return None
+            path = self.image_writer.reserve_path("detections", f"detection_{object_name}", "jpg")
+            if not self.image_writer.submit(path, image.data):
+                return None
             
-            cv2.imwrite(str(path), frame)
-            logging.info(f"Detection image saved: {filename}")
-            return str(path)
+            if (image.thumbnail is not None and
+                    self.config['notifications'].get('images', {}).get('save_thumbnails', True)):
+                self.image_writer.submit(f"{path[:-4]}_thumb.jpg", image.thumbnail)
+            logging.info(f"Detection image queued: {Path(path).name}")
+            return path
             
         except Exception as e:
             logging.error(f"Failed to save detection image: {str(e)}")
             return None
     
     def send_alert(self, object_name, confidence, frame=None):
-        """Envoie une alerte sur tous les canaux configurés"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        message = (
-            f"⚠️ ALERTE DE SÉCURITÉ ⚠️\n\n"
-            f"Objet dangereux détecté: {object_name}\n"
-            f"Niveau de confiance: {confidence:.2%}\n"
-            f"Horodatage: {timestamp}"
-        )
+        """
+        Envoie une alerte sur tous les canaux configurés
         
-        # Sauvegarder l'image si un frame est fourni
-        image_path = None
+        Chaque canal applique ses délais (alert_cooldown par objet,
+        min_interval entre deux messages) : une alerte trop rapprochée est
+        regroupée avec les suivantes dans un résumé envoyé plus tard.
+        """
+        # Encoder l'image une fois : le même JPEG part sur le disque, Telegram et l'e-mail
+        image = image_path = None
         if frame is not None:
-            image_path = self.save_detection_image(frame, object_name)
+            image = self.image_encoder.encode(frame)
+        if image is not None:
+            image_path = self.save_detection_image(image, object_name)
         
-        # Envoyer les notifications
-        telegram_sent = self.send_telegram_alert(message, image_path)
-        email_sent = self.send_email_alert(
-            f"Alerte de sécurité - {object_name} détecté",
-            message,
-            image_path
-        )
+        results = self.scheduler.submit(object_name, confidence, frame, image=image, image_path=image_path)
         
-        return telegram_sent or email_sent  # Retourne True si au moins une notification a été envoyée
\ No newline at end of file
+        # Retourne True si au moins une notification a été envoyée ou mise en attente
+        return any(result != "failed" for result in results.values())
\ No newline at end of file
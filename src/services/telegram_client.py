@@ -0,0 +1,201 @@
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+MAX_MEDIA_GROUP = 10  # Limite de l'API sendMediaGroup
+MAX_CAPTION_LENGTH = 1024
+
+
+class TelegramError(Exception):
+    """Échec d'un appel à l'API Telegram après les nouvelles tentatives"""
+
+
+class TelegramClient:
+    """
+    Client de l'API Telegram Bot sur une session HTTP persistante
+
+    Les connexions TCP/TLS sont gardées ouvertes et réutilisées d'un
+    message à l'autre. Les erreurs de connexion (dont le dépassement du
+    délai de connexion), les réponses 5xx et 429 sont retentées avec un
+    délai croissant (ou le retry_after demandé par Telegram). Un délai de
+    réponse dépassé ne l'est pas : la requête a pu être traitée, et la
+    renvoyer enverrait le message en double.
+    """
+    def __init__(self, bot_token, chat_id, base_url=TELEGRAM_API_URL, connect_timeout=5.0,
+                 read_timeout=20.0, max_retries=3, retry_backoff=0.5, max_retry_delay=30.0,
+                 pool_size=4):
+        """
+        Args:
+            bot_token (str): Jeton du bot
+            chat_id (str): Conversation destinataire
+            base_url (str): URL de l'API (un serveur local dans les tests)
+            connect_timeout (float): Délai maximum d'établissement de la connexion, en secondes
+            read_timeout (float): Délai maximum d'attente de la réponse, en secondes
+            max_retries (int): Nombre de nouvelles tentatives après un échec
+            retry_backoff (float): Délai avant la première nouvelle tentative, doublé ensuite
+            max_retry_delay (float): Délai maximum entre deux tentatives
+            pool_size (int): Connexions gardées ouvertes
+        """
+        self.logger = logging.getLogger(__name__)
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = retry_backoff
+        self.max_retry_delay = max_retry_delay
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        """Ferme les connexions ouvertes"""
+        self.session.close()
+
+    def send_message(self, text, parse_mode=None):
+        """Envoie un message texte"""
+        data = {"chat_id": self.chat_id, "text": text}
+        if parse_mode:
+            data["parse_mode"] = parse_mode
+        return self._call("sendMessage", data)
+
+    def send_photo(self, photo, caption=None):
+        """
+        Envoie une photo
+
+        Args:
+            photo: Chemin d'un fichier, octets JPEG ou image BGR (numpy.ndarray)
+            caption (str, optional): Légende
+        """
+        data = {"chat_id": self.chat_id}
+        if caption:
+            data["caption"] = caption[:MAX_CAPTION_LENGTH]
+        return self._call("sendPhoto", data, {"photo": ("alert.jpg", _photo_bytes(photo), "image/jpeg")})
+
+    def send_media_group(self, photos, caption=None):
+        """
+        Envoie plusieurs photos groupées en un seul message (album)
+
+        Les albums de plus de 10 photos sont découpés. La légende est
+        portée par la première photo.
+
+        Args:
+            photos (list): Chemins, octets JPEG ou images BGR
+            caption (str, optional): Légende de l'album
+
+        Returns:
+            list: Résultats de l'API, un par requête
+        """
+        if len(photos) == 1:
+            return [self.send_photo(photos[0], caption)]
+        results = []
+        for start in range(0, len(photos), MAX_MEDIA_GROUP):
+            chunk = photos[start:start + MAX_MEDIA_GROUP]
+            if len(chunk) == 1:
+                results.append(self.send_photo(chunk[0]))
+                continue
+            media, files = [], {}
+            for i, photo in enumerate(chunk):
+                name = f"photo{i}"
+                item = {"type": "photo", "media": f"attach://{name}"}
+                if caption and start == 0 and i == 0:
+                    item["caption"] = caption[:MAX_CAPTION_LENGTH]
+                media.append(item)
+                files[name] = (f"{name}.jpg", _photo_bytes(photo), "image/jpeg")
+            results.append(self._call("sendMediaGroup",
+                                      {"chat_id": self.chat_id, "media": json.dumps(media)}, files))
+        return results
+
+    def _call(self, method, data, files=None):
+        """Appelle une méthode de l'API, avec nouvelles tentatives"""
+        url = f"{self.base_url}/bot{self.bot_token}/{method}"
+        error = None
+        for attempt in range(self.max_retries + 1):
+            delay = min(self.retry_backoff * (2 ** attempt), self.max_retry_delay)
+            try:
+                response = self.session.post(url, data=data, files=files, timeout=self.timeout)
+            except requests.ConnectionError as e:
+                # Inclut ConnectTimeout : la requête n'est pas partie
+                error = str(e)
+            except requests.Timeout as e:
+                raise TelegramError(f"{method} failed: no response within {self.timeout[1]}s, "
+                                    f"not retried to avoid a duplicate: {str(e)}")
+            else:
+                if response.status_code == 429:
+                    error = "rate limited"
+                    try:
+                        retry_after = response.json().get('parameters', {}).get('retry_after')
+                    except ValueError:
+                        retry_after = None
+                    if retry_after is not None:
+                        delay = min(float(retry_after), self.max_retry_delay)
+                elif response.status_code >= 500:
+                    error = f"HTTP {response.status_code}"
+                else:
+                    try:
+                        payload = response.json()
+                    except ValueError:
+                        payload = {}
+                    if response.ok and payload.get('ok', False):
+                        return payload.get('result')
+                    # Erreur du client (requête invalide, jeton refusé...) : inutile de réessayer
+                    raise TelegramError(f"{method} failed: HTTP {response.status_code} "
+                                        f"{payload.get('description', response.text[:200])}")
+
+            if attempt < self.max_retries:
+                self.logger.warning(f"Telegram {method} failed ({error}), "
+                                    f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+        raise TelegramError(f"{method} failed after {self.max_retries + 1} attempt(s): {error}")
+
+
+def _photo_bytes(photo):
+    """Contenu JPEG d'une photo donnée par chemin, octets ou image"""
+    if isinstance(photo, (bytes, bytearray)):
+        return bytes(photo)
+    if isinstance(photo, np.ndarray):
+        ok, buffer = cv2.imencode(".jpg", photo)
+        if not ok:
+            raise TelegramError("Failed to encode image")
+        return buffer.tobytes()
+    return Path(photo).read_bytes()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(bot_token, chat_id, **options):
+    """
+    Client partagé pour un bot et une conversation
+
+    Tous les appelants (service de notification, interface) réutilisent
+    ainsi la même session et ses connexions ouvertes.
+    """
+    key = (options.get('base_url', TELEGRAM_API_URL), bot_token, chat_id)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = TelegramClient(bot_token, chat_id, **options)
+        return client
+
+
+def client_from_config(telegram_config):
+    """Client partagé configuré par la section notifications.telegram"""
+    return get_client(telegram_config.get('bot_token', ''),
+                      telegram_config.get('chat_id', ''),
+                      base_url=telegram_config.get('api_url', TELEGRAM_API_URL),
+                      connect_timeout=telegram_config.get('connect_timeout', 5.0),
+                      read_timeout=telegram_config.get('read_timeout', 20.0),
+                      max_retries=telegram_config.get('max_retries', 3),
+                      retry_backoff=telegram_config.get('retry_backoff', 0.5))
@@ -11,11 +11,18 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
 import io
 
+from src.services.alert_rollups import create_rollups, refresh_rollups
+from src.services.alert_schema import migrate, day_number, today_number, utc_days_ago, SECONDS_PER_DAY
+
 class StatsAnalyzer:
     def __init__(self, db_path='danger_detection.db', config_path='config.json'):
         self.db_path = db_path
         self.load_config(config_path)
         self.setup_logging()
+        # Les rapports lisent les agrégats par jour, par heure et par objet
+        with sqlite3.connect(self.db_path) as conn:
+            migrate(conn)
+            create_rollups(conn)
         
     def load_config(self, config_path):
         with open(config_path, 'r') as f:
@@ -25,22 +32,24 @@ class StatsAnalyzer:
         self.logger = logging.getLogger('DangerDetection.Stats')
         
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """Connexion à la base, avec les agrégats rattrapés sur les dernières alertes"""
+        conn = sqlite3.connect(self.db_path)
+        refresh_rollups(conn)
+        return conn
         
     def generate_daily_report(self):
         """Génère un rapport quotidien des détections"""
         try:
             with self.get_connection() as conn:
-                df = pd.read_sql_query("""
+                df = pd.read_sql_query(f"""
                     SELECT 
                         object,
-                        strftime('%Y-%m-%d', timestamp) as date,
-                        COUNT(*) as count
-                    FROM alerts 
-                    WHERE timestamp >= date('now', '-30 days')
-                    GROUP BY object, date
-                    ORDER BY date DESC
-                """, conn)
+                        date(day * {SECONDS_PER_DAY}, 'unixepoch') as date,
+                        count
+                    FROM rollup_daily_object 
+                    WHERE day >= ?
+                    ORDER BY day DESC
+                """, conn, params=(utc_days_ago(30),))
                 
                 # Créer le graphique
                 fig = Figure(figsize=(12, 6))
@@ -83,15 +92,16 @@ class StatsAnalyzer:
         """Génère une heatmap des détections par heure et jour"""
         try:
             with self.get_connection() as conn:
+                # Le 1er janvier 1970 (jour 0) était un jeudi, d'où le décalage de 4
                 df = pd.read_sql_query("""
                     SELECT 
-                        strftime('%w', timestamp) as day_of_week,
-                        strftime('%H', timestamp) as hour,
-                        COUNT(*) as count
-                    FROM alerts 
-                    WHERE timestamp >= date('now', ?)
+                        CAST((day + 4) % 7 AS TEXT) as day_of_week,
+                        printf('%02d', hour) as hour,
+                        SUM(count) as count
+                    FROM rollup_hourly 
+                    WHERE day >= ?
                     GROUP BY day_of_week, hour
-                """, conn, params=(f'-{days} days',))
+                """, conn, params=(utc_days_ago(days),))
                 
                 # Créer la heatmap
                 pivot_table = df.pivot(index='day_of_week', 
@@ -123,15 +133,15 @@ class StatsAnalyzer:
         """Analyse les tendances des détections"""
         try:
             with self.get_connection() as conn:
-                df = pd.read_sql_query("""
+                df = pd.read_sql_query(f"""
                     SELECT 
                         object,
-                        timestamp,
-                        COUNT(*) as count
-                    FROM alerts 
-                    WHERE timestamp >= date('now', ?)
-                    GROUP BY object, date(timestamp)
-                """, conn, params=(f'-{days} days',))
+                        date(day * {SECONDS_PER_DAY}, 'unixepoch') as timestamp,
+                        count
+                    FROM rollup_daily_object 
+                    WHERE day >= ?
+                    ORDER BY object, day
+                """, conn, params=(utc_days_ago(days),))
                 
                 df['timestamp'] = pd.to_datetime(df['timestamp'])
                 
@@ -170,23 +180,20 @@ class StatsAnalyzer:
         """Génère un résumé des alertes pour l'interface"""
         try:
             with self.get_connection() as conn:
-                today = datetime.now().strftime('%Y-%m-%d')
-                
                 # Statistiques du jour
                 today_stats = pd.read_sql_query("""
-                    SELECT object, COUNT(*) as count
-                    FROM alerts 
-                    WHERE date(timestamp) = ?
-                    GROUP BY object
-                """, conn, params=(today,))
+                    SELECT object, count
+                    FROM rollup_daily_object 
+                    WHERE day = ?
+                """, conn, params=(today_number(),))
                 
                 # Statistiques de la semaine
                 week_stats = pd.read_sql_query("""
-                    SELECT object, COUNT(*) as count
-                    FROM alerts 
-                    WHERE timestamp >= date('now', '-7 days')
+                    SELECT object, SUM(count) as count
+                    FROM rollup_daily_object 
+                    WHERE day >= ?
                     GROUP BY object
-                """, conn)
+                """, conn, params=(utc_days_ago(7),))
                 
                 return {
                     'today': {
@@ -205,27 +212,27 @@ class StatsAnalyzer:
             return None
             
     def export_statistics(self, start_date=None, end_date=None, format='csv'):
-        """Exporte les statistiques dans différents formats"""
+        """Exporte les statistiques dans différents formats (par jour, bornes incluses)"""
         try:
             with self.get_connection() as conn:
-                query = """
+                query = f"""
                     SELECT 
                         object,
-                        timestamp,
-                        COUNT(*) as count
-                    FROM alerts 
+                        date(day * {SECONDS_PER_DAY}, 'unixepoch') as timestamp,
+                        count
+                    FROM rollup_daily_object 
                     WHERE 1=1
                 """
                 params = []
                 
                 if start_date:
-                    query += " AND timestamp >= ?"
-                    params.append(start_date)
+                    query += " AND day >= ?"
+                    params.append(day_number(start_date))
                 if end_date:
-                    query += " AND timestamp <= ?"
-                    params.append(end_date)
+                    query += " AND day <= ?"
+                    params.append(day_number(end_date))
                     
-                query += " GROUP BY object, date(timestamp)"
+                query += " ORDER BY day, object"
                 
                 df = pd.read_sql_query(query, conn, params=params)
                 
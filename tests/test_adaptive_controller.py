@@ -0,0 +1,84 @@
+import pytest
+
+from src.core.adaptive_controller import AdaptiveController
+from src.core.detection_scheduler import DetectionScheduler
+
+
+@pytest.fixture
+def controller():
+    """Contrôleur évalué toutes les secondes avec un budget de 50% CPU"""
+    return AdaptiveController(max_cpu_usage=50, target_latency_ms=100, input_size=608,
+                              min_input_size=320, base_interval_ms=0,
+                              max_interval_ms=400, evaluation_interval=1.0)
+
+
+def test_no_decision_before_evaluation_interval(controller):
+    controller.record_inference(1.0)
+    assert controller.update(now=controller._last_eval_wall + 0.5, cpu_usage=99) is None
+
+
+def test_overload_lowers_rate_then_resolution(controller):
+    now = controller._last_eval_wall
+    intervals, sizes = [], []
+    for _ in range(7):
+        now += 1.0
+        controller.record_inference(0.5)
+        controller.update(now=now, cpu_usage=90)
+        intervals.append(controller.interval_ms)
+        sizes.append(controller.input_size)
+
+    assert intervals[:3] == [100.0, 150.0, 225.0]
+    assert sizes[:5] == [608] * 5
+    assert controller.interval_ms == 400.0
+    assert sizes[-1] == 320
+
+
+def test_headroom_restores_resolution_then_rate(controller):
+    controller.input_size = 320
+    controller.interval_ms = 400.0
+    now = controller._last_eval_wall
+    for _ in range(10):
+        now += 1.0
+        controller.record_inference(0.01)
+        controller.update(now=now, cpu_usage=5)
+
+    assert controller.input_size == 608
+    assert controller.interval_ms == 0.0
+
+
+def test_latency_alone_triggers_step_down(controller):
+    controller.record_inference(0.2)
+    settings = controller.update(now=controller._last_eval_wall + 1.0, cpu_usage=10)
+    assert settings["detection_interval_ms"] == 100.0
+
+
+def test_from_config():
+    config = {"system": {"max_cpu_usage": 70},
+              "advanced": {"detection_interval": 100,
+                           "adaptive": {"enabled": True, "target_latency_ms": 200}}}
+    controller = AdaptiveController.from_config(config, 416)
+    assert controller.max_cpu_usage == 70
+    assert controller.input_sizes == [320, 416]
+    assert controller.interval_ms == 100.0
+    assert AdaptiveController.from_config({}, 416) is None
+
+
+def test_input_size_below_minimum_is_kept():
+    controller = AdaptiveController(max_cpu_usage=50, target_latency_ms=100, input_size=160,
+                                    min_input_size=320, max_interval_ms=100)
+    assert controller.input_sizes == [160]
+    for _ in range(3):
+        controller.record_inference(1.0)
+        controller.update(now=controller._last_eval_wall + 1.0, cpu_usage=99)
+    assert controller.input_size == 160
+    controller.record_inference(0.001)
+    controller.update(now=controller._last_eval_wall + 1.0, cpu_usage=1)
+    assert controller.input_size == 160
+
+
+def test_scheduler_interval_override_keeps_configured_floor():
+    scheduler = DetectionScheduler(min_interval_ms=100)
+    scheduler.set_min_interval_ms(500)
+    assert scheduler.min_interval == 0.5
+    scheduler.set_min_interval_ms(0)
+    assert scheduler.min_interval == 0.1
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from src.core.alert_dispatcher import AlertDispatcher, AlertEvent
+
+
+def test_dispatch_does_not_wait_for_slow_handlers():
+    release = threading.Event()
+    handled = []
+    dispatcher = AlertDispatcher([('slow', lambda event: release.wait(2)),
+                                  ('record', lambda event: handled.append(event.label))])
+    dispatcher.start()
+
+    started = time.monotonic()
+    assert dispatcher.dispatch(AlertEvent("knife", 0.9, (1, 2, 3, 4)))
+    assert time.monotonic() - started < 0.05
+
+    release.set()
+    assert dispatcher.flush(2.0)
+    dispatcher.stop()
+    assert handled == ["knife"]
+    assert set(dispatcher.get_stats()["handlers"]) == {"slow", "record"}
+
+
+def test_failing_handler_does_not_block_the_others():
+    handled = []
+
+    def broken(event):
+        raise IOError("disk full")
+
+    dispatcher = AlertDispatcher([('broken', broken), ('record', lambda event: handled.append(event))])
+    dispatcher.start()
+    event = AlertEvent("scissors", 0.7, (10.0, 20.0, 30.0, 40.0))
+    dispatcher.dispatch(event)
+    dispatcher.stop()
+
+    assert handled == [event] and event.location == "x:10,y:20,w:30,h:40"
+    assert dispatcher.get_stats()["errors"] == 1
+
+
+def test_full_queue_drops_new_events():
+    dispatcher = AlertDispatcher([('noop', lambda event: None)], queue_size=2)
+    results = [dispatcher.dispatch(AlertEvent("knife", 0.9, (0, 0, 1, 1))) for _ in range(3)]
+    assert results == [True, True, False]
+    assert dispatcher.get_stats()["dropped"] == 1
+
+    dispatcher.start()
+    dispatcher.stop()
+    assert dispatcher.get_stats()["pending"] == 0
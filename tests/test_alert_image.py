@@ -0,0 +1,37 @@
+import cv2
+import numpy as np
+
+from src.services.alert_image import AlertImageEncoder
+
+
+def noisy_frame(height=720, width=1280):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def test_image_is_downscaled_with_a_thumbnail():
+    image = AlertImageEncoder(max_dimension=640, thumbnail_size=160).encode(noisy_frame())
+
+    assert (image.width, image.height) == (640, 360)
+    decoded = cv2.imdecode(np.frombuffer(image.data, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (360, 640, 3)
+    thumbnail = cv2.imdecode(np.frombuffer(image.thumbnail, np.uint8), cv2.IMREAD_COLOR)
+    assert thumbnail.shape == (90, 160, 3)
+
+
+def test_small_frames_keep_their_size_and_quality_drives_size():
+    frame = noisy_frame(240, 320)
+    high = AlertImageEncoder(quality=95, thumbnail_size=0).encode(frame)
+    low = AlertImageEncoder(quality=40, thumbnail_size=0).encode(frame)
+
+    assert (high.width, high.height) == (320, 240)
+    assert high.thumbnail is None
+    assert len(low) < len(high)
+
+
+def test_saved_file_is_the_encoded_buffer(tmp_path):
+    image = AlertImageEncoder().encode(noisy_frame(120, 160))
+    image.save(tmp_path / "alert.jpg", tmp_path / "alert_thumb.jpg")
+
+    assert (tmp_path / "alert.jpg").read_bytes() == image.data
+    assert (tmp_path / "alert_thumb.jpg").read_bytes() == image.thumbnail
@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from src.services.alert_rollups import catch_up, create_rollups, refresh_rollups
+from src.services.alert_schema import day_number, migrate
+from src.services.alert_store import AlertStore
+
+ALERTS = [
+    ('knife', '2024-05-01 08:15:00', 0.6),
+    ('knife', '2024-05-01 08:45:00', 0.8),
+    ('gun', '2024-05-01 22:00:00', 0.9),
+    ('knife', '2024-05-02 09:30:00', 0.7),
+]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """Base migrée contenant quelques alertes, sans agrégats"""
+    conn = sqlite3.connect(str(tmp_path / "alerts.db"))
+    conn.execute('CREATE TABLE alerts (id INTEGER PRIMARY KEY, object TEXT, '
+                 'timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, confidence REAL, location TEXT)')
+    conn.executemany('INSERT INTO alerts (object, timestamp, confidence) VALUES (?, ?, ?)', ALERTS)
+    conn.commit()
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+def test_existing_alerts_are_rolled_up(conn):
+    assert create_rollups(conn) == 4
+    first, second = day_number('2024-05-01'), day_number('2024-05-02')
+
+    assert conn.execute('SELECT day, object, count FROM rollup_daily_object ORDER BY day, object').fetchall() == [
+        (first, 'gun', 1), (first, 'knife', 2), (second, 'knife', 1)]
+    assert conn.execute('SELECT day, hour, count FROM rollup_hourly ORDER BY day, hour').fetchall() == [
+        (first, 8, 2), (first, 22, 1), (second, 9, 1)]
+    assert conn.execute("SELECT count, first_ts < last_ts FROM rollup_object WHERE object = 'knife'").fetchone() == (3, 1)
+    total, unique, average = conn.execute(
+        "SELECT total_alerts, unique_objects, avg_confidence FROM daily_stats WHERE date = '2024-05-01'").fetchone()
+    assert (total, unique) == (3, 2)
+    assert average == pytest.approx((0.6 + 0.8 + 0.9) / 3)
+
+
+def test_catch_up_only_adds_new_alerts(conn):
+    create_rollups(conn)
+    assert refresh_rollups(conn) == 0
+
+    conn.execute("INSERT INTO alerts (object, timestamp, confidence, ts, day) "
+                 "SELECT 'gun', timestamp, 0.5, ts, day FROM alerts WHERE id = 4")
+    conn.commit()
+    assert refresh_rollups(conn) == 1
+    assert refresh_rollups(conn) == 0
+    assert conn.execute("SELECT total_alerts, unique_objects FROM daily_stats "
+                        "WHERE date = '2024-05-02'").fetchone() == (2, 2)
+
+
+def test_watermark_restarts_after_the_table_is_emptied(conn):
+    create_rollups(conn)
+    conn.execute('DELETE FROM alerts')
+    conn.execute("INSERT INTO alerts (object, timestamp, confidence, ts, day) VALUES ('gun', '2024-05-03', 0.9, ?, ?)",
+                 (day_number('2024-05-03') * 86400, day_number('2024-05-03')))
+    conn.commit()
+
+    assert refresh_rollups(conn) == 1
+    assert conn.execute("SELECT count FROM rollup_object WHERE object = 'gun'").fetchone() == (2,)
+
+
+def test_alert_store_updates_rollups_with_each_batch(conn, tmp_path):
+    create_rollups(conn)
+    store = AlertStore(str(tmp_path / "alerts.db"), batch_size=10, flush_interval=5.0)
+    for _ in range(3):
+        store.add('scissors', 0.5, timestamp='2024-05-02 10:00:00')
+    store.close()
+
+    assert conn.execute("SELECT count FROM rollup_daily_object WHERE object = 'scissors'").fetchone() == (3,)
+    assert conn.execute("SELECT last_id FROM rollup_watermark").fetchone() == (7,)
+    conn.execute('BEGIN IMMEDIATE')
+    assert catch_up(conn) == 0
+    conn.rollback()
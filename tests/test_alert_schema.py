@@ -0,0 +1,62 @@
+import sqlite3
+from datetime import date, datetime
+
+from src.services.alert_schema import day_number, migrate, to_epoch
+from src.services.alert_store import AlertStore
+
+
+def create_alerts(path, timestamps):
+    """Table des alertes d'avant la migration, sans ts ni day"""
+    conn = sqlite3.connect(str(path))
+    conn.execute('CREATE TABLE alerts (id INTEGER PRIMARY KEY, object TEXT, '
+                 'timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, confidence REAL, location TEXT)')
+    conn.executemany('INSERT INTO alerts (object, timestamp, confidence) VALUES (?, ?, 0.8)',
+                     [('knife', t) for t in timestamps])
+    conn.commit()
+    return conn
+
+
+def test_epoch_and_day_match_sqlite():
+    conn = sqlite3.connect(':memory:')
+    for text in ('2024-02-29 23:59:59', '2024-03-01', '1999-12-31 00:00:01'):
+        epoch, day = conn.execute("SELECT CAST(strftime('%s', ?) AS INTEGER), "
+                                  "julianday(date(?)) - 2440587.5", (text, text)).fetchone()
+        assert to_epoch(text) == epoch
+        assert day_number(text) == day
+    assert day_number(date(1970, 1, 2)) == 1
+    assert to_epoch(datetime(2024, 3, 1, 0, 0, 1)) == to_epoch('2024-03-01 00:00:01')
+
+
+def test_migration_backfills_and_indexes(tmp_path):
+    conn = create_alerts(tmp_path / "alerts.db", ['2024-05-01 08:00:00', '2024-05-01 23:30:00',
+                                                  '2024-05-02 00:10:00'])
+    assert migrate(conn) == 3
+    assert migrate(conn) == 0
+
+    days = conn.execute('SELECT day, COUNT(*) FROM alerts GROUP BY day ORDER BY day').fetchall()
+    assert days == [(day_number('2024-05-01'), 2), (day_number('2024-05-02'), 1)]
+    indexes = {row[1] for row in conn.execute('PRAGMA index_list(alerts)')}
+    assert {'idx_alerts_ts', 'idx_alerts_object_ts', 'idx_alerts_day'} <= indexes
+
+
+def test_date_filters_use_the_indexes(tmp_path):
+    conn = create_alerts(tmp_path / "alerts.db", [])
+    migrate(conn)
+    for query in ('SELECT COUNT(*) FROM alerts WHERE day = 19844',
+                  'SELECT object, COUNT(*) FROM alerts WHERE ts >= 1714521600 GROUP BY object',
+                  "SELECT COUNT(*) FROM alerts WHERE object = 'knife' AND ts >= 1714521600"):
+        plan = ' '.join(row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}'))
+        assert 'USING' in plan and 'INDEX' in plan, plan
+
+
+def test_alert_store_fills_the_time_columns(tmp_path):
+    path = tmp_path / "alerts.db"
+    migrate(create_alerts(path, []))
+    store = AlertStore(str(path))
+    store.add('gun', 0.9, timestamp=datetime(2024, 5, 1, 13, 45, 0)).result(timeout=5)
+    store.close()
+
+    with sqlite3.connect(str(path)) as conn:
+        row = conn.execute("SELECT ts, day, ts = CAST(strftime('%s', timestamp) AS INTEGER) "
+                           "FROM alerts").fetchone()
+    assert row == (to_epoch('2024-05-01 13:45:00'), day_number('2024-05-01'), 1)
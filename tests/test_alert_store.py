@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+
+from src.services.alert_store import AlertStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Base avec la table des alertes du service d'analyse"""
+    path = tmp_path / "alerts.db"
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute('''
+            CREATE TABLE alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                object TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                image_path TEXT,
+                location TEXT
+            )
+        ''')
+    return str(path)
+
+
+def rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute('SELECT id, object, confidence, image_path FROM alerts ORDER BY id').fetchall()
+
+
+def test_alerts_are_written_in_batches_and_resolve_to_row_ids(db_path):
+    store = AlertStore(db_path, batch_size=50, flush_interval=5.0)
+    futures = [store.add('knife', 0.5 + i / 1000.0, image_path=f"detection_{i}.jpg") for i in range(100)]
+
+    assert [f.result(timeout=5) for f in futures] == list(range(1, 101))
+    stats = store.get_stats()
+    assert stats["committed"] == 100
+    assert stats["mean_batch_size"] == 50
+    store.close()
+
+    written = rows(db_path)
+    assert len(written) == 100
+    assert written[0] == (1, 'knife', 0.5, "detection_0.jpg")
+
+
+def test_connection_uses_wal(db_path):
+    store = AlertStore(db_path)
+    mode = store.submit(lambda conn: conn.execute('PRAGMA journal_mode').fetchone()[0]).result(timeout=5)
+    store.close()
+    assert mode == 'wal'
+
+
+def test_columns_missing_from_the_table_are_ignored(tmp_path):
+    path = str(tmp_path / "gui.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE alerts (id INTEGER PRIMARY KEY, object TEXT, timestamp TEXT, '
+                     'confidence REAL, location TEXT)')
+    store = AlertStore(path)
+    assert store.add('gun', 0.9, image_path="ignored.jpg", location="(1, 2)").result(timeout=5) == 1
+    store.close()
+
+
+def test_failing_call_does_not_discard_the_rest_of_the_batch(db_path):
+    store = AlertStore(db_path, batch_size=10, flush_interval=5.0)
+
+    def fail(conn):
+        conn.execute("INSERT INTO alerts (object, confidence) VALUES ('partial', 0.1)")
+        raise ValueError("boom")
+
+    first = store.add('knife', 0.8)
+    failed = store.submit(fail)
+    last = store.add('gun', 0.9)
+    store.close()
+
+    assert first.result() == 1
+    with pytest.raises(ValueError):
+        failed.result()
+    assert last.result() == 2
+    assert [row[1] for row in rows(db_path)] == ['knife', 'gun']
+
+
+def test_close_writes_pending_alerts(db_path):
+    store = AlertStore(db_path, batch_size=1000, flush_interval=60.0)
+    for _ in range(5):
+        store.add('knife', 0.7)
+    store.close()
+    assert len(rows(db_path)) == 5
+
+
+def test_missing_table_fails_at_creation(tmp_path):
+    with pytest.raises(sqlite3.OperationalError):
+        AlertStore(str(tmp_path / "empty.db"))
@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.core.detection_engine import DetectionEngine, normalize_labels, resolve_dangerous_objects
+from src.core.model_registry import LoadedModel, ModelRegistry
+
+
+class FakeNet:
+    """Réseau factice : une détection centrée par image du lot"""
+    def __init__(self):
+        self.inputs = []
+
+    def setInput(self, blob):
+        self.inputs.append(blob.copy())
+
+    def forward(self, output_layers):
+        batch = self.inputs[-1].shape[0]
+        out = np.zeros((batch, 2, 85), dtype=np.float32)
+        out[:, 0, :4] = [0.5, 0.5, 0.25, 0.5]
+        out[:, 0, 5 + 43] = 0.9  # knife
+        out[:, 1, :4] = [0.2, 0.2, 0.1, 0.1]
+        out[:, 1, 5 + 0] = 0.8  # person
+        return [out]
+
+
+@pytest.fixture
+def engine():
+    """Moteur de détection sur un réseau factice"""
+    spec = ModelRegistry('models').get('yolov3')
+    classes = [f"class{i}" for i in range(80)]
+    classes[0], classes[43] = "person", "knife"
+    model = LoadedModel(spec, FakeNet(), ["yolo_82"], classes, 416)
+    return DetectionEngine(model, confidence_threshold=0.5, dangerous_objects=["Knife"])
+
+
+def test_detect_returns_frame_coordinates(engine):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    result = engine.detect([frame])[0]
+
+    assert len(result) == 2
+    detections = {label: (x, y, w, h, dangerous)
+                  for x, y, w, h, label, _, dangerous in result.to_list()}
+    # 640x480 letterboxed into 416x416: scale 0.65, 52 px of padding above and below
+    assert detections["knife"] == (240, 80, 160, 320, True)
+    assert detections["person"][4] is False
+
+
+def test_exact_label_matching(engine):
+    assert engine.is_dangerous("knife")
+    assert not engine.is_dangerous("knife block")
+    engine.set_dangerous_objects(["person"])
+    assert engine.is_dangerous("Person") and not engine.is_dangerous("knife")
+
+
+def test_blob_matches_opencv_and_buffers_are_reused(engine):
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (240, 320, 3), dtype=np.uint8) for _ in range(2)]
+
+    engine.model.spec.letterbox = False
+    engine.detect(frames)
+    expected = cv2.dnn.blobFromImages(frames, 1 / 255.0, (416, 416), (0, 0, 0), True, crop=False)
+    np.testing.assert_allclose(engine.net.inputs[-1], expected, atol=1e-6)
+
+    buffers = engine._buffers[(416, 2)]
+    engine.detect(frames)
+    assert engine._buffers[(416, 2)] is buffers
+    assert engine.get_timing_stats()["inference"]["samples"] == 2
+
+
+def test_regions_are_mapped_back(engine):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    result = engine.detect([frame], regions=[[(100, 50, 200, 200)]])[0]
+    boxes = dict(zip(result.labels, result.boxes.tolist()))
+    assert boxes["knife"] == [175, 100, 50, 100]
+
+
+def test_warm_up_is_not_recorded(engine):
+    assert not engine.is_warm
+    durations = engine.warm_up(2)
+    assert len(durations) == 2 and engine.is_warm
+    assert engine.net.inputs[-1].shape == (1, 3, 416, 416)
+    assert engine.get_timing_stats()["inference"]["samples"] == 0
+
+
+def test_dangerous_only_drops_other_classes_before_nms(engine):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    engine.dangerous_only = True
+    result = engine.detect([frame])[0]
+    assert result.labels == ["knife"] and result.dangerous.tolist() == [True]
+
+    engine.set_dangerous_objects([])
+    assert len(engine.detect([frame])[0]) == 0
+
+
+def test_resolve_dangerous_objects_merges_categories():
+    config = {"detection": {"dangerous_objects": ["Knife", "axe"]},
+              "dangerous_objects": {"weapons": ["knife", "scissors"], "camera": ["cell phone"]}}
+    assert resolve_dangerous_objects(config) == {"knife", "axe", "scissors", "cell phone"}
+
+
+def test_letterbox_canvas_is_padded(engine):
+    frame = np.full((240, 640, 3), 200, dtype=np.uint8)
+    engine.detect([frame])
+    blob = engine.net.inputs[-1][0]
+    # 640x240 -> 416x156, centered with 130 rows of padding on each side
+    np.testing.assert_allclose(blob[:, 0, 0], 114 / 255.0, atol=1e-6)
+    np.testing.assert_allclose(blob[:, 208, 208], 200 / 255.0, atol=1e-6)
+    np.testing.assert_allclose(blob[:, 129, 208], 114 / 255.0, atol=1e-6)
+    np.testing.assert_allclose(blob[:, 131, 208], 200 / 255.0, atol=1e-6)
+
+
+def test_labels_are_normalized():
+    assert normalize_labels([" Knife", "CELL PHONE ", "", "  "]) == {"knife", "cell phone"}
@@ -0,0 +1,35 @@
+from src.core.detection_scheduler import DetectionScheduler
+
+
+def _run(scheduler, frames, period):
+    return [scheduler.should_detect(now=i * period) for i in range(frames)]
+
+
+def test_frame_skip():
+    scheduler = DetectionScheduler(frame_skip=2)
+    assert _run(scheduler, 7, 0.033) == [True, False, False, True, False, False, True]
+    assert scheduler.get_stats()["frames_detected"] == 3
+
+
+def test_min_interval_and_target_fps():
+    scheduler = DetectionScheduler(min_interval_ms=100)
+    assert sum(_run(scheduler, 30, 0.030)) == 8
+
+    scheduler = DetectionScheduler(target_fps=5)
+    assert sum(_run(scheduler, 30, 0.030)) == 5
+
+
+def test_from_config_prefers_detection_frame_skip():
+    config = {"detection": {"frame_skip": 1}, "advanced": {"detection_interval": 0}}
+    optimization = {"processing": {"skip_frames": 4}}
+
+    assert DetectionScheduler.from_config(config, optimization).frame_skip == 1
+    assert DetectionScheduler.from_config({}, optimization).frame_skip == 4
+
+
+def test_reset_forces_next_detection():
+    scheduler = DetectionScheduler(frame_skip=10)
+    assert scheduler.should_detect(now=0.0)
+    assert not scheduler.should_detect(now=0.1)
+    scheduler.reset()
+    assert scheduler.should_detect(now=0.2)
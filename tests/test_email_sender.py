@@ -0,0 +1,79 @@
+import socket
+
+import pytest
+
+from src.services.email_sender import SmtpSender, build_message
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+aiosmtpd_smtp = pytest.importorskip("aiosmtpd.smtp")
+
+
+class RecordingHandler:
+    """Serveur SMTP factice : garde les messages reçus et le port client de chaque envoi"""
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer[1], envelope.rcpt_tos, envelope.content))
+        return "250 OK"
+
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    valid = auth_data.login == b"alerts" and auth_data.password == b"secret"
+    return aiosmtpd_smtp.AuthResult(success=valid)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """Serveur aiosmtpd local avec AUTH LOGIN/PLAIN sans TLS"""
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=free_port(),
+                                                authenticator=authenticate, auth_require_tls=False)
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+@pytest.fixture
+def sender(smtp_server):
+    controller, _ = smtp_server
+    sender = SmtpSender(controller.hostname, controller.port, username="alerts", password="secret",
+                        sender="alerts@example.com", recipients=["ops@example.com"], starttls=False)
+    yield sender
+    sender.close()
+
+
+def test_session_is_reused_across_alerts(smtp_server, sender):
+    _, handler = smtp_server
+    for i in range(3):
+        sender.send(build_message(f"Alerte {i}", "knife", [("alert.jpg", b"\xff\xd8\xff\xe0jpeg")]))
+
+    assert sender.connections == 1 and sender.sent == 3
+    assert len(handler.messages) == 3
+    assert len({port for port, _, _ in handler.messages}) == 1
+    assert handler.messages[0][1] == ["ops@example.com"]
+    assert b'filename="alert.jpg"' in handler.messages[0][2]
+
+
+def test_lost_session_is_reopened(smtp_server, sender):
+    _, handler = smtp_server
+    sender.send(build_message("Alerte 1", "knife"))
+    sender._server.sock.shutdown(socket.SHUT_RDWR)  # Connection dropped
+    sender.send(build_message("Alerte 2", "knife"))
+
+    assert sender.connections == 2
+    assert len(handler.messages) == 2
+
+
+def test_idle_session_is_renewed(smtp_server, sender):
+    sender.idle_timeout = 0
+    sender.send(build_message("Alerte 1", "knife"))
+    sender.send(build_message("Alerte 2", "knife"))
+    assert sender.connections == 2
+
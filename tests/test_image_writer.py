@@ -0,0 +1,70 @@
+import logging
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from src.core import image_writer
+from src.core.image_writer import ImageWriter, get_image_writer
+
+
+def test_names_are_unique_within_the_same_second(tmp_path):
+    writer = ImageWriter(workers=2)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    paths = [writer.save(frame, str(tmp_path), "alert_knife") for _ in range(20)]
+    assert writer.flush()
+
+    assert len(set(paths)) == 20
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths)
+    assert writer.get_stats()["written"] == 20
+
+
+def test_images_are_downscaled_and_encoded_in_the_configured_format(tmp_path):
+    writer = ImageWriter(workers=1, image_format='webp', quality=80, max_dimension=100)
+    path = writer.save(np.full((300, 400, 3), 128, dtype=np.uint8), str(tmp_path), "screenshot")
+    writer.flush()
+
+    assert path.endswith(".webp")
+    assert cv2.imread(path).shape == (75, 100, 3)
+
+
+def test_encoded_bytes_are_written_as_is(tmp_path):
+    writer = ImageWriter(workers=1)
+    path = writer.reserve_path(str(tmp_path), "detection", "jpg")
+    writer.submit(path, b"jpeg bytes")
+    writer.flush()
+    with open(path, 'rb') as f:
+        assert f.read() == b"jpeg bytes"
+
+
+def test_full_backlog_drops_instead_of_blocking(tmp_path):
+    writer = ImageWriter(workers=1, queue_size=2)
+    release = threading.Event()
+    encode = writer._encode
+    writer._encode = lambda image: release.wait(2) and encode(image)
+
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+    results = [writer.save(frame, str(tmp_path), "burst") for _ in range(6)]
+    release.set()
+    writer.flush()
+
+    stats = writer.get_stats()
+    assert results.count(None) == stats["dropped"] >= 3
+    assert stats["written"] == 6 - stats["dropped"]
+    assert stats["max_backlog"] == 2 and stats["backlog"] == 0
+
+
+def test_shared_writer_warns_about_ignored_settings(monkeypatch, caplog):
+    monkeypatch.setattr(image_writer, '_writer', None)
+    monkeypatch.setattr(image_writer, '_writer_settings', None)
+    config = {'advanced': {'image_writer': {'workers': 1, 'quality': 70}}}
+    writer = get_image_writer(config)
+
+    with caplog.at_level(logging.WARNING, logger='src.core.image_writer'):
+        assert get_image_writer() is writer
+        assert get_image_writer(config) is writer
+        assert not caplog.records
+        assert get_image_writer({'advanced': {'image_writer': {'quality': 95}}}) is writer
+    assert writer.quality == 70
+    assert "ignoring settings" in caplog.text
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from src.core.model_registry import ModelRegistry, resolve_precision
+from src.core.yolo_decoder import decode_candidates
+
+
+@pytest.fixture
+def registry():
+    """Registre avec un modèle ONNX personnalisé et des réglages par caméra"""
+    return ModelRegistry('models', {
+        "default": "yolov3-tiny",
+        "available": {"custom": {"format": "onnx", "weights": "custom.onnx", "input_size": 640}},
+        "cameras": {"0": {"model": "yolov3", "input_size": 608}, "1": {"model": "custom", "input_size": 320}}
+    })
+
+
+def test_default_and_camera_models(registry):
+    assert registry.get().name == "yolov3-tiny"
+
+    spec, size = registry.for_camera(0)
+    assert (spec.name, size, spec.format) == ("yolov3", 608, "darknet")
+    assert spec.weights.endswith("yolov3.weights") and spec.config.endswith("yolov3.cfg")
+
+    spec, size = registry.for_camera(1)
+    assert (spec.name, size) == ("custom", 640)  # Taille fixe pour ONNX
+
+    spec, size = registry.for_camera("unknown")
+    assert (spec.name, size) == ("yolov3-tiny", 416)
+
+
+def test_input_size_must_be_a_multiple_of_32(registry):
+    with pytest.raises(ValueError, match="multiple of 32"):
+        registry.check_input_size(registry.get("yolov3"), 400, camera_id=2)
+    # A fixed-size model keeps its own size whatever is configured
+    assert registry.check_input_size(registry.get("custom"), 400) == 640
+
+
+def test_unknown_model(registry):
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_onnx_decode_params(registry):
+    spec = registry.get("custom")
+    out = np.zeros((2, 85), dtype=np.float32)
+    out[0, :5] = [320, 320, 64, 64, 0.5]  # Boîte en pixels d'entrée, objectness 0.5
+    out[0, 5] = 0.9
+
+    boxes, confidences, _ = decode_candidates([out], 1280, 1280, 0.3, **spec.decode_params(640))
+    assert boxes.tolist() == [[576, 576, 128, 128]]
+    np.testing.assert_allclose(confidences, [0.45])
+
+
+def test_precision_from_config():
+    assert resolve_precision({}) == "fp32"
+    assert resolve_precision({"advanced": {"optimization": {"use_float16": True}}}) == "fp16"
+    assert resolve_precision({"advanced": {"optimization": {"precision": "int8", "use_float16": True}}}) == "int8"
+    with pytest.raises(ValueError):
+        resolve_precision({"advanced": {"optimization": {"precision": "fp8"}}})
+
+
+def test_int8_variant_falls_back_when_missing(registry):
+    spec = registry.get("yolov3")
+    assert registry._int8_variant(spec) is spec
+    assert registry.get("yolov3-int8").precision == "int8"
@@ -0,0 +1,70 @@
+import numpy as np
+
+from src.core.motion_detector import MotionDetector
+
+
+def _scene():
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 255, (360, 640, 3), dtype=np.uint8)
+
+
+def test_static_scene_is_skipped():
+    detector = MotionDetector(sensitivity=0.3, idle_check_interval=0)
+    frame = _scene()
+
+    assert detector.detect(frame, now=0.0)  # Le premier frame passe toujours
+    assert not any(detector.detect(frame.copy(), now=i * 0.1) for i in range(1, 20))
+    assert detector.get_stats(now=2.0)["static_ratio"] > 0.9
+
+
+def test_moving_object_is_detected():
+    detector = MotionDetector(sensitivity=0.3, idle_check_interval=0)
+    frame = _scene()
+    detector.detect(frame, now=0.0)
+    detector.detect(frame, now=0.1)
+
+    moved = frame.copy()
+    moved[100:200, 200:320] = 0
+    assert detector.detect(moved, now=0.2)
+    assert detector.last_activity > detector.min_area_ratio
+
+
+def test_idle_check_interval_forces_periodic_pass():
+    detector = MotionDetector(idle_check_interval=5.0)
+    frame = _scene()
+    detector.detect(frame, now=0.0)
+
+    assert not detector.detect(frame, now=1.0)
+    assert detector.detect(frame, now=5.5)
+
+
+def test_disabled_in_config():
+    assert MotionDetector.from_config({"detection": {"enable_motion_detection": False}}) is None
+    assert MotionDetector.from_config({"detection": {"enable_motion_detection": True}}) is not None
+
+
+def test_motion_regions_in_full_frame_coordinates():
+    detector = MotionDetector(sensitivity=0.3, idle_check_interval=0)
+    frame = _scene()
+    detector.detect(frame, now=0.0)
+    detector.detect(frame, now=0.1)
+
+    moved = frame.copy()
+    moved[100:160, 400:460] = 0
+    assert detector.detect(moved, now=0.2)
+
+    regions = detector.get_motion_regions(moved.shape, padding=8, min_size=96)
+    assert len(regions) == 1
+    x, y, w, h = regions[0]
+    assert x <= 400 and y <= 100 and x + w >= 460 and y + h >= 160
+    assert w >= 96 and h >= 96 and x + w <= 640 and y + h <= 360
+
+
+def test_large_motion_falls_back_to_full_frame():
+    detector = MotionDetector(sensitivity=0.3, idle_check_interval=0)
+    frame = _scene()
+    detector.detect(frame, now=0.0)
+    detector.detect(frame, now=0.1)
+
+    assert detector.detect(np.zeros_like(frame), now=0.2)
+    assert detector.get_motion_regions(frame.shape) is None
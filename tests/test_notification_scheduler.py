@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from src.services.notification_scheduler import ChannelPolicy, NotificationScheduler, make_collage
+
+
+class FakeClock:
+    """Horloge manuelle pour piloter les délais"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def scheduler():
+    """Canal avec 300 s par objet et 5 s entre deux messages"""
+    clock = FakeClock()
+    scheduler = NotificationScheduler(clock=clock)
+    scheduler.sent = []
+    scheduler.add_channel('telegram', lambda digest: scheduler.sent.append(digest) or True,
+                          ChannelPolicy(alert_cooldown=300, min_interval=5, max_images=4))
+    return scheduler
+
+
+def frame(value):
+    return np.full((120, 160, 3), value, dtype=np.uint8)
+
+
+def test_first_alert_is_sent_right_away(scheduler):
+    assert scheduler.submit("knife", 0.9, frame(1)) == {"telegram": "sent"}
+    digest = scheduler.sent[0]
+    assert digest.is_single and "Objet dangereux détecté: knife" in digest.message
+
+
+def test_burst_is_coalesced_into_one_digest(scheduler):
+    scheduler.submit("knife", 0.6, frame(1))
+    for confidence in (0.7, 0.95, 0.8):
+        scheduler.clock.now += 10
+        assert scheduler.submit("knife", confidence, frame(int(confidence * 100))) == {"telegram": "queued"}
+    assert len(scheduler.sent) == 1
+
+    scheduler.clock.now += 100
+    assert scheduler.flush_due() == 0  # Per-object cooldown still running
+
+    scheduler.clock.now += 300
+    assert scheduler.flush_due() == 1
+    digest = scheduler.sent[1]
+    assert digest.count == 3 and "knife: 3 détection(s)" in digest.message
+    # The representative image is the most confident detection
+    assert digest.image()[0, 0, 0] == 95
+    assert scheduler.get_stats()["telegram"] == {"sent": 2, "coalesced": 2, "pending": 0}
+
+
+def test_new_object_only_waits_for_channel_interval(scheduler):
+    scheduler.submit("knife", 0.9, frame(1))
+    scheduler.clock.now += 1
+    assert scheduler.submit("scissors", 0.8, frame(2)) == {"telegram": "queued"}
+    scheduler.clock.now += 5
+    assert scheduler.flush_due() == 1
+    assert scheduler.sent[1].objects[0].object_name == "scissors"
+
+
+def test_digest_of_several_objects_uses_a_collage(scheduler):
+    scheduler.submit("knife", 0.9, frame(1))
+    scheduler.clock.now += 1
+    scheduler.submit("knife", 0.9, frame(1))
+    scheduler.submit("scissors", 0.8, frame(2))
+    scheduler.submit("gun", 0.7, frame(3))
+    scheduler.submit("bottle", 0.6, frame(4))
+    scheduler.clock.now += 5
+    scheduler.flush_due()
+
+    digest = scheduler.sent[1]
+    assert digest.image_path is None
+    assert digest.image(tile_width=80).shape == (120, 160, 3)  # 3 tiles on a 2x2 grid
+
+
+def test_object_in_cooldown_stays_pending(scheduler):
+    scheduler.submit("knife", 0.9, frame(1))
+    scheduler.clock.now += 10
+    assert scheduler.submit("knife", 0.8, frame(1)) == {"telegram": "queued"}
+    assert scheduler.submit("gun", 0.7, frame(3)) == {"telegram": "sent"}
+
+    assert [o.object_name for o in scheduler.sent[1].objects] == ["gun"]
+    assert scheduler.get_stats()["telegram"]["pending"] == 1
+
+    scheduler.clock.now += 300
+    assert scheduler.flush_due() == 1
+    assert [o.object_name for o in scheduler.sent[2].objects] == ["knife"]
+
+
+def test_failed_send_keeps_alerts_and_backs_off():
+    clock = FakeClock()
+    scheduler = NotificationScheduler(clock=clock)
+    outcomes = iter([False, ConnectionError("down"), True])
+    sent = []
+
+    def send(digest):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if outcome:
+            sent.append(digest)
+        return outcome
+
+    scheduler.add_channel('telegram', send, ChannelPolicy(alert_cooldown=300, min_interval=5,
+                                                          failure_backoff=5, max_failure_backoff=8))
+    assert scheduler.submit("knife", 0.9, frame(1)) == {"telegram": "failed"}
+    # The channel is not retried before the backoff, which doubles after each failure (up to 8 s)
+    assert scheduler.submit("knife", 0.7, frame(2)) == {"telegram": "queued"}
+    clock.now += 4.9
+    assert scheduler.flush_due() == 0
+    clock.now += 0.1
+    assert scheduler.flush_due() == 0  # ConnectionError
+    clock.now += 7.9
+    assert scheduler.flush_due() == 0
+    assert scheduler.get_stats()["telegram"] == {"sent": 0, "coalesced": 0, "pending": 2}
+
+    # Neither the channel interval nor the object cooldown was used up by the failures
+    clock.now += 0.1
+    assert scheduler.flush_due() == 1
+    assert sent[0].count == 2 and sent[0].objects[0].confidence == 0.9
+    assert scheduler.get_stats()["telegram"] == {"sent": 1, "coalesced": 1, "pending": 0}
+
+
+
+def test_make_collage_grid():
+    collage = make_collage([frame(i) for i in range(5)], tile_width=40)
+    assert collage.shape == (60, 120, 3)
+    assert collage[0, 0, 0] == 0 and collage[30, 40, 0] == 4
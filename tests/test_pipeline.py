@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+
+from src.core.pipeline import Pipeline, Source, Stage, format_stats
+
+
+def run_until_idle(pipeline, expected, timeout=5.0):
+    """Attendre que le dernier étage ait traité le nombre d'éléments attendu"""
+    deadline = time.monotonic() + timeout
+    last = pipeline.stages[-1]
+    while time.monotonic() < deadline:
+        if last.get_stats()["processed"] >= expected:
+            return
+        time.sleep(0.01)
+
+
+def test_ordered_stage_keeps_input_order_and_skips_filtered_items():
+    output = []
+
+    def slow_square(item, worker_id):
+        time.sleep(random.uniform(0, 0.01))
+        return None if item % 5 == 0 else item * item
+
+    pipeline = Pipeline([
+        Stage('square', slow_square, workers=4, queue_size=100, ordered=True),
+        Stage('collect', lambda item, worker_id: output.append(item) or item, queue_size=100)
+    ])
+    pipeline.start()
+    for i in range(50):
+        assert pipeline.put(i)
+    run_until_idle(pipeline, 40)
+    stats = pipeline.get_stats()
+    pipeline.stop()
+
+    assert output == [i * i for i in range(50) if i % 5]
+    assert stats["submitted"] == 50
+    assert stats["square"]["filtered"] == 10 and stats["square"]["processed"] == 40
+
+
+def test_drop_oldest_counts_drops_and_does_not_block_ordering():
+    release = threading.Event()
+    output = []
+
+    def gated(item, worker_id):
+        release.wait()
+        return item
+
+    pipeline = Pipeline([
+        Stage('gate', gated, queue_size=2, drop_oldest=True, ordered=True),
+        Stage('collect', lambda item, worker_id: output.append(item) or item)
+    ])
+    pipeline.start()
+    pipeline.put(0)
+    time.sleep(0.1)  # item 0 is being processed, the queue is empty
+    for i in range(1, 6):
+        pipeline.put(i)
+    release.set()
+    run_until_idle(pipeline, 3)
+    pipeline.stop()
+
+    # Items 1-3 were dropped to make room for the freshest frames
+    assert output == [0, 4, 5]
+    assert pipeline.get_stats()["gate"]["dropped"] == 3
+
+
+def test_batched_stage_and_error_accounting():
+    batches = []
+
+    def batched(items, worker_id):
+        batches.append(len(items))
+        if 1 in items:
+            raise ValueError("bad batch")
+        return items
+
+    pipeline = Pipeline([
+        Stage('batch', batched, queue_size=100, ordered=True, batch_size=4, batch_wait=0.05),
+        Stage('sink', lambda item, worker_id: item, queue_size=100)
+    ])
+    for i in range(16):
+        pipeline.put(i)
+    pipeline.start()
+    run_until_idle(pipeline, 12)
+    stats = pipeline.get_stats()
+    pipeline.stop()
+
+    assert max(batches) == 4 and sum(batches) == 16
+    assert stats["batch"]["errors"] == 4
+    assert stats["sink"]["processed"] == 12
+    assert stats["batch"]["max_queue_depth"] == 16
+
+
+def test_source_feeds_the_first_stage_and_counts_failed_reads():
+    reads = iter([1, None, 2, 3, None, 4])
+    output = []
+
+    def read():
+        return next(reads, None)
+
+    pipeline = Pipeline([
+        Stage('collect', lambda item, worker_id: output.append(item) or item)
+    ], source=Source('capture', read, retry_delay=0.01))
+    pipeline.start()
+    run_until_idle(pipeline, 4)
+    time.sleep(0.05)
+    stats = pipeline.get_stats()
+    pipeline.stop()
+
+    assert output == [1, 2, 3, 4]
+    assert stats["capture"]["captured"] == 4 and stats["capture"]["failed"] >= 2
+    assert stats["submitted"] == 4
+
+
+def test_blocked_downstream_does_not_hold_the_ordered_stage():
+    release = threading.Event()
+    output = []
+
+    def sink(item, worker_id):
+        release.wait()
+        output.append(item)
+        return item
+
+    pipeline = Pipeline([
+        Stage('ordered', lambda item, worker_id: item, workers=2, queue_size=100, ordered=True),
+        Stage('sink', sink, queue_size=1, put_timeout=5.0)
+    ])
+    pipeline.start()
+    for i in range(8):
+        pipeline.put(i)
+    time.sleep(0.3)
+    # One worker waits for room in the sink queue, the other kept processing
+    assert pipeline.get_stats()["ordered"]["processed"] == 8
+
+    release.set()
+    run_until_idle(pipeline, 8)
+    pipeline.stop()
+    assert output == list(range(8))
+
+
+def test_report_is_called_periodically_with_the_stats():
+    reports = []
+    pipeline = Pipeline([Stage('square', lambda item, worker_id: item * item)],
+                        source=Source('capture', lambda: 3, interval=0.01))
+    pipeline.report = lambda: reports.append(format_stats(pipeline.get_stats()))
+    pipeline.report_interval = 0.1
+    pipeline.start()
+    time.sleep(0.35)
+    pipeline.stop()
+
+    assert len(reports) >= 2
+    assert reports[-1].startswith("capture ") and " | square " in reports[-1]
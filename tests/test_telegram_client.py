@@ -0,0 +1,119 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from src.services.telegram_client import TelegramClient, TelegramError
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    """API Telegram factice : enregistre les requêtes, rejoue les statuts programmés"""
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        server = self.server
+        server.requests.append((self.path, body, self.client_address[1]))
+        status = server.statuses.pop(0) if server.statuses else 200
+        if status == "slow":
+            time.sleep(0.5)
+            status = 200
+        if status == 200:
+            payload = {"ok": True, "result": {"message_id": len(server.requests)}}
+        elif status == 429:
+            payload = {"ok": False, "parameters": {"retry_after": 0}}
+        else:
+            payload = {"ok": False, "description": "Bad Request: chat not found"}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Serveur HTTP local à la place de api.telegram.org"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTelegramHandler)
+    server.requests, server.statuses = [], []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    client = TelegramClient("TOKEN", "42", base_url=f"http://127.0.0.1:{server.server_port}",
+                            max_retries=2, retry_backoff=0.01)
+    yield client
+    client.close()
+
+
+def test_connection_is_reused(server, client):
+    for i in range(3):
+        assert client.send_message(f"alert {i}") == {"message_id": i + 1}
+    paths = [path for path, _, _ in server.requests]
+    assert paths == ["/botTOKEN/sendMessage"] * 3
+    assert len({port for _, _, port in server.requests}) == 1
+
+
+def test_server_errors_and_rate_limits_are_retried(server, client):
+    server.statuses = [502, 429]
+    client.send_photo(np.zeros((8, 8, 3), dtype=np.uint8), caption="knife")
+    assert len(server.requests) == 3
+    assert b"image/jpeg" in server.requests[-1][1]
+
+
+def test_retries_are_bounded(server, client):
+    server.statuses = [503] * 5
+    with pytest.raises(TelegramError, match="3 attempt"):
+        client.send_message("alert")
+    assert len(server.requests) == 3
+
+
+def test_client_errors_are_not_retried(server, client):
+    server.statuses = [400]
+    with pytest.raises(TelegramError, match="chat not found"):
+        client.send_message("alert")
+    assert len(server.requests) == 1
+
+
+def test_read_timeouts_are_not_retried(server):
+    client = TelegramClient("TOKEN", "42", base_url=f"http://127.0.0.1:{server.server_port}",
+                            read_timeout=0.1, max_retries=2, retry_backoff=0.01)
+    server.statuses = ["slow"]
+    with pytest.raises(TelegramError, match="not retried"):
+        client.send_message("alert")
+    client.close()
+    time.sleep(0.5)
+    assert len(server.requests) == 1
+
+
+def test_connection_errors_are_retried():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = TelegramClient("TOKEN", "42", base_url=f"http://127.0.0.1:{port}",
+                            max_retries=2, retry_backoff=0.01)
+    with pytest.raises(TelegramError, match="3 attempt"):
+        client.send_message("alert")
+    client.close()
+
+
+def test_media_group_batches_photos(server, client):
+    photos = [b"\xff\xd8jpeg%d" % i for i in range(11)]
+    client.send_media_group(photos, caption="3 détections")
+
+    assert [path for path, _, _ in server.requests] == ["/botTOKEN/sendMediaGroup", "/botTOKEN/sendPhoto"]
+    body = server.requests[0][1]
+    assert body.count(b"attach://photo") == 10 and body.count(b"caption") == 1
@@ -0,0 +1,45 @@
+import numpy as np
+
+from src.core.tracker import ObjectTracker, iou_matrix
+
+
+def test_iou_matrix():
+    ious = iou_matrix([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 10, 10], [20, 20, 5, 5]])
+    np.testing.assert_allclose(ious, [[1.0, 1 / 3, 0.0]], atol=1e-6)
+
+
+def test_track_identity_is_kept_across_frames():
+    tracker = ObjectTracker(iou_threshold=0.3, max_age=1.0)
+    first = tracker.update([[100, 100, 50, 50]], [0.9], ["knife"], now=0.0)
+    second = tracker.update([[110, 100, 50, 50]], [0.8], ["knife"], now=0.1)
+
+    assert len(tracker.tracks) == 1
+    assert first[0].track_id == second[0].track_id
+
+
+def test_prediction_follows_velocity_between_detections():
+    tracker = ObjectTracker(iou_threshold=0.1, max_age=1.0, measurement_noise=0.1)
+    for i in range(5):
+        tracker.update([[100 + 20 * i, 100, 50, 50]], [0.9], ["knife"], now=0.1 * i)
+
+    predicted = tracker.predict(now=0.5)[0].box
+    assert 180 < predicted[0] < 220  # Position attendue: x = 200
+
+
+def test_alert_is_raised_once_per_track():
+    tracker = ObjectTracker(max_age=1.0)
+    dangerous = lambda label: label == "knife"
+    alerts = []
+    for i in range(10):
+        tracker.update([[100, 100, 50, 50], [300, 300, 40, 40]], [0.9, 0.9],
+                       ["knife", "person"], now=0.1 * i)
+        alerts += tracker.pop_new_alerts(dangerous)
+
+    assert [t.label for t in alerts] == ["knife"]
+
+
+def test_expired_tracks_are_dropped():
+    tracker = ObjectTracker(max_age=0.5)
+    tracker.update([[100, 100, 50, 50]], [0.9], ["knife"], now=0.0)
+    assert tracker.predict(now=1.0) == []
+    assert tracker.tracks == []
@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.core.yolo_decoder import decode_yolo_outputs, split_batch_outputs
+
+
+def _reference_decode(outs, width, height, threshold, nms_threshold):
+    """Ancienne boucle ligne par ligne, utilisée comme référence"""
+    class_ids, confidences, boxes = [], [], []
+    for out in outs:
+        for detection in out:
+            scores = detection[5:]
+            class_id = np.argmax(scores)
+            confidence = scores[class_id]
+            if confidence > threshold:
+                center_x = int(detection[0] * width)
+                center_y = int(detection[1] * height)
+                w = int(detection[2] * width)
+                h = int(detection[3] * height)
+                boxes.append([int(center_x - w / 2), int(center_y - h / 2), w, h])
+                confidences.append(float(confidence))
+                class_ids.append(class_id)
+    indexes = np.asarray(cv2.dnn.NMSBoxes(boxes, confidences, threshold, nms_threshold)).reshape(-1)
+    return [(boxes[i], class_ids[i]) for i in indexes]
+
+
+@pytest.fixture
+def yolo_outputs():
+    """Génère des sorties YOLO synthétiques (3 couches, 80 classes)"""
+    rng = np.random.default_rng(0)
+    outs = []
+    for rows in (507, 2028, 8112):
+        out = rng.random((rows, 85), dtype=np.float32)
+        out[:, 2:4] *= 0.3
+        out[:, 5:] *= 0.6
+        outs.append(out)
+    return outs
+
+
+def test_decode_matches_reference(yolo_outputs):
+    boxes, confidences, class_ids = decode_yolo_outputs(yolo_outputs, 1280, 720, 0.5, 0.4)
+    expected = _reference_decode(yolo_outputs, 1280, 720, 0.5, 0.4)
+
+    assert len(boxes) == len(expected)
+    assert [(b.tolist(), int(c)) for b, c in zip(boxes, class_ids)] == \
+        [(list(b), int(c)) for b, c in expected]
+    assert np.all(confidences > 0.5)
+
+
+def test_decode_without_candidates(yolo_outputs):
+    boxes, confidences, class_ids = decode_yolo_outputs(yolo_outputs, 416, 416, 0.99, 0.4)
+    assert boxes.shape == (0, 4)
+    assert len(confidences) == 0 and len(class_ids) == 0
+
+
+def test_split_batch_outputs(yolo_outputs):
+    stacked = [np.concatenate([out, out * 0.5]) for out in yolo_outputs]
+    batched = [np.stack([out, out * 0.5]) for out in yolo_outputs]
+
+    for outs in (stacked, batched):
+        per_image = split_batch_outputs(outs, 2)
+        assert len(per_image) == 2
+        for out, first, second in zip(yolo_outputs, *per_image):
+            np.testing.assert_array_equal(first, out)
+            np.testing.assert_array_equal(second, out * 0.5)